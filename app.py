@@ -1,13 +1,83 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, stream_with_context
 from flask_cors import CORS
-import csv
 from datetime import datetime
+from itertools import chain
+import hashlib
+import json
 import os
 
+from modules.history.store import get_history_store, matches_filters
+from modules.history.rollups import ROLLUPS, get_history_rollups
+from modules.history.search import get_search_index
+from modules.history.skills import get_skill_analytics
+from modules.logs.index import LogIndex
+from modules.perf.report_files import REPORTS_PATH, list_run_reports
+
 app = Flask(__name__)
 CORS(app)
 
-PATH = 'all excels/'
+history = get_history_store()
+log_index = LogIndex()
+
+DASHBOARD_FIELDS = ['Job ID', 'Title', 'Company', 'HR Name', 'HR Link', 'Job Link', 'External Job link', 'Date Applied']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def to_dashboard_job(row: dict) -> dict:
+    """Converts a history row to the JSON keys used by the dashboard, Eg: 'Job ID' -> 'Job_ID'."""
+    return {field.replace(' ', '_'): row[field] for field in DASHBOARD_FIELDS}
+
+
+def read_history_query() -> tuple[dict, str | None, bool, int | None, int]:
+    """
+    Reads the filter, sort and pagination query parameters shared by the history endpoints.
+
+    Returns:
+        (filters, sort_by, descending, limit, offset). `limit` is None if not given.
+
+    Raises:
+        ValueError: If `limit` or `offset` are not valid non negative integers.
+    """
+    filters = {key: request.args.get(key, '').strip() for key in ('company', 'title', 'date_from', 'date_to')}
+    sort = request.args.get('sort', '').strip()
+    sort_by = sort.replace('_', ' ') if sort else None
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+    limit = request.args.get('limit')
+    offset = request.args.get('offset', '0')
+    if (limit is not None and not limit.isdigit()) or not offset.isdigit():
+        raise ValueError("`limit` and `offset` must be non negative integers")
+    limit = min(int(limit), MAX_PAGE_SIZE) if limit is not None else None
+    return filters, sort_by, descending, limit, int(offset)
+
+
+def history_etag(kind: str) -> str | None:
+    """
+    Returns the ETag of the response to the current request, derived from the size and modification time
+    of the history files and the query string. None if the history store can't tell when it changes.
+    """
+    stamp = history.stamp(kind)
+    if stamp is None:
+        return None
+    return hashlib.sha256(json.dumps([stamp, request.full_path]).encode()).hexdigest()[:32]
+
+
+def history_version(kind: str) -> str:
+    """
+    Returns the version of the rows already in the history, sent with `seq` as the delta sync token.
+    It changes when existing rows are updated or rewritten, which a delta of new rows can't carry.
+    """
+    return hashlib.sha256(json.dumps(history.updates_stamp(kind)).encode()).hexdigest()[:16]
+
+
+def with_etag(response: Response, etag: str | None) -> Response:
+    """Sets `etag` on `response`, and replaces it with an empty 304 response if the client already has it."""
+    if etag is None:
+        return response
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    response.set_etag(etag)
+    return response
 ##> ------ Karthik Sarode : karthik.sarode23@gmail.com - UI for excel files ------
 @app.route('/')
 def home():
@@ -17,31 +87,236 @@ def home():
 @app.route('/applied-jobs', methods=['GET'])
 def get_applied_jobs():
     '''
-    Retrieves a list of applied jobs from the applications history CSV file.
+    Retrieves a page of applied jobs from the applications history store.
+
+    Query parameters:
+        company, title: Case insensitive text to search in Company and Title.
+        date_from, date_to: Date Applied range, Eg: 2025-01-01 and 2025-01-31 (inclusive).
+        sort: Field to sort by, Eg: Date_Applied, Company or Title. Written order if not given.
+        order: `asc` (default) or `desc`.
+        limit, offset: Page size (default 100, max 1000) and number of jobs to skip.
+        format: `ndjson` to stream every matching job as one JSON object per line,
+            limit is optional in this mode.
+        since, version: Number of jobs the client has already synced and the version they were synced at
+            (`seq` and `version` of an earlier response), to get only the matching jobs written after them.
+            Sorting and paging are ignored in this mode.
+
+    Returns a JSON response `{"total", "offset", "limit", "seq", "version", "jobs"}`, where jobs have details
+    such as Job ID, Title, Company, HR Name, HR Link, Job Link, External Job link, and Date Applied,
+    `seq` is the number of jobs in the history and `version` changes when jobs already in it are changed.
+    With `since`, returns `{"seq", "version", "since", "reset", "jobs"}`, where `reset` is true if jobs were
+    updated (Eg: their Date Applied) or the history was rewritten (Eg: compacted), and the client should load it again.
+
+    Responses have an ETag that changes when the history changes, a request with a matching
+    If-None-Match header gets an empty 304 response.
     
-    Returns a JSON response containing a list of jobs, each with details such as 
-    Job ID, Title, Company, HR Name, HR Link, Job Link, External Job link, and Date Applied.
+    If the history is not found, returns a 404 error with a relevant message.
+    If the query parameters are invalid, returns a 400 error.
+    If any other exception occurs, returns a 500 error with the exception message.
+    '''
+
+    try:
+        filters, sort_by, descending, limit, offset = read_history_query()
+        etag = history_etag("applied")
+        if etag is not None and request.if_none_match.contains(etag):
+            return with_etag(Response(), etag)
+
+        since = request.args.get('since')
+        if since is not None:
+            if not since.isdigit():
+                raise ValueError("`since` must be a non negative integer")
+            version = history_version("applied")
+            seq, rows = history.since("applied", int(since))
+            reset = seq < int(since) or request.args.get('version') != version
+            jobs = [] if reset else [to_dashboard_job(row) for row in rows if matches_filters("applied", row, filters)]
+            return with_etag(jsonify({'seq': seq, 'version': version, 'since': int(since), 'reset': reset, 'jobs': jobs}), etag)
+
+        # Taken before reading the page, so jobs written or updated meanwhile are sent again by the next delta sync instead of missed
+        version = history_version("applied")
+        seq = history.count("applied")
+        if request.args.get('format') == 'ndjson':
+            jobs = history.stream("applied", filters, sort_by, descending, limit, offset, DASHBOARD_FIELDS)
+            # Read the first job here, so a missing history is still reported as 404 instead of an empty stream
+            first = next(jobs, None)
+            lines = (json.dumps(to_dashboard_job(row)) + '\n' for row in chain([first] if first else [], jobs))
+            response = Response(stream_with_context(lines), mimetype='application/x-ndjson')
+            response.headers['X-History-Seq'] = str(seq)
+            response.headers['X-History-Version'] = version
+            return with_etag(response, etag)
+
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+        total, rows = history.page("applied", filters, sort_by, descending, limit, offset, DASHBOARD_FIELDS)
+        return with_etag(jsonify({
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'seq': seq,
+            'version': version,
+            'jobs': [to_dashboard_job(row) for row in rows]
+        }), etag)
+    except FileNotFoundError:
+        return jsonify({"error": "No applications history found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/rollups', methods=['GET'])
+def get_rollups():
+    '''
+    Retrieves precomputed counts of applied and failed jobs, without reading the history.
+
+    Query parameters:
+        kind: `applied` or `failed` to get only the counts of that history.
+
+    Returns a JSON response like `{"failed": {"total", "by_day", "by_search_term", "by_reason"}, "applied": {...}}`.
+    If `kind` is invalid, returns a 400 error.
+    If any other exception occurs, returns a 500 error with the exception message.
+    '''
+    try:
+        rollups = get_history_rollups().read()
+        kind = request.args.get('kind')
+        if kind is None:
+            return jsonify(rollups)
+        if kind not in ROLLUPS:
+            return jsonify({"error": f'`kind` must be one of {", ".join(ROLLUPS)}'}), 400
+        return jsonify({kind: rollups.get(kind, {})})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/search', methods=['GET'])
+def search_jobs():
+    '''
+    Searches the text of applied and failed jobs using the full text search index.
+
+    Query parameters:
+        q: Words or "quoted phrases" that must all be found, Eg: kubernetes "No C2C".
+        kind: `applied` or `failed` to search only that history.
+        limit, offset: Number of results (default 20, max 100) and number of results to skip.
+
+    Returns a JSON response `{"query", "results"}`, best matches first, where results have
+    kind, job_id, date, title, company, rank and a snippet with matches marked as **word**.
     
-    If the CSV file is not found, returns a 404 error with a relevant message.
+    If the query is missing or invalid, returns a 400 error.
+    If search is disabled with `history_search_index = False`, returns a 404 error.
+    If any other exception occurs, returns a 500 error with the exception message.
+    '''
+    try:
+        query = request.args.get('q', '')
+        kind = request.args.get('kind') or None
+        if kind not in (None, *ROLLUPS):
+            raise ValueError(f'`kind` must be one of {", ".join(ROLLUPS)}')
+        limit = request.args.get('limit', '20')
+        offset = request.args.get('offset', '0')
+        if not limit.isdigit() or not offset.isdigit():
+            raise ValueError("`limit` and `offset` must be non negative integers")
+        search_index = get_search_index()
+        if search_index is None:
+            return jsonify({"error": "Search is disabled, set `history_search_index = True` in config/settings.py"}), 404
+        results = search_index.search(query, kind, min(int(limit), 100), int(offset))
+        return jsonify({'query': query, 'results': results})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/skills', methods=['GET'])
+def get_skills():
+    '''
+    Retrieves skill demand of applied jobs from the cached skill matrix (Needs `numpy` and `scipy`).
+
+    Query parameters:
+        view: `frequencies` (default), `cooccurrence` or `trends`.
+        skill: Skill to find co-occurring skills of (required for `cooccurrence`),
+               or comma separated skills to get trends of (default the `top` most asked ones).
+        top: Number of skills (default 30, max 500).
+        from, to: "YYYY-MM" months to count `frequencies` between.
+
+    Returns a JSON response `{"view", "jobs", "skills"}` where skills are `{"skill", "jobs", "share"}`,
+    or for `trends` `{"view", "months", "jobs", "skills": {skill: jobs per month}}`.
+
+    If a parameter is invalid or the skill isn't found, returns a 400 error.
     If any other exception occurs, returns a 500 error with the exception message.
     '''
+    try:
+        view = request.args.get('view', 'frequencies')
+        skill = request.args.get('skill', '').strip()
+        top = request.args.get('top', '30')
+        if not top.isdigit():
+            raise ValueError("`top` must be a non negative integer")
+        top = min(int(top), 500)
+        skill_matrix = get_skill_analytics().matrix()
+        if view == 'frequencies':
+            skills = skill_matrix.frequencies(top, request.args.get('from'), request.args.get('to'))
+        elif view == 'cooccurrence':
+            if not skill:
+                raise ValueError("`skill` is required for the cooccurrence view")
+            skills = skill_matrix.cooccurrence(skill, top)
+        elif view == 'trends':
+            return jsonify({'view': view, **skill_matrix.trends([name.strip() for name in skill.split(',') if name.strip()], top)})
+        else:
+            raise ValueError("`view` must be one of frequencies, cooccurrence, trends")
+        return jsonify({'view': view, 'jobs': len(skill_matrix.job_ids), 'skills': skills})
+    except (ValueError, KeyError) as e:
+        return jsonify({"error": str(e).strip('"\'')}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+@app.route('/logs/<job_id>', methods=['GET'])
+def get_job_log(job_id):
+    '''
+    Retrieves all log records of one job from the Job ID index of the logs, without scanning the log files.
+
+    Returns a JSON response `{"job_id", "records"}`, oldest first, where records have
+    time, level, job_id, phase, search_term and message.
+    If no records of the job are found, returns a 404 error.
+    If any other exception occurs, returns a 500 error with the exception message.
+    '''
     try:
-        jobs = []
-        with open(PATH + 'all_applied_applications_history.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                jobs.append({
-                    'Job_ID': row['Job ID'],
-                    'Title': row['Title'],
-                    'Company': row['Company'],
-                    'HR_Name': row['HR Name'],
-                    'HR_Link': row['HR Link'],
-                    'Job_Link': row['Job Link'],
-                    'External_Job_link': row['External Job link'],
-                    'Date_Applied': row['Date Applied']
-                })
-        return jsonify(jobs)
+        records = log_index.read(job_id)
+        if not records:
+            return jsonify({"error": f"No log records of Job ID {job_id}"}), 404
+        return jsonify({'job_id': job_id, 'records': records})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reports', methods=['GET'])
+def get_reports():
+    '''
+    Lists the end of run reports of the bot, newest first, to compare runs with different settings.
+
+    Returns a JSON response `{"reports"}` where reports have id, started, duration (seconds),
+    jobs (counts by outcome and per hour) and settings. Open `/reports/<id>.html` or `/reports/<id>.json` for the whole report.
+    If any exception occurs, returns a 500 error with the exception message.
+    '''
+    try:
+        return jsonify({'reports': list_run_reports()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reports/<name>', methods=['GET'])
+def get_report(name):
+    '''
+    Serves one saved report, `name` is its id with `.html` or `.json`. Returns a 404 error if it's not found.
+    '''
+    if not name.startswith('report-') or not name.endswith(('.html', '.json')):
+        return jsonify({"error": f"Report {name} not found"}), 404
+    return send_from_directory(os.path.abspath(REPORTS_PATH), name)
+
+@app.route('/applied-jobs/<job_id>', methods=['GET'])
+def get_applied_job(job_id):
+    '''
+    Retrieves one applied job by its Job ID, without reading the rest of the history.
+
+    Returns a JSON object with the same keys as the jobs of `/applied-jobs`, 
+    or a 404 error if the job or the history is not found.
+    If any other exception occurs, returns a 500 error with the exception message.
+    '''
+    try:
+        row = history.get("applied", job_id)
+        if row is None:
+            return jsonify({"error": f"Job ID {job_id} not found"}), 404
+        return jsonify(to_dashboard_job(row))
     except FileNotFoundError:
         return jsonify({"error": "No applications history found"}), 404
     except Exception as e:
@@ -50,7 +325,7 @@ def get_applied_jobs():
 @app.route('/applied-jobs/<job_id>', methods=['PUT'])
 def update_applied_date(job_id):
     """
-    Updates the 'Date Applied' field of a job in the applications history CSV file.
+    Updates the 'Date Applied' field of a job in the applications history store.
 
     Args:
         job_id (str): The Job ID of the job to be updated.
@@ -62,32 +337,12 @@ def update_applied_date(job_id):
         exception message.
     """
     try:
-        data = []
-        csvPath = PATH + 'all_applied_applications_history.csv'
-        
-        if not os.path.exists(csvPath):
-            return jsonify({"error": f"CSV file not found at {csvPath}"}), 404
-            
-        # Read current CSV content
-        with open(csvPath, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            fieldNames = reader.fieldnames
-            found = False
-            for row in reader:
-                if row['Job ID'] == job_id:
-                    row['Date Applied'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    found = True
-                data.append(row)
-        
-        if not found:
+        if not history.update_date_applied(job_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S')):
             return jsonify({"error": f"Job ID {job_id} not found"}), 404
-
-        with open(csvPath, 'w', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldNames)
-            writer.writeheader()
-            writer.writerows(data)
         
         return jsonify({"message": "Date Applied updated successfully"}), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": f"History file not found at {e.filename}"}), 404
     except Exception as e:
         print(f"Error updating applied date: {str(e)}")  # Debug log
         return jsonify({"error": str(e)}), 500
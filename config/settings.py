@@ -48,6 +48,46 @@ file_name = "all excels/all_applied_applications_history.csv"
 failed_file_name = "all excels/all_failed_applications_history.csv"
 logs_folder_path = "logs/"
 
+# How big can the log file "log.jsonl" in `logs_folder_path` get before it's compressed to "log-<date>.jsonl.gz" and a new one is started? (In MB), and how many of those compressed logs should be kept?
+log_max_size_mb = 20                # Only whole numbers above 0 are allowed
+log_backups = 10                    # Only whole numbers above 0 are allowed
+
+# How much space can snapshots of failed pages (HTML, screenshot, URL and error, saved to "snapshots/" in `logs_folder_path`) take? (In MB) The oldest are deleted once they take more
+snapshots_max_mb = 200              # Only whole numbers above 0 are allowed
+
+# How many screenshots of failed applications (Saved to "screenshots/" in `logs_folder_path`) should be kept, and how much space can they take? (In MB) The oldest are deleted first
+screenshots_max_count = 500         # Only whole numbers above 0 are allowed
+screenshots_max_mb = 200            # Only whole numbers above 0 are allowed
+
+# Do you want to save how long each phase of applying to every job took? Saved to "traces/" in `logs_folder_path`, open them in https://ui.perfetto.dev (A summary is printed at the end of every run either way)
+save_traces = True                  # True or False, Note: True or False are case-sensitive
+
+# Do you want the bot to send its counters and timings to the FastAPI server (`python main.py`), to see them at http://localhost:8001/metrics (Prometheus format)? They're sent over local UDP to `metrics_port`, the bot never waits for the server
+send_metrics = True                 # True or False, Note: True or False are case-sensitive
+metrics_port = 8125                 # Only whole numbers between 1 and 65535 are allowed
+
+# Do you want to count and time every command sent to Chrome, by the line of code and locator (XPath, class name...) that sent it? A ranked report of the slowest locators is printed at the end of the run and saved to "webdriver-profile-<date>.json" in `logs_folder_path` (Slows down each command slightly, leave it False unless you're tuning the bot)
+profile_webdriver = False           # True or False, Note: True or False are case-sensitive
+
+# Where do you want to store the history of applied and failed jobs? "csv" writes to the above files, "sqlite" writes to an indexed database at `history_db_path` (Faster for large histories, run `python -m modules.history.store export` to get the CSV files)
+# "partitioned" writes one folder of CSV files per month in `history_partitions_path` (Run `python -m modules.history.partitions import` to split your existing files, and `python -m modules.history.partitions compact` now and then to compress old months)
+history_backend = "csv"             # "csv", "sqlite" or "partitioned"
+history_db_path = "all excels/history.db"
+history_partitions_path = "all excels/history/"
+
+# When should written history be forced onto the disk? "batch" after every batch of jobs written in the background (Safest), "exit" only when the bot exits, "none" leaves it to the operating system (Fastest)
+history_fsync = "batch"             # "batch", "exit" or "none"
+
+# Do you want to be able to search the text of jobs in your history from the dashboard? Keeps a full text search index in "history_search.db" next to `file_name` (Run `python -m modules.history.search rebuild` to add your existing history)
+history_search_index = True         # True or False, Note: True or False are case-sensitive
+
+# Do you want to remember jobs and companies rejected by your filters in `config/search.py` across runs? They'll be skipped without opening them again, until you change the filters that rejected them (Run `python -m modules.history.rejections clear` to forget all of them)
+remember_rejections = True          # True or False, Note: True or False are case-sensitive
+
+# Do you want to store each job description only once in a compressed archive? The history files will only keep a reference like "sha256:..." instead of the whole description (Makes them much smaller. Use `python -m modules.history.archive show <reference>` to read one, or `python -m modules.history.archive migrate` to move descriptions of your existing history)
+archive_descriptions = True         # True or False, Note: True or False are case-sensitive
+description_archive_path = "all excels/descriptions/"
+
 # Set the maximum amount of time allowed to wait between each click in secs
 click_gap = 0                       # Enter max allowed secs to wait approximately. (Only Non Negative Integers Eg: 0,1,2,3,....)
 
@@ -0,0 +1,141 @@
+# fastHelpers/metrics_receiver.py
+
+import re
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Tuple
+
+# Metrics the bot sends (see modules/perf/metrics.py), with their help text. Other names are dropped
+KNOWN_METRICS = {
+    "jobs": ("counter", "Jobs the bot finished, by outcome (easy_applied, external, failed, skipped)"),
+    "ai_calls": ("counter", "AI completions, by provider and outcome (ok, error)"),
+    "ai_tokens": ("counter", "Tokens used by AI completions, by provider and kind (prompt, completion), when the API reports them"),
+    "ai_call_seconds": ("histogram", "Time taken by AI completions in seconds"),
+    "page_load_seconds": ("histogram", "Time taken to load LinkedIn pages in seconds, by page"),
+    "daily_limit_reached": ("gauge", "1 if LinkedIn's daily Easy Apply limit was reached in this run"),
+    "run_started_timestamp_seconds": ("gauge", "Unix time the running bot started"),
+}
+PREFIX = "job_applier_"
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+MAX_SERIES = 1000
+JOBS_PER_HOUR_WINDOW = 3600
+
+re_label_name = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def to_label_set(labels: dict) -> LabelSet:
+    """Returns hashable, sorted labels, dropping names Prometheus doesn't allow"""
+    return tuple(sorted((str(name), str(value)) for name, value in labels.items() if re_label_name.match(str(name))))
+
+
+def format_labels(labels: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.counters: Dict[Tuple[str, LabelSet], float] = {}
+        self.gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self.histograms: Dict[Tuple[str, LabelSet], list] = {}   # [bucket counts..., sum, count]
+        self.applied_times = deque()
+        self.last_received = None
+
+    def record(self, metric: dict) -> None:
+        """Adds one metric datagram from the bot"""
+        name = metric.get("name")
+        if name not in KNOWN_METRICS or KNOWN_METRICS[name][0] != metric.get("type"):
+            return
+        value = float(metric.get("value", 0))
+        key = (name, to_label_set(metric.get("labels") or {}))
+        series = {"counter": self.counters, "gauge": self.gauges, "histogram": self.histograms}[KNOWN_METRICS[name][0]]
+        if key not in series and len(self.counters) + len(self.gauges) + len(self.histograms) >= MAX_SERIES:
+            return
+        if series is self.counters:
+            self.counters[key] = self.counters.get(key, 0) + value
+            if name == "jobs" and dict(key[1]).get("outcome") in ("easy_applied", "external"):
+                self.applied_times.extend([time.time()] * int(value))
+        elif series is self.gauges:
+            self.gauges[key] = value
+        else:
+            buckets = self.histograms.setdefault(key, [0] * len(BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    buckets[index] += 1
+            buckets[-2] += value
+            buckets[-1] += 1
+        self.last_received = time.time()
+
+    def jobs_per_hour(self) -> int:
+        """Jobs applied to or collected in the last hour"""
+        cutoff = time.time() - JOBS_PER_HOUR_WINDOW
+        while self.applied_times and self.applied_times[0] < cutoff:
+            self.applied_times.popleft()
+        return len(self.applied_times)
+
+    def render(self) -> str:
+        """Returns all metrics in Prometheus text exposition format"""
+        lines = []
+        for name, (metric_type, help_text) in KNOWN_METRICS.items():
+            full_name = PREFIX + name + ("_total" if metric_type == "counter" else "")
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {metric_type}"]
+            if metric_type == "histogram":
+                for (series_name, labels), buckets in sorted(self.histograms.items()):
+                    if series_name != name:
+                        continue
+                    for bound, count in zip(BUCKETS, buckets):
+                        lines.append(f"{full_name}_bucket{format_labels(labels, (('le', format_value(bound)),))} {count}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {format_value(buckets[-2])}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {buckets[-1]}")
+            else:
+                series = self.counters if metric_type == "counter" else self.gauges
+                for (series_name, labels), value in sorted(series.items()):
+                    if series_name == name:
+                        lines.append(f"{full_name}{format_labels(labels)} {format_value(value)}")
+        lines += [
+            f"# HELP {PREFIX}jobs_applied_last_hour Jobs applied to or collected in the last hour",
+            f"# TYPE {PREFIX}jobs_applied_last_hour gauge",
+            f"{PREFIX}jobs_applied_last_hour {self.jobs_per_hour()}",
+            f"# HELP {PREFIX}last_metric_timestamp_seconds Unix time the last metric was received from the bot",
+            f"# TYPE {PREFIX}last_metric_timestamp_seconds gauge",
+            f"{PREFIX}last_metric_timestamp_seconds {format_value(self.last_received or 0)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsProtocol(asyncio.DatagramProtocol):
+    def __init__(self, registry: MetricsRegistry, telemetry=None):
+        self.registry = registry
+        self.telemetry = telemetry
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            datagram = json.loads(data)
+            self.registry.record(datagram)
+            if self.telemetry is not None:
+                self.telemetry.record(datagram)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Ignoring invalid metric from {addr}: {e}")
+
+
+async def start_metrics_receiver(port: int, telemetry=None) -> asyncio.DatagramTransport:
+    """Listens for metrics and events from the bot on local UDP `port`, also passing them to `telemetry` if given"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: MetricsProtocol(registry, telemetry), local_addr=("127.0.0.1", port))
+    print(f"Receiving bot metrics on udp://127.0.0.1:{port}")
+    return transport
+
+
+# Global registry instance
+registry = MetricsRegistry()
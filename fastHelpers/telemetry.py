@@ -0,0 +1,110 @@
+# fastHelpers/telemetry.py
+
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+
+from modules.perf.stats import percentile
+
+# Live state of the running bot, built from the datagrams it sends (see modules/perf/metrics.py) and pushed to
+# dashboard clients over the WebSocket every BROADCAST_INTERVAL seconds, instead of once per event
+BROADCAST_INTERVAL = 2.0
+RATE_WINDOW = 600           # Seconds of finished jobs counted for jobs per minute
+LATENCY_WINDOW = 100        # Latest timings kept per phase, AI provider and page
+MAX_LATENCIES = 200
+MAX_EVENTS = 20             # Latest events sent with each broadcast
+APPLIED_OUTCOMES = ("easy_applied", "external")
+
+
+def summarize(values) -> dict:
+    ordered = sorted(values)
+    return {"count": len(ordered), "mean": sum(ordered) / len(ordered), "p50": percentile(ordered, 0.5), "p95": percentile(ordered, 0.95), "last": values[-1]}
+
+
+class TelemetryAggregator:
+    def __init__(self):
+        self.current = {"search_term": None, "page": None, "job_id": None, "title": None, "company": None}
+        self.outcomes: Dict[str, int] = {}
+        self.finished = deque()                     # (time, outcome) of jobs finished in the last RATE_WINDOW
+        self.latencies: Dict[str, deque] = {}       # "phase:easy_apply", "span:submit", "ai:openai", "page:results"
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.first_received: Optional[float] = None
+        self.last_received: Optional[float] = None
+        self.changed = False
+
+    def record(self, datagram: dict) -> None:
+        """Adds one event or metric datagram from the bot, ignoring those that aren't shown live"""
+        kind, name, now = datagram.get("type"), datagram.get("name"), time.time()
+        if kind == "event":
+            fields = datagram.get("fields") or {}
+            if name == "search":
+                self.current.update(search_term=fields.get("search_term"), page=None, job_id=None, title=None, company=None)
+            elif name == "page":
+                self.current.update(page=fields.get("page"), search_term=fields.get("search_term", self.current["search_term"]))
+            elif name == "job_started":
+                self.current.update(job_id=fields.get("job_id"), title=fields.get("title"), company=fields.get("company"))
+            elif name == "span":
+                self.add_latency(f"{fields.get('category')}:{fields.get('name')}", fields.get("seconds"))
+            else:
+                return
+            if name != "span":
+                self.events.append({"event": name, "time": now, **fields})
+        elif kind == "counter" and name == "jobs":
+            outcome = str((datagram.get("labels") or {}).get("outcome"))
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + int(datagram.get("value", 1))
+            self.finished.append((now, outcome))
+            self.events.append({"event": "job_finished", "time": now, "outcome": outcome, "job_id": self.current["job_id"], "title": self.current["title"], "company": self.current["company"]})
+        elif kind == "histogram" and name == "ai_call_seconds":
+            self.add_latency(f"ai:{(datagram.get('labels') or {}).get('provider')}", datagram.get("value"))
+        elif kind == "histogram" and name == "page_load_seconds":
+            self.add_latency(f"page:{(datagram.get('labels') or {}).get('page')}", datagram.get("value"))
+        else:
+            return
+        self.first_received = self.first_received or now
+        self.last_received = now
+        self.changed = True
+
+    def add_latency(self, key: str, seconds) -> None:
+        if not isinstance(seconds, (int, float)):
+            return
+        if key not in self.latencies and len(self.latencies) >= MAX_LATENCIES:
+            return
+        self.latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(float(seconds))
+
+    def jobs_per_minute(self, now: float) -> dict:
+        """Finished and applied jobs per minute over the last RATE_WINDOW seconds (Or since the first datagram, if later)"""
+        while self.finished and self.finished[0][0] < now - RATE_WINDOW:
+            self.finished.popleft()
+        minutes = max(min(RATE_WINDOW, now - (self.first_received or now)), 60) / 60
+        applied = sum(1 for _, outcome in self.finished if outcome in APPLIED_OUTCOMES)
+        return {"finished": round(len(self.finished) / minutes, 2), "applied": round(applied / minutes, 2)}
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        return {
+            "type": "telemetry",
+            "current": dict(self.current),
+            "outcomes": dict(self.outcomes),
+            "jobs_per_minute": self.jobs_per_minute(now),
+            "latency": {key: summarize(values) for key, values in sorted(self.latencies.items()) if values},
+            "last_received": self.last_received,
+            "timestamp": now,
+        }
+
+    async def broadcast_loop(self, manager) -> None:
+        """Pushes the snapshot and the events since the last one to all WebSocket clients, only when something changed"""
+        while True:
+            await asyncio.sleep(BROADCAST_INTERVAL)
+            if not self.changed:
+                continue
+            self.changed = False
+            events, self.events = list(self.events), deque(maxlen=MAX_EVENTS)
+            if manager.get_connection_count() == 0:
+                continue
+            await manager.broadcast(json.dumps({**self.snapshot(), "events": events}, default=str))
+
+
+# Global aggregator instance
+telemetry = TelemetryAggregator()
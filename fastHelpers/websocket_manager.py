@@ -4,6 +4,7 @@ from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
 import json
 from typing import List
+from .telemetry import telemetry
 
 class ConnectionManager:
     def __init__(self):
@@ -55,6 +56,9 @@ async def websocket_handler(websocket: WebSocket):
         "timestamp": asyncio.get_event_loop().time()
     }
     await manager.send_personal_message(json.dumps(welcome_msg), websocket)
+
+    # Send the live state of the bot, updates follow every few seconds (see fastHelpers/telemetry.py)
+    await manager.send_personal_message(json.dumps(telemetry.snapshot(), default=str), websocket)
     
     try:
         while True:
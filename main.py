@@ -1,6 +1,7 @@
 # main.py - Modular FastAPI Application
 
 from fastapi import FastAPI, WebSocket
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import sys
@@ -12,6 +13,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'fastHelpers'))
 # Import modular components
 from fastHelpers.config_router import router as config_router
 from fastHelpers.websocket_manager import websocket_handler, manager
+from fastHelpers.metrics_receiver import start_metrics_receiver, registry
+from fastHelpers.telemetry import telemetry
+import asyncio
+from config.settings import metrics_port
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,6 +37,16 @@ app.add_middleware(
 # Include routers
 app.include_router(config_router)
 
+# Metrics and live events pushed by the running bot (see modules/perf/metrics.py), events are sent to WebSocket clients
+@app.on_event("startup")
+async def receive_bot_metrics():
+    try:
+        await start_metrics_receiver(metrics_port, telemetry)
+    except OSError as e:
+        print(f"Couldn't listen for bot metrics on port {metrics_port}: {e}")
+        return
+    app.state.telemetry_task = asyncio.create_task(telemetry.broadcast_loop(manager))
+
 # WebSocket endpoint
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -44,6 +59,8 @@ async def root():
         "message": "Job Applier FastAPI Server",
         "version": "1.0.0",
         "websocket_endpoint": "/ws",
+        "metrics_endpoint": "/metrics",
+        "telemetry_endpoint": "/telemetry",
         "config_endpoints": [
             "/api/update-personals",
             "/api/get-personals", 
@@ -57,9 +74,19 @@ async def health_check():
     return {
         "status": "healthy", 
         "active_connections": manager.get_connection_count(),
-        "modules": ["config_router", "websocket_manager"]
+        "modules": ["config_router", "websocket_manager", "metrics_receiver", "telemetry"]
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Bot counters and timings in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/telemetry")
+async def telemetry_snapshot():
+    """Live state of the running bot, the same as pushed to WebSocket clients"""
+    return telemetry.snapshot()
+
 # Server startup
 if __name__ == "__main__":
     uvicorn.run(
@@ -2,6 +2,7 @@
 from config.secrets import *
 from config.settings import showAiErrorAlerts
 from modules.helpers import print_lg, critical_error_log, convert_to_json
+from modules.perf.report import record_ai_call
 from modules.ai.prompts import *
 
 from pyautogui import confirm
@@ -9,6 +10,7 @@ from openai import OpenAI
 from openai.types.model import Model
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from typing import Iterator, Literal
+from time import perf_counter
 
 def deepseek_create_client() -> OpenAI | None:
     '''
@@ -83,6 +85,8 @@ def deepseek_completion(client: OpenAI, messages: list[dict], response_format: d
     if response_format:
         params["response_format"] = response_format
 
+    started = perf_counter()
+    usage = None
     try:
         # Make the API call
         print_lg(f"Calling DeepSeek API for completion...")
@@ -100,6 +104,7 @@ def deepseek_completion(client: OpenAI, messages: list[dict], response_format: d
                 if chunk.model_extra and chunk.model_extra.get("error"):
                     raise ValueError(f'Error occurred with DeepSeek API: "{chunk.model_extra.get("error")}"')
                 
+                usage = getattr(chunk, "usage", None) or usage
                 chunk_message = chunk.choices[0].delta.content
                 if chunk_message is not None:
                     result += chunk_message
@@ -111,6 +116,8 @@ def deepseek_completion(client: OpenAI, messages: list[dict], response_format: d
                 raise ValueError(f'Error occurred with DeepSeek API: "{completion.model_extra.get("error")}"')
             
             result = completion.choices[0].message.content
+            usage = completion.usage
+        record_ai_call("deepseek", perf_counter() - started, usage=usage)
         
         # Convert to JSON if needed
         if response_format:
@@ -120,6 +127,7 @@ def deepseek_completion(client: OpenAI, messages: list[dict], response_format: d
         print_lg(result, pretty=response_format is not None)
         return result
     except Exception as e:
+        record_ai_call("deepseek", perf_counter() - started, ok=False)
         error_message = f"DeepSeek API error: {str(e)}"
         print_lg(f"Full error details: {e.__class__.__name__}: {str(e)}")
         if hasattr(e, 'response'):
@@ -20,6 +20,7 @@ from config.questions import *
 from config.search import security_clearance, did_masters
 
 from modules.helpers import print_lg, critical_error_log, convert_to_json
+from modules.perf.report import record_ai_call
 from modules.ai.prompts import *
 
 from pyautogui import confirm
@@ -27,6 +28,7 @@ from openai import OpenAI
 from openai.types.model import Model
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from typing import Iterator, Literal
+from time import perf_counter
 
 
 apiCheckInstructions = """
@@ -165,23 +167,32 @@ def ai_completion(client: OpenAI, messages: list[dict], response_format: dict =
     if response_format and llm_spec in ["openai", "openai-like"]:
         params["response_format"] = response_format
 
-    completion = client.chat.completions.create(params)
+    started = perf_counter()
+    usage = None
+    try:
+        completion = client.chat.completions.create(params)
 
-    result = ""
-    
-    # Log response
-    if stream:
-        print_lg("--STREAMING STARTED")
-        for chunk in completion:
-            ai_check_error(chunk)
-            chunkMessage = chunk.choices[0].delta.content
-            if chunkMessage != None:
-                result += chunkMessage
-            print_lg(chunkMessage, end="", flush=True)
-        print_lg("\n--STREAMING COMPLETE")
-    else:
-        ai_check_error(completion)
-        result = completion.choices[0].message.content
+        result = ""
+        
+        # Log response
+        if stream:
+            print_lg("--STREAMING STARTED")
+            for chunk in completion:
+                ai_check_error(chunk)
+                usage = getattr(chunk, "usage", None) or usage
+                chunkMessage = chunk.choices[0].delta.content
+                if chunkMessage != None:
+                    result += chunkMessage
+                print_lg(chunkMessage, end="", flush=True)
+            print_lg("\n--STREAMING COMPLETE")
+        else:
+            ai_check_error(completion)
+            result = completion.choices[0].message.content
+            usage = completion.usage
+    except Exception:
+        record_ai_call("openai", perf_counter() - started, ok=False)
+        raise
+    record_ai_call("openai", perf_counter() - started, usage=usage)
     
     if response_format:
         result = convert_to_json(result)
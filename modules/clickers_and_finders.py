@@ -13,15 +13,42 @@ version:    24.12.29.12.30
 '''
 
 from config.settings import click_gap, smooth_scroll
+from time import perf_counter
 from modules.helpers import buffer, print_lg, sleep
+from modules.perf.waits import record_wait
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support.ui import WebDriverWait as SeleniumWebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.action_chains import ActionChains
 
+# Wait class
+class WebDriverWait(SeleniumWebDriverWait):
+    '''
+    Selenium's `WebDriverWait` that adds the time of every wait to the wait budget, as "succeeded" if it found what it waited for, else "expired" (See `modules/perf/waits.py`)
+    '''
+    def until(self, method, message: str = ""):
+        start = perf_counter()
+        try:
+            result = super().until(method, message)
+        except Exception:
+            record_wait("expired", perf_counter() - start)
+            raise
+        record_wait("succeeded", perf_counter() - start)
+        return result
+
+    def until_not(self, method, message: str = ""):
+        start = perf_counter()
+        try:
+            result = super().until_not(method, message)
+        except Exception:
+            record_wait("expired", perf_counter() - start)
+            raise
+        record_wait("succeeded", perf_counter() - start)
+        return result
+
 # Click Functions
 def wait_span_click(driver: WebDriver, text: str, time: float=5.0, click: bool=True, scroll: bool=True, scrollTop: bool=False) -> WebElement | bool:
     '''
@@ -18,13 +18,15 @@ version:    24.12.29.12.30
 import os
 import json
 
-from time import sleep
 from random import randint
 from datetime import datetime, timedelta
 from pyautogui import alert
 from pprint import pprint
 
 from config.settings import logs_folder_path
+from modules.logs.console import use_print_lg
+from modules.logs.writer import LogLevel, get_log_writer
+from modules.perf.waits import sleep
 
 
 
@@ -70,35 +72,23 @@ def critical_error_log(possible_reason: str, stack_trace: Exception) -> None:
     print_lg(possible_reason, stack_trace, datetime.now(), from_critical=True)
 
 
-def get_log_path():
-    '''
-    Function to replace '//' with '/' for logs path
-    '''
-    try:
-        path = logs_folder_path+"/log.txt"
-        return path.replace("//","/")
-    except Exception as e:
-        critical_error_log("Failed getting log path! So assigning default logs path: './logs/log.txt'", e)
-        return "logs/log.txt"
-
-
-__logs_file_path = get_log_path()
-
-
-def print_lg(*msgs: str | dict, end: str = "\n", pretty: bool = False, flush: bool = False, from_critical: bool = False) -> None:
+def print_lg(*msgs: str | dict, end: str = "\n", pretty: bool = False, flush: bool = False, from_critical: bool = False, level: LogLevel = "info") -> None:
     '''
     Function to log and print. **Note that, `end` and `flush` parameters are ignored if `pretty = True`**
+    * Each call is one record in `log.jsonl`, buffered and written in the background (See `modules/logs/writer.py`)
+    * `level` is saved with the record, `from_critical = True` logs it as an "error"
     '''
     try:
         for message in msgs:
             pprint(message) if pretty else print(message, end=end, flush=flush)
-            with open(__logs_file_path, 'a+', encoding="utf-8") as file:
-                file.write(str(message) + end)
+        get_log_writer().write("".join(str(message) + ("\n" if pretty else end) for message in msgs), "error" if from_critical else level)
     except Exception as e:
-        trail = f'Skipped saving this message: "{message}" to log.txt!' if from_critical else "We'll try one more time to log..."
-        alert(f"log.txt in {logs_folder_path} is open or is occupied by another program! Please close it! {trail}", "Failed Logging")
+        trail = "Skipped logging this message!" if from_critical else "We'll try one more time to log..."
+        alert(f"Failed to log a message in {logs_folder_path}! {trail}", "Failed Logging")
         if not from_critical:
-            critical_error_log("Log.txt is open or is occupied by another program!", e)
+            critical_error_log("Failed to log a message!", e)
+
+use_print_lg(print_lg)
 #>
 
 
@@ -0,0 +1,308 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import re
+import csv
+import zlib
+import argparse
+import threading
+
+from hashlib import sha256
+
+from config.settings import file_name, failed_file_name, history_backend, history_fsync, archive_descriptions, description_archive_path
+from modules.logs.console import print_lg
+from modules.history.files import open_history, is_compressed
+from modules.history.locking import file_lock
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+
+#### Job description archive ####
+'''
+Job descriptions are stored once in `descriptions.pack` inside `description_archive_path`, each one as a compressed block,
+and the history files only keep a reference to it like "sha256:<hash of the text>".
+* `descriptions.pack` - Compressed blocks, first byte tells the codec (b"Z" zlib, b"S" zstd if `zstandard` is installed)
+* `descriptions.idx`  - One "<hash> <offset> <length>" line per block, appended after the block is written
+Blocks are `fsync`ed as often as the history rows that reference them (`history_fsync` in `config/settings.py`), so after a crash
+the history never holds references to blocks that were lost.
+'''
+
+REF_PREFIX = "sha256:"
+re_ref = re.compile(r"sha256:[0-9a-f]{64}")
+
+# Texts shorter than this are kept as they are, the reference would save nothing
+MIN_ARCHIVE_LENGTH = 200
+
+# Messages written by `get_job_description()` and `check_blacklist()` in `runAiBot.py` when skipping a job, they repeat the whole text
+re_skip_message = re.compile(r'^\n"?(?P<text>.{%d,}?)"?\n\n(?P<reason>Contains |Found "Clearance"|Experience required )' % MIN_ARCHIVE_LENGTH, re.DOTALL)
+
+
+def compress(data: bytes) -> bytes:
+    if zstandard: return b"S" + zstandard.ZstdCompressor(level=10).compress(data)
+    return b"Z" + zlib.compress(data, 9)
+
+
+def decompress(block: bytes) -> bytes:
+    codec, data = block[:1], block[1:]
+    if codec == b"S":
+        if not zstandard: raise ValueError('Description was compressed with zstd, install "zstandard" to read it')
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+
+class DescriptionArchive:
+    '''
+    Content addressed store of compressed job descriptions, identical texts are stored only once.
+    * `fsync` is `"none"`, `"batch"` (Pack and index after every new block) or `"exit"` (Only the pack before its index line, the rest in `sync()`)
+    '''
+    def __init__(self, directory: str = description_archive_path, fsync: str = history_fsync) -> None:
+        self.pack_path = os.path.join(directory, "descriptions.pack")
+        self.index_path = os.path.join(directory, "descriptions.idx")
+        self.fsync = fsync
+        os.makedirs(os.path.dirname(self.pack_path) or ".", exist_ok=True)
+        self.__index = {}
+        self.__index_read_upto = 0
+        self.__lock = threading.Lock()
+
+    def __refresh(self) -> None:
+        '''
+        Reads lines appended to the index since last time (Skips a last line cut short by a crash)
+        '''
+        if not os.path.exists(self.index_path): return
+        if os.path.getsize(self.index_path) == self.__index_read_upto: return
+        with open(self.index_path, "rb") as file:
+            file.seek(self.__index_read_upto)
+            for line in file:
+                if not line.endswith(b"\n"): break
+                digest, offset, length = line.decode().split()
+                self.__index[digest] = (int(offset), int(length))
+                self.__index_read_upto += len(line)
+
+    def __contains__(self, ref: str) -> bool:
+        with self.__lock:
+            self.__refresh()
+            return ref[len(REF_PREFIX):] in self.__index
+
+    def put(self, text: str) -> str:
+        '''
+        Archives `text` if it's not archived already, and returns its reference
+        '''
+        data = text.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        with self.__lock:
+            self.__refresh()
+            if digest in self.__index: return REF_PREFIX + digest
+            with file_lock(self.pack_path):
+                self.__refresh()    # Another process might have archived it meanwhile
+                if digest not in self.__index:
+                    block = compress(data)
+                    with open(self.pack_path, "ab") as file:
+                        offset = file.tell()
+                        file.write(block)
+                        # The block must be on disk before an index line points to it
+                        if self.fsync != "none":
+                            file.flush()
+                            os.fsync(file.fileno())
+                    with open(self.index_path, "ab") as file:
+                        file.write(f"{digest} {offset} {len(block)}\n".encode())
+                        if self.fsync == "batch":
+                            file.flush()
+                            os.fsync(file.fileno())
+                    self.__refresh()
+        return REF_PREFIX + digest
+
+    def sync(self) -> None:
+        '''
+        Makes sure archived blocks and their index lines are on disk, call before syncing history rows that reference them
+        '''
+        for path in (self.pack_path, self.index_path):
+            if not os.path.exists(path): continue
+            with open(path, "rb+") as file:
+                os.fsync(file.fileno())
+
+    def get(self, ref: str) -> str:
+        '''
+        Returns the archived text of `ref`, raises `KeyError` if it's not in the archive
+        '''
+        digest = ref[len(REF_PREFIX):]
+        with self.__lock:
+            self.__refresh()
+            if digest not in self.__index: raise KeyError(f'"{ref}" is not in the description archive')
+            offset, length = self.__index[digest]
+        with open(self.pack_path, "rb") as file:
+            file.seek(offset)
+            return decompress(file.read(length)).decode("utf-8")
+
+    def resolve(self, value: str) -> str:
+        '''
+        Replaces every reference in `value` with its text. Unknown references are left as they are
+        '''
+        if not value or REF_PREFIX not in value: return value
+        def load(match: re.Match) -> str:
+            try:
+                return self.get(match.group(0))
+            except KeyError:
+                return match.group(0)
+        return re_ref.sub(load, value)
+
+
+
+#< Shared archive
+__archive = None
+
+def get_description_archive() -> DescriptionArchive:
+    '''
+    Returns the archive at `description_archive_path` in `config/settings.py`
+    '''
+    global __archive
+    if __archive is None: __archive = DescriptionArchive()
+    return __archive
+
+
+def archive_text(text: str) -> str:
+    '''
+    Returns the reference of `text` after archiving it, or `text` itself if `archive_descriptions = False` or it's too short to bother
+    '''
+    if not archive_descriptions or not isinstance(text, str) or len(text) < MIN_ARCHIVE_LENGTH: return text
+    return get_description_archive().put(text)
+
+
+def archive_within(message: str, text: str | None) -> str:
+    '''
+    Replaces `text` inside `message` (Eg: a skip message that repeats the job description) with its reference
+    '''
+    message = str(message)
+    if not text or text not in message: return message
+    return message.replace(text, archive_text(text))
+
+
+def archive_skip_message(message: str) -> str:
+    '''
+    Archives the job description or about company text repeated inside a skip message (Used for 'Stack Trace' of failed jobs)
+    '''
+    message = str(message)
+    match = re_skip_message.match(message)
+    return archive_within(message, match.group("text")) if match else message
+
+
+def resolve_text(value: str) -> str:
+    '''
+    Lazily loads archived text, returns `value` with every reference replaced by its text
+    '''
+    return get_description_archive().resolve(value)
+#>
+
+
+
+#< Migration of existing history
+def migrate_csv(path: str, field: str, convert) -> int:
+    '''
+    Rewrites `field` of every row in the CSV at `path` (Plain or `.gz`) with `convert(value)`. Returns the number of changed rows.
+    * Its Job ID and row offset indexes are removed, since they point into the old file. They're rebuilt on next use
+    '''
+    if not os.path.exists(path): return 0
+    changed = 0
+    temp_path = path + ".tmp"
+    compressed = is_compressed(path)
+    with file_lock(path):
+        with open_history(path, "r") as source, open_history(temp_path, "w", compressed) as target:
+            reader = csv.DictReader(source)
+            writer = csv.DictWriter(target, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for row in reader:
+                value = convert(row[field])
+                if value != row[field]:
+                    row[field] = value
+                    changed += 1
+                writer.writerow(row)
+            target.flush()
+            if not compressed: os.fsync(target.fileno())
+        os.replace(temp_path, path)
+        base = os.path.splitext(path[:-len(".gz")] if compressed else path)[0]
+        for stale_path in (base + ".ids", base + ".ids.log", base + ".offsets"):
+            if os.path.exists(stale_path): os.remove(stale_path)
+    return changed
+
+
+def migrate_partitions(store) -> tuple[int, int]:
+    '''
+    Runs `migrate_csv()` on both files of every monthly partition of the partitioned history `store`, one partition at a time while
+    holding the manifest lock (Like compaction). Returns the number of changed applied and failed rows.
+    '''
+    applied = failed = 0
+    for month in sorted(store.manifest()["partitions"]):
+        with file_lock(store.manifest_path):
+            manifest = store.manifest()
+            if month not in manifest["partitions"]: continue
+            paths = store.partition(month).paths
+            applied += migrate_csv(paths["applied"], "About Job", archive_text)
+            failed += migrate_csv(paths["failed"], "Stack Trace", archive_skip_message)
+            # Rewritten to change its stamp, so readers don't keep serving cached rows of the old files
+            store.write_manifest(manifest)
+    return applied, failed
+
+
+def migrate_sqlite(store, table: str, column: str, convert) -> int:
+    '''
+    Rewrites `column` of every row in `table` of the SQLite history `store` with `convert(value)`. Returns the number of changed rows.
+    '''
+    conn = store.connection()
+    changes = []
+    for seq, value in conn.execute(f"SELECT seq, {column} FROM {table}"):
+        converted = convert(value)
+        if converted != value: changes.append((converted, seq))
+    with conn:
+        conn.executemany(f"UPDATE {table} SET {column} = ? WHERE seq = ?", changes)
+    return len(changes)
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the job description archive.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_parser = commands.add_parser("show", help="Print the text of an archived description")
+    show_parser.add_argument("ref", help='Reference from the history, Eg: "sha256:..."')
+    commands.add_parser("migrate", help="Move descriptions in the existing history (Of `history_backend` in config/settings.py) into the archive")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(resolve_text(args.ref))
+    elif args.command == "migrate":
+        archive_descriptions = True
+        if history_backend == "sqlite":
+            from modules.history.store import get_history_store
+            store = get_history_store()
+            applied = migrate_sqlite(store, "applied", "about_job", archive_text)
+            failed = migrate_sqlite(store, "failed", "stack_trace", archive_skip_message)
+            with store.connection() as conn: conn.execute("VACUUM")
+            print_lg(f"Archived descriptions of {applied} applied and {failed} failed jobs.")
+        elif history_backend == "partitioned":
+            from modules.history.partitions import PartitionedHistoryStore
+            applied, failed = migrate_partitions(PartitionedHistoryStore())
+            print_lg(f"Archived descriptions of {applied} applied and {failed} failed jobs in the monthly partitions.")
+        else:
+            before = sum(os.path.getsize(path) for path in (file_name, failed_file_name) if os.path.exists(path))
+            applied = migrate_csv(file_name, "About Job", archive_text)
+            failed = migrate_csv(failed_file_name, "Stack Trace", archive_skip_message)
+            after = sum(os.path.getsize(path) for path in (file_name, failed_file_name) if os.path.exists(path))
+            print_lg(f"Archived descriptions of {applied} applied and {failed} failed jobs. History files went from {before} to {after} bytes.")
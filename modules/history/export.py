@@ -0,0 +1,241 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import re
+import ast
+import json
+import argparse
+
+from datetime import datetime
+from itertools import islice
+
+from config.settings import file_name
+from modules.logs.console import print_lg
+from modules.history.archive import resolve_text
+from modules.history.store import HistoryKind, HistoryStore, get_history_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+
+#### Parquet export of history ####
+'''
+Exports the history to typed Parquet tables for analysis (Eg: `pandas.read_parquet("all excels/parquet/applied")`).
+Needs `pyarrow`, install it with `pip install pyarrow`.
+
+Each table is a folder of Parquet files, every export adds one file with the rows written since the last one:
+* `applied`, `failed`           - One row per job, with int64 Job IDs, timestamps and categorical companies, work styles and reasons
+* `applied_text`, `failed_text` - The long 'About Job' and 'Stack Trace' texts (Archived descriptions are exported in full)
+* `applied_questions`           - One row per question answered in 'Questions Found'
+Tables are joined on `seq`, the position of the row in its history.
+'''
+
+EXPORT_PATH = os.path.join(os.path.dirname(file_name), "parquet")
+BATCH_SIZE = 10_000
+PART_NAME = re.compile(r"part-(\d{10})-\d{14}\.parquet")
+
+
+def to_job_id(value: str) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_timestamp(value: str) -> datetime | None:
+    '''
+    Returns `None` for dates like "Unknown" or "Pending"
+    '''
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_questions(value: str) -> list[tuple]:
+    '''
+    Parses 'Questions Found', written as the `repr()` of a set of `(question, answer, type, previous answer)` tuples
+    '''
+    if not value or not value.startswith("{"): return []
+    try:
+        questions = ast.literal_eval(value)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return [(value, None, None, None)]
+    return [tuple(question) + (None,) * (4 - len(question)) for question in questions if isinstance(question, tuple)]
+
+
+def schemas() -> dict[str, 'pa.Schema']:
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        "applied": pa.schema([
+            ("seq", pa.int64()), ("job_id", pa.int64()), ("title", pa.string()), ("company", category),
+            ("work_location", category), ("work_style", category), ("experience_required", pa.int64()),
+            ("skills_required", pa.string()), ("hr_name", pa.string()), ("hr_link", pa.string()), ("resume", pa.string()),
+            ("reposted", pa.bool_()), ("date_posted", pa.timestamp("us")), ("date_applied", pa.timestamp("us")),
+            ("job_link", pa.string()), ("external_job_link", pa.string()), ("connect_request", category),
+        ]),
+        "applied_text": pa.schema([("seq", pa.int64()), ("job_id", pa.int64()), ("about_job", pa.large_string())]),
+        "applied_questions": pa.schema([
+            ("seq", pa.int64()), ("job_id", pa.int64()), ("question", pa.string()), ("answer", pa.string()),
+            ("type", category), ("previous_answer", pa.string()),
+        ]),
+        "failed": pa.schema([
+            ("seq", pa.int64()), ("job_id", pa.int64()), ("job_link", pa.string()), ("resume_tried", pa.string()),
+            ("date_listed", pa.timestamp("us")), ("date_tried", pa.timestamp("us")), ("assumed_reason", category),
+            ("external_job_link", category), ("screenshot_name", pa.string()),
+        ]),
+        "failed_text": pa.schema([("seq", pa.int64()), ("job_id", pa.int64()), ("stack_trace", pa.large_string())]),
+    }
+
+
+def to_records(kind: HistoryKind, seq: int, row: dict) -> dict[str, list[dict]]:
+    '''
+    Splits a history row into its records in each table
+    '''
+    job_id = to_job_id(row.get("Job ID"))
+    if kind == "failed":
+        return {
+            "failed": [{
+                "seq": seq, "job_id": job_id, "job_link": row.get("Job Link"), "resume_tried": row.get("Resume Tried"),
+                "date_listed": to_timestamp(row.get("Date listed")), "date_tried": to_timestamp(row.get("Date Tried")),
+                "assumed_reason": row.get("Assumed Reason"), "external_job_link": row.get("External Job link"), "screenshot_name": row.get("Screenshot Name"),
+            }],
+            "failed_text": [{"seq": seq, "job_id": job_id, "stack_trace": resolve_text(row.get("Stack Trace"))}],
+        }
+    return {
+        "applied": [{
+            "seq": seq, "job_id": job_id, "title": row.get("Title"), "company": row.get("Company"),
+            "work_location": row.get("Work Location"), "work_style": row.get("Work Style"),
+            "experience_required": to_job_id(row.get("Experience required")), "skills_required": row.get("Skills required"),
+            "hr_name": row.get("HR Name"), "hr_link": row.get("HR Link"), "resume": row.get("Resume"),
+            "reposted": {"True": True, "False": False}.get(row.get("Re-posted")),
+            "date_posted": to_timestamp(row.get("Date Posted")), "date_applied": to_timestamp(row.get("Date Applied")),
+            "job_link": row.get("Job Link"), "external_job_link": row.get("External Job link"), "connect_request": row.get("Connect Request"),
+        }],
+        "applied_text": [{"seq": seq, "job_id": job_id, "about_job": resolve_text(row.get("About Job"))}],
+        "applied_questions": [
+            {"seq": seq, "job_id": job_id, "question": question, "answer": to_optional_text(answer), "type": to_optional_text(question_type), "previous_answer": to_optional_text(previous)}
+            for question, answer, question_type, previous in to_questions(row.get("Questions Found"))
+        ],
+    }
+
+
+def to_optional_text(value) -> str | None:
+    return None if value is None else str(value)
+
+
+
+class ParquetExporter:
+    '''
+    Incrementally exports `store` to Parquet tables in `directory`. `export_state.json` keeps the number of rows exported from each history
+    '''
+    def __init__(self, store: HistoryStore, directory: str = EXPORT_PATH) -> None:
+        if pa is None: raise ImportError('Exporting to Parquet needs "pyarrow", install it with `pip install pyarrow`')
+        self.store = store
+        self.directory = directory
+        self.state_path = os.path.join(directory, "export_state.json")
+        self.schemas = schemas()
+
+    def read_state(self) -> dict[str, int]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"applied": 0, "failed": 0}
+
+    def export(self, full: bool = False) -> dict[str, int]:
+        '''
+        Exports rows written since the last export (All of them if `full`), returns the number of rows exported from each history.
+        * If the history has fewer rows than were exported (Eg: after compaction), run a `full` export
+        '''
+        if full: self.clear()
+        os.makedirs(self.directory, exist_ok=True)
+        state = self.read_state()
+        exported = {}
+        for kind in ("applied", "failed"):
+            # Parts of rows not in the state are left over from an interrupted export, they're exported again
+            self.remove_parts(kind, state[kind])
+            try:
+                rows = islice(self.store.iter_rows(kind), state[kind], None)
+                exported[kind] = self.__export_rows(kind, rows, state[kind])
+            except FileNotFoundError:
+                exported[kind] = 0
+            state[kind] += exported[kind]
+            with open(self.state_path, "w", encoding="utf-8") as file:
+                json.dump(state, file)
+        return exported
+
+    def remove_parts(self, kind: HistoryKind | None = None, first_seq: int = 0) -> None:
+        '''
+        Deletes the part files of `kind` (All tables if `None`) holding rows from `first_seq` on. Other files in the tables are left alone
+        '''
+        for name in self.schemas:
+            if kind is not None and not name.startswith(kind): continue
+            table = os.path.join(self.directory, name)
+            if not os.path.isdir(table): continue
+            for part in os.listdir(table):
+                match = PART_NAME.fullmatch(part)
+                if match and int(match.group(1)) >= first_seq: os.remove(os.path.join(table, part))
+
+    def clear(self) -> None:
+        '''
+        Deletes the previous export, only its part files and `export_state.json` are removed
+        '''
+        self.remove_parts()
+        for name in self.schemas:
+            table = os.path.join(self.directory, name)
+            if os.path.isdir(table) and not os.listdir(table): os.rmdir(table)
+        if os.path.exists(self.state_path): os.remove(self.state_path)
+
+    def __export_rows(self, kind: HistoryKind, rows, first_seq: int) -> int:
+        tables = [name for name in self.schemas if name.startswith(kind)]
+        part_name = f"part-{first_seq:010d}-{datetime.now():%Y%m%d%H%M%S}.parquet"
+        writers = {}
+        count = 0
+        try:
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch: break
+                records = {name: [] for name in tables}
+                for seq, row in enumerate(batch, first_seq + count):
+                    for name, table_records in to_records(kind, seq, row).items():
+                        records[name].extend(table_records)
+                for name in tables:
+                    if name not in writers:
+                        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+                        writers[name] = pq.ParquetWriter(os.path.join(self.directory, name, part_name), self.schemas[name], compression="zstd")
+                    writers[name].write_table(pa.Table.from_pylist(records[name], schema=self.schemas[name]))
+                count += len(batch)
+        finally:
+            for writer in writers.values(): writer.close()
+        return count
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the application history to Parquet tables.")
+    parser.add_argument("--out", default=EXPORT_PATH, help=f'Folder to export to (Default "{EXPORT_PATH}")')
+    parser.add_argument("--full", action="store_true", help="Delete the previous export and export everything again")
+    args = parser.parse_args()
+
+    exporter = ParquetExporter(get_history_store(), args.out)
+    exported = exporter.export(args.full)
+    print_lg(f'Exported {exported["applied"]} applied and {exported["failed"]} failed jobs to "{args.out}".')
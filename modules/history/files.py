@@ -0,0 +1,39 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import gzip
+
+from typing import IO
+
+
+
+#### History file helpers ####
+
+def is_compressed(path: str) -> bool:
+    '''
+    Returns `True` for history files moved to compressed storage, Eg: "2024-01/applied.csv.gz"
+    '''
+    return path.endswith(".gz")
+
+
+def open_history(path: str, mode: str = "r", compressed: bool | None = None) -> IO:
+    '''
+    Opens a history CSV in text `mode`, transparently (de)compressing `.gz` files.
+    * `compressed` overrides the check on `path`, Eg: for temporary files that will replace a `.gz` file
+    '''
+    if compressed is None: compressed = is_compressed(path)
+    if compressed: return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
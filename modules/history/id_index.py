@@ -0,0 +1,209 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import csv
+import mmap
+import struct
+import argparse
+import threading
+
+from array import array
+from bisect import bisect_left
+
+from config.settings import file_name
+from modules.logs.console import print_lg
+from modules.history.files import is_compressed, open_history
+
+
+
+#### Applied Job ID index ####
+'''
+Sidecar files kept next to the applied jobs CSV so `get_applied_job_ids()` doesn't have to parse the whole history.
+* `<csv name>.ids`     - 16 byte header (magic + size of the CSV it was built from) followed by a sorted int64 array of Job IDs
+* `<csv name>.ids.log` - int64 Job IDs appended since the last merge (unsorted)
+
+The `.ids` file is memory mapped and binary searched, the `.ids.log` is merged into it once it grows past `MERGE_AFTER` entries.
+If the recorded CSV size doesn't match the actual file (Eg: CSV was edited by hand), the index is rebuilt from the CSV.
+'''
+
+MAGIC = b"JIDX"
+HEADER = struct.Struct("<4s4xq")
+ITEM_SIZE = 8
+MERGE_AFTER = 4096
+
+
+def to_int_id(job_id: str | int) -> int | None:
+    '''
+    Converts a Job ID to `int`, returns `None` for non numeric values (Eg: the CSV header)
+    '''
+    try:
+        return int(job_id)
+    except (TypeError, ValueError):
+        return None
+
+
+
+class JobIdIndex:
+    '''
+    Set-like index of applied Job IDs, supports `in` and `add()` so it can be used in place of a `set`.
+    * `add()` only updates memory, use `record()` to persist Job IDs written to the CSV
+    * Loads (or rebuilds) the index from disk on creation, unless `load = False`
+    * With `persist = False` an out of date index is rebuilt in memory only, for readers that must not replace the files
+    * Safe to use from the bot while the history writer thread records new Job IDs
+    '''
+    def __init__(self, csv_path: str = file_name, load: bool = True, persist: bool = True) -> None:
+        self.csv_path = csv_path
+        self.persist = persist
+        self.path = os.path.splitext(csv_path)[0] + ".ids"
+        self.log_path = self.path + ".log"
+        self.source_size = -1
+        self.__file = None
+        self.__map = None
+        self.__sorted = memoryview(b"").cast("q")
+        self.__tail = set()
+        self.__extra = set()
+        self.__lock = threading.RLock()
+        if load: self.refresh()
+
+    #< Loading
+    def refresh(self) -> None:
+        '''
+        Loads the index from disk, rebuilding it if it's missing or out of date with the CSV
+        '''
+        with self.__lock:
+            csv_size = os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+            if csv_size == self.source_size: return
+            try:
+                self.__load()
+            except (OSError, ValueError):
+                self.source_size = -1
+            if self.source_size != csv_size:
+                self.rebuild()
+
+    def __load(self) -> None:
+        self.close()
+        with open(self.path, "rb") as file:
+            magic, source_size = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC: raise ValueError(f'"{self.path}" is not a Job ID index')
+        self.__file = open(self.path, "rb")
+        if os.path.getsize(self.path) > HEADER.size:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__sorted = memoryview(self.__map)[HEADER.size:].cast("q")
+        tail = array("q")
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as file:
+                data = file.read()
+            tail.frombytes(data[:len(data) - len(data) % ITEM_SIZE])
+        self.__tail = set(tail)
+        self.source_size = source_size
+
+    def close(self) -> None:
+        '''
+        Releases the memory map (Needed before the `.ids` file can be replaced on Windows)
+        '''
+        self.__sorted.release()
+        self.__sorted = memoryview(b"").cast("q")
+        if self.__map is not None: self.__map.close()
+        if self.__file is not None: self.__file.close()
+        self.__map = None
+        self.__file = None
+    #>
+
+    #< Set-like interface
+    def __contains__(self, job_id: str | int) -> bool:
+        if job_id in self.__extra: return True
+        value = to_int_id(job_id)
+        if value is None: return False
+        with self.__lock:
+            if value in self.__tail: return True
+            position = bisect_left(self.__sorted, value)
+            return position < len(self.__sorted) and self.__sorted[position] == value
+
+    def __len__(self) -> int:
+        return len(self.__sorted) + len(self.__tail)
+
+    def add(self, job_id: str | int) -> None:
+        '''
+        Adds `job_id` in memory only
+        '''
+        self.__extra.add(job_id)
+    #>
+
+    #< Writing
+    def record(self, job_ids: list[str], source_size: int) -> None:
+        '''
+        Persists `job_ids` that were just appended to the CSV, `source_size` is the size of the CSV after that append
+        '''
+        values = array("q", [value for value in map(to_int_id, job_ids) if value is not None])
+        with self.__lock:
+            with open(self.log_path, "ab") as file:
+                values.tofile(file)
+            self.__tail.update(values)
+            self.__write_source_size(source_size)
+            if len(self.__tail) > MERGE_AFTER:
+                self.__write(sorted(set(self.__sorted) | self.__tail), source_size)
+
+    def __write_source_size(self, source_size: int) -> None:
+        with open(self.path, "r+b") as file:
+            file.write(HEADER.pack(MAGIC, source_size))
+        self.source_size = source_size
+
+    def __write(self, job_ids: list[int], source_size: int) -> None:
+        self.close()
+        temp_path = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, source_size))
+            array("q", job_ids).tofile(file)
+        os.replace(temp_path, self.path)
+        if os.path.exists(self.log_path): os.remove(self.log_path)
+        self.__load()
+
+    def rebuild(self) -> None:
+        '''
+        Regenerates the index from the CSV file
+        '''
+        job_ids = set()
+        source_size = 0
+        if os.path.exists(self.csv_path):
+            with open_history(self.csv_path) as file:
+                for row in csv.reader(file):
+                    value = to_int_id(row[0]) if row else None
+                    if value is not None: job_ids.add(value)
+                # Compressed history is never appended to, so its size can't change while reading
+                source_size = os.path.getsize(self.csv_path) if is_compressed(self.csv_path) else file.tell()
+        if not self.persist:
+            self.close()
+            self.__tail = job_ids
+            self.source_size = source_size
+            return
+        self.__write(sorted(job_ids), source_size)
+        print_lg(f'Rebuilt Job ID index "{self.path}" with {len(job_ids)} Job IDs.')
+    #>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the applied Job ID index.")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: regenerate the index from the applied jobs CSV")
+    parser.add_argument("--csv", default=file_name, help="Path of the applied jobs CSV")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        index = JobIdIndex(args.csv, load=False)
+        index.rebuild()
+        index.close()
@@ -0,0 +1,69 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+
+from time import monotonic, sleep
+from contextlib import contextmanager
+from typing import Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+
+#### Cross process file locks ####
+
+def __try_lock(file) -> None:
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def __unlock(file) -> None:
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: str, timeout: float = 30.0) -> Iterator[None]:
+    '''
+    Holds an exclusive lock on `<path>.lock` while in the `with` block.
+    * Used by the bot and the dashboard around every write to the history files and the log, so they never write at the same time
+    * Raises `TimeoutError` if the lock couldn't be acquired within `timeout` seconds
+    '''
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as file:
+        deadline = monotonic() + timeout
+        while True:
+            try:
+                __try_lock(file)
+                break
+            except OSError:
+                if monotonic() > deadline: raise TimeoutError(f'Timed out waiting for lock on "{path}"')
+                sleep(0.05)
+        try:
+            yield
+        finally:
+            __unlock(file)
@@ -0,0 +1,477 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import csv
+import json
+import errno
+import argparse
+import threading
+
+from datetime import datetime
+from contextlib import contextmanager, ExitStack
+from itertools import chain, islice
+from typing import Iterator
+
+from config.settings import history_partitions_path
+from modules.logs.console import print_lg
+from modules.history.files import open_history
+from modules.history.locking import file_lock
+from modules.history.store import FIELDS, DATE_FIELDS, HistoryKind, HistoryStore, CSVHistoryStore, to_text, import_csv, file_stamp
+
+
+
+#### Monthly history partitions ####
+'''
+History split into one folder per month inside `history_partitions_path`, each holding its own `applied.csv` and `failed.csv`
+(with their own Job ID index, row offset index and updates journal, see `CSVHistoryStore`).
+* Rows go to the month of their 'Date Applied' or 'Date Tried', or the current month for dates like "Pending"
+* `manifest.json` lists every partition with its row counts and first and last dates, readers use it to skip
+  partitions outside the asked date range without opening them
+* `python -m modules.history.partitions compact` deduplicates partitions, moves old ones to `.csv.gz` files and merges the months
+  of years that are entirely old into one "YYYY" partition, so cold history isn't spread over many small files
+
+    {"partitions": {"2025-01": {"compressed": false, "applied": {"rows": 120, "first": "2025-01-02 ...", "last": "2025-01-31 ..."}, "failed": {...}}}, "rewrites": 3}
+
+`rewrites` counts partitions rewritten by compaction, which can drop rows, so delta syncs know to start over (See `updates_stamp()`).
+'''
+
+MONTH_FORMAT = "%Y-%m"
+
+
+def month_of(kind: HistoryKind, row: dict) -> str:
+    '''
+    Returns the "YYYY-MM" partition of `row`
+    '''
+    date = row.get(DATE_FIELDS[kind])
+    if isinstance(date, datetime): return date.strftime(MONTH_FORMAT)
+    date = to_text(date)
+    return date[:7] if date[:1].isdigit() and len(date) >= 7 else datetime.now().strftime(MONTH_FORMAT)
+
+
+def is_year(month: str) -> bool:
+    '''
+    Returns `True` for partitions of a whole year merged by compaction, Eg: "2024"
+    '''
+    return len(month) == 4
+
+
+def months_between(older: str, newer: str) -> int:
+    return (int(newer[:4]) - int(older[:4])) * 12 + int(newer[5:7]) - int(older[5:7])
+
+
+
+class PartitionedHistoryStore(HistoryStore):
+    '''
+    Stores history in monthly partitions at `history_partitions_path` in `config/settings.py`.
+    * Reads with a date range only open the partitions overlapping it, and pages without filters skip whole partitions using their row counts
+    * Job ID lookups check the partitions' Job ID indexes newest first
+    '''
+    def __init__(self, directory: str = history_partitions_path) -> None:
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        self.__manifest = {"partitions": {}}
+        self.__manifest_stamp = None
+        self.__partitions = {}
+        self.__lock = threading.RLock()
+
+    #< Manifest
+    def manifest(self) -> dict:
+        '''
+        Returns the manifest, reloading it if another process changed it (Eg: compaction)
+        '''
+        with self.__lock:
+            try:
+                stat = os.stat(self.manifest_path)
+            except FileNotFoundError:
+                return self.__manifest
+            if (stat.st_size, stat.st_mtime_ns) != self.__manifest_stamp:
+                with open(self.manifest_path, "r", encoding="utf-8") as file:
+                    self.__manifest = json.load(file)
+                self.__manifest_stamp = (stat.st_size, stat.st_mtime_ns)
+            return self.__manifest
+
+    def write_manifest(self, manifest: dict) -> None:
+        '''
+        Replaces the manifest in one step, call while holding `file_lock(self.manifest_path)`
+        '''
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def months(self, kind: HistoryKind, filters: dict | None = None) -> list[str]:
+        '''
+        Returns the months having `kind` rows, oldest first. Months outside the 'date_from' and 'date_to' of `filters` are left out
+        '''
+        filters = filters or {}
+        date_from, date_to = filters.get("date_from"), filters.get("date_to")
+        months = []
+        for month, partition in sorted(self.manifest()["partitions"].items()):
+            stats = partition.get(kind)
+            if not stats or not stats["rows"]: continue
+            # Rows with dates like "Pending" never match a date range, so first and last cover every row that can
+            if date_from and (stats.get("last") or "") < date_from: continue
+            if date_to and (stats.get("first") or "~")[:len(date_to)] > date_to: continue
+            months.append(month)
+        return months
+    #>
+
+    #< Partitions
+    def partition_paths(self, month: str, compressed: bool = False) -> dict[str, str]:
+        extension = ".csv.gz" if compressed else ".csv"
+        return {kind: os.path.join(self.directory, month, kind + extension) for kind in FIELDS}
+
+    def partition(self, month: str) -> CSVHistoryStore:
+        '''
+        Returns the store of `month`, pointing at its compressed files if it was moved to cold storage
+        '''
+        compressed = self.manifest()["partitions"].get(month, {}).get("compressed", False)
+        paths = self.partition_paths(month, compressed)
+        with self.__lock:
+            store = self.__partitions.get(month)
+            if store is None or store.paths != paths:
+                store = self.__partitions[month] = CSVHistoryStore(paths["applied"], paths["failed"])
+            return store
+
+    def __require_history(self) -> None:
+        if not os.path.exists(self.manifest_path):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.manifest_path)
+    #>
+
+    #< Writing
+    def append(self, kind: HistoryKind, rows: list[dict]) -> None:
+        '''
+        Appends `rows` to the partitions of their months. Holds the manifest lock throughout, so compaction never sees rows missing from the manifest
+        '''
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(month_of(kind, row), []).append(row)
+        with file_lock(self.manifest_path):
+            manifest = self.manifest()
+            for month, month_rows in by_month.items():
+                partition = manifest["partitions"].setdefault(month, {"compressed": False})
+                if partition["compressed"]: warm_partition(self, month)
+                os.makedirs(os.path.dirname(self.partition_paths(month)[kind]) or ".", exist_ok=True)
+                self.partition(month).append(kind, month_rows)
+                add_stats(partition, kind, month_rows)
+            self.write_manifest(manifest)
+
+    def update_date_applied(self, job_id: str, date_applied: str) -> bool:
+        '''
+        Journals the new date in the partition holding `job_id`, and widens that partition's first and last dates to include it,
+        so reads with a date range still open the partition
+        '''
+        self.__require_history()
+        with file_lock(self.manifest_path):
+            manifest = self.manifest()
+            for month in reversed(self.months("applied")):
+                partition = self.partition(month)
+                if job_id not in partition.applied_job_ids(): continue
+                if not partition.update_date_applied(job_id, date_applied): return False
+                widen_stats(manifest["partitions"][month], "applied", [date_applied])
+                self.write_manifest(manifest)
+                return True
+        return False
+
+    def stamp(self, kind: HistoryKind) -> list[int]:
+        # Every write and compaction updates the manifest, dashboard updates only touch the journals of the partitions
+        journals = [self.partition(month).updates_path for month in self.months(kind)] if kind == "applied" else []
+        return file_stamp([self.manifest_path] + journals)
+
+    def updates_stamp(self, kind: HistoryKind) -> list[int]:
+        # The manifest changes on every write, so compaction counts its rewrites in it instead
+        journals = [self.partition(month).updates_path for month in self.months(kind)] if kind == "applied" else []
+        return [self.manifest().get("rewrites", 0)] + file_stamp([path for path in journals if os.path.exists(path)])
+
+    def sync(self) -> None:
+        for store in list(self.__partitions.values()): store.sync()
+    #>
+
+    #< Reading
+    def iter_rows(self, kind: HistoryKind) -> Iterator[dict]:
+        self.__require_history()
+        for month in self.months(kind):
+            yield from self.partition(month).iter_rows(kind)
+
+    def candidate_rows(self, kind: HistoryKind, filters: dict) -> Iterator[dict]:
+        self.__require_history()
+        for month in self.months(kind, filters):
+            yield from self.partition(month).iter_rows(kind)
+
+    def page(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int = 100, offset: int = 0, fields: list[str] | None = None) -> tuple[int, list[dict]]:
+        if sort_by or any(filters.values()): return super().page(kind, filters, sort_by, descending, limit, offset, fields)
+        # No filters or sorting, count from the manifest and only read the partitions the page is in
+        self.__require_history()
+        partitions = self.manifest()["partitions"]
+        total = sum(partitions[month][kind]["rows"] for month in self.months(kind))
+        return total, list(self.stream(kind, filters, None, False, limit, offset, fields))
+
+    def stream(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int | None = None, offset: int = 0, fields: list[str] | None = None) -> Iterator[dict]:
+        if sort_by or any(filters.values()):
+            yield from super().stream(kind, filters, sort_by, descending, limit, offset, fields)
+            return
+        self.__require_history()
+        partitions = self.manifest()["partitions"]
+        rows = iter(())
+        for month in self.months(kind):
+            count = partitions[month][kind]["rows"]
+            if offset >= count:
+                offset -= count
+                continue
+            rows = chain(rows, self.partition(month).iter_rows(kind))
+        yield from (row if fields is None else {field: row.get(field) for field in fields} for row in islice(rows, offset, None if limit is None else offset + limit))
+
+    def get(self, kind: HistoryKind, job_id: str) -> dict | None:
+        self.__require_history()
+        for month in reversed(self.months(kind)):
+            partition = self.partition(month)
+            if kind == "applied" and job_id not in partition.applied_job_ids(): continue
+            row = partition.get(kind, job_id)
+            if row is not None: return row
+        return None
+
+    def tail(self, kind: HistoryKind, count: int) -> list[dict]:
+        self.__require_history()
+        rows = []
+        for month in reversed(self.months(kind)):
+            if len(rows) >= count: break
+            rows = self.partition(month).tail(kind, count - len(rows)) + rows
+        return rows
+
+    def count(self, kind: HistoryKind) -> int:
+        self.__require_history()
+        partitions = self.manifest()["partitions"]
+        return sum(partitions[month][kind]["rows"] for month in self.months(kind))
+
+    def since(self, kind: HistoryKind, seq: int) -> tuple[int, list[dict]]:
+        # Counts come from the manifest, only partitions holding rows after `seq` are read.
+        # Rows are in month order, so this relies on new rows going to the newest month (As the bot's rows dated "now" do)
+        self.__require_history()
+        partitions = self.manifest()["partitions"]
+        count = sum(partitions[month][kind]["rows"] for month in self.months(kind))
+        return count, list(self.stream(kind, {}, None, False, max(0, count - seq), seq))
+
+    def applied_job_ids(self) -> 'PartitionedJobIds':
+        return PartitionedJobIds(self)
+
+    def close(self) -> None:
+        for store in list(self.__partitions.values()): store.close()
+    #>
+
+
+
+class PartitionedJobIds:
+    '''
+    Set-like view of applied Job IDs that checks the Job ID index of each partition, newest first
+    '''
+    def __init__(self, store: PartitionedHistoryStore) -> None:
+        self.store = store
+        self.__extra = set()
+
+    def __contains__(self, job_id: str) -> bool:
+        if job_id in self.__extra: return True
+        return any(job_id in self.store.partition(month).applied_job_ids() for month in reversed(self.store.months("applied")))
+
+    def add(self, job_id: str) -> None:
+        '''
+        Adds `job_id` in memory only, the store already has it once the job is saved
+        '''
+        self.__extra.add(job_id)
+
+
+
+#< Partition statistics
+def add_stats(partition: dict, kind: HistoryKind, rows: list[dict]) -> None:
+    '''
+    Adds `rows` to the row count and first and last dates of `kind` in the manifest entry `partition`
+    '''
+    partition.setdefault(kind, {"rows": 0, "first": None, "last": None})["rows"] += len(rows)
+    widen_stats(partition, kind, [row.get(DATE_FIELDS[kind]) for row in rows])
+
+
+def widen_stats(partition: dict, kind: HistoryKind, dates: list) -> None:
+    '''
+    Widens the first and last dates of `kind` in the manifest entry `partition` to include `dates`, ignoring ones like "Pending"
+    '''
+    stats = partition.setdefault(kind, {"rows": 0, "first": None, "last": None})
+    dates = [date for date in map(to_text, dates) if date[:1].isdigit()]
+    if dates:
+        stats["first"] = min(dates + ([stats["first"]] if stats["first"] else []))
+        stats["last"] = max(dates + ([stats["last"]] if stats["last"] else []))
+#>
+
+
+
+#< Compaction
+def rewrite_partition(store: PartitionedHistoryStore, month: str, kind: HistoryKind, rows: list[dict], compressed: bool) -> None:
+    '''
+    Replaces the `kind` file of `month` with `rows`, compressed or not, and removes its old file, updates journal and sidecar indexes.
+    * Call while holding `file_lock()` on both the plain and compressed paths
+    '''
+    old_paths = [paths[kind] for paths in (store.partition_paths(month, False), store.partition_paths(month, True))]
+    new_path = store.partition_paths(month, compressed)[kind]
+    if rows:
+        temp_path = new_path + ".tmp"
+        with open_history(temp_path, "w", compressed) as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS[kind], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(temp_path, new_path)
+    for path in old_paths:
+        base = os.path.splitext(path)[0]
+        stale = [base + ".ids", base + ".ids.log", base + ".offsets", base + ".updates.jsonl"]
+        if path != new_path or not rows: stale.append(path)
+        for stale_path in stale:
+            if os.path.exists(stale_path): os.remove(stale_path)
+
+
+@contextmanager
+def partition_lock(store: PartitionedHistoryStore, month: str, kind: HistoryKind) -> Iterator[None]:
+    '''
+    Holds `file_lock()` on both the plain and compressed file of `kind` in `month`
+    '''
+    plain, compressed = (paths[kind] for paths in (store.partition_paths(month, False), store.partition_paths(month, True)))
+    with file_lock(plain), file_lock(compressed):
+        yield
+
+
+def warm_partition(store: PartitionedHistoryStore, month: str) -> None:
+    '''
+    Moves a compressed partition back to plain CSV files, so rows can be appended to it. Call while holding `file_lock()` on the manifest
+    '''
+    manifest = store.manifest()
+    partition = manifest["partitions"][month]
+    cold = store.partition(month)
+    for kind in FIELDS:
+        if not partition.get(kind, {}).get("rows"): continue
+        with partition_lock(store, month, kind):
+            rewrite_partition(store, month, kind, list(cold.iter_rows(kind)), False)
+    partition["compressed"] = False
+    store.write_manifest(manifest)
+
+
+def compact(store: PartitionedHistoryStore, cold_after: int = 3) -> None:
+    '''
+    Rewrites every partition with its dashboard updates folded in, keeping only the newest row of each applied Job ID
+    and dropping repeated identical failed rows. Partitions `cold_after` or more months old are compressed,
+    and months of years whose December is that old are merged into one partition per year (See `merge_year()`).
+    * The manifest is locked one partition at a time, so the bot only waits for the partition being compacted
+    '''
+    this_month = datetime.now().strftime(MONTH_FORMAT)
+    seen_job_ids = set()
+    for month in sorted(store.manifest()["partitions"], reverse=True):
+        with file_lock(store.manifest_path):
+            manifest = store.manifest()
+            partition = manifest["partitions"].get(month)
+            if partition is None: continue
+            compressed = is_year(month) or months_between(month, this_month) >= cold_after
+            source = store.partition(month)
+            for kind in FIELDS:
+                if not partition.get(kind, {}).get("rows"): continue
+                with partition_lock(store, month, kind):
+                    before = partition[kind]["rows"]
+                    rows = compact_rows(kind, source.iter_rows(kind), seen_job_ids)
+                    rewrite_partition(store, month, kind, rows, compressed)
+                partition[kind] = {"rows": 0, "first": None, "last": None}
+                add_stats(partition, kind, rows)
+                if before != len(rows): print_lg(f"Dropped {before - len(rows)} duplicate {kind} rows from {month}.")
+            partition["compressed"] = compressed
+            manifest["rewrites"] = manifest.get("rewrites", 0) + 1
+            if not any(partition.get(kind, {}).get("rows") for kind in FIELDS):
+                del manifest["partitions"][month]
+                remove_partition_folder(store, month)
+            store.write_manifest(manifest)
+    for year in sorted({month[:4] for month in store.manifest()["partitions"]}):
+        if months_between(f"{year}-12", this_month) >= cold_after: merge_year(store, year)
+    print_lg(f'Compacted {len(store.manifest()["partitions"])} partitions in "{store.directory}".')
+
+
+def merge_year(store: PartitionedHistoryStore, year: str) -> None:
+    '''
+    Merges the monthly partitions of `year` (And its year partition, if merged before) into one compressed "YYYY" partition.
+    * Keys sort as "2024" < "2024-01" < "2025", so the merged partition keeps its place in the order of rows
+    * Rows of an old month written after the merge go to a new monthly partition again, merged by the next compaction
+    '''
+    with file_lock(store.manifest_path):
+        manifest = store.manifest()
+        keys = sorted(key for key in manifest["partitions"] if key[:4] == year)
+        if keys in ([], [year]): return
+        merged = {"compressed": True}
+        with ExitStack() as locks:
+            for key in set(keys) | {year}:
+                for kind in FIELDS: locks.enter_context(partition_lock(store, key, kind))
+            rows = {kind: [row for key in keys if manifest["partitions"][key].get(kind, {}).get("rows") for row in store.partition(key).iter_rows(kind)] for kind in FIELDS}
+            for kind in FIELDS:
+                os.makedirs(os.path.dirname(store.partition_paths(year)[kind]) or ".", exist_ok=True)
+                rewrite_partition(store, year, kind, rows[kind], True)
+                merged[kind] = {"rows": 0, "first": None, "last": None}
+                add_stats(merged, kind, rows[kind])
+                for key in keys:
+                    if key != year: rewrite_partition(store, key, kind, [], False)
+        for key in keys:
+            del manifest["partitions"][key]
+            if key != year: remove_partition_folder(store, key)
+        manifest["partitions"][year] = merged
+        store.write_manifest(manifest)
+    print_lg(f'Merged {len(keys)} partitions of {year} into "{year}".')
+
+
+def remove_partition_folder(store: PartitionedHistoryStore, month: str) -> None:
+    '''
+    Removes the folder of a partition that was dropped from the manifest, if only its lock files are left in it.
+    * Call while holding `file_lock()` on the manifest. Every access to a partition starts with that lock, so the lock files can go too
+    '''
+    folder = os.path.join(store.directory, month)
+    try:
+        names = os.listdir(folder)
+        if not all(name.endswith(".lock") for name in names): return
+        for name in names: os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+    except OSError:
+        pass    # Gone already, or the files are open on Windows
+
+
+def compact_rows(kind: HistoryKind, rows: Iterator[dict], seen_job_ids: set[str]) -> list[dict]:
+    '''
+    Returns `rows` without duplicates. Partitions are compacted newest first, so `seen_job_ids` holds applied Job IDs of newer partitions
+    '''
+    if kind == "failed":
+        return list({tuple(row.items()): row for row in rows}.values())
+    kept = []
+    for row in reversed(list(rows)):
+        if row['Job ID'] in seen_job_ids: continue
+        seen_job_ids.add(row['Job ID'])
+        kept.append(row)
+    kept.reverse()
+    return kept
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly history partitions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact_parser = commands.add_parser("compact", help="Deduplicate partitions and compress old ones")
+    compact_parser.add_argument("--cold-after", type=int, default=3, help="Compress partitions this many months old or older (Default 3)")
+    commands.add_parser("import", help="Split the CSV files given in config/settings.py into monthly partitions")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        compact(PartitionedHistoryStore(), args.cold_after)
+    elif args.command == "import":
+        import_csv(PartitionedHistoryStore(), CSVHistoryStore())
@@ -0,0 +1,272 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import csv
+import mmap
+import zlib
+import struct
+import argparse
+import threading
+
+from array import array
+from contextlib import contextmanager
+from typing import Iterator
+
+from config.settings import file_name, failed_file_name
+from modules.logs.console import print_lg
+from modules.history.locking import file_lock
+
+
+
+#### Random access reader for history CSVs ####
+'''
+Sidecar file kept next to each history CSV so a row can be read by Job ID without parsing the rows before it.
+* `<csv name>.offsets` - 24 byte header followed by one `(job_id, start, end)` int64 triple per row, in the order of the CSV
+
+The header holds the number of CSV bytes indexed so far and a checksum of the bytes just before that point,
+so when the CSV grows only the new rows are scanned, and a CSV that was rewritten (Eg: by `fold_updates()`) is re-indexed.
+Rows are split on newlines outside quotes, so multi-line quoted fields like 'About Job' are handled.
+'''
+
+MAGIC = b"JOFF"
+HEADER = struct.Struct("<4sIqq")
+ENTRY_SIZE = 3 * 8
+CHECK_LENGTH = 4096
+
+
+def to_int_id(job_id: bytes) -> int | None:
+    try:
+        return int(job_id)
+    except ValueError:
+        return None
+
+
+
+class HistoryReader:
+    '''
+    Memory mapped reader of a history CSV with a persisted Job ID -> byte offset index.
+    * `get()` and `tail()` only parse the rows they return
+    * The index is extended on every call if the CSV has grown, only complete rows are indexed
+    * If a Job ID is in the CSV more than once (Eg: failed jobs), `get()` returns the last row
+    '''
+    def __init__(self, csv_path: str = file_name) -> None:
+        self.csv_path = csv_path
+        self.path = os.path.splitext(csv_path)[0] + ".offsets"
+        self.fieldnames = []
+        self.indexed_upto = 0
+        self.__entries = array("q")
+        self.__positions = {}
+        self.__check = 0
+        self.__lock = threading.Lock()
+
+    #< Reading
+    def get(self, job_id: str | int) -> dict | None:
+        '''
+        Returns the row of `job_id`, or `None` if it's not in the CSV
+        '''
+        value = to_int_id(str(job_id).encode())
+        if value is None: return None
+        with self.__lock, self.__mapped() as data:
+            position = self.__positions.get(value)
+            if position is None: return None
+            return self.__parse(data, position)
+
+    def tail(self, count: int) -> list[dict]:
+        '''
+        Returns the last `count` rows of the CSV, oldest first
+        '''
+        with self.__lock, self.__mapped() as data:
+            first = max(0, len(self.__entries) // 3 - count)
+            return [self.__parse(data, position) for position in range(first, len(self.__entries) // 3)]
+
+    def since(self, first: int) -> tuple[int, list[dict]]:
+        '''
+        Returns `(number of rows, rows after the first `first` rows)`, both read from the same state of the CSV
+        '''
+        with self.__lock, self.__mapped() as data:
+            count = len(self.__entries) // 3
+            return count, [self.__parse(data, position) for position in range(first, count)]
+
+    def rows(self, offset: int, limit: int) -> tuple[int, list[dict]]:
+        '''
+        Returns `(number of rows, `limit` rows starting at `offset`)`, only parsing the returned rows
+        '''
+        with self.__lock, self.__mapped() as data:
+            count = len(self.__entries) // 3
+            return count, [self.__parse(data, position) for position in range(min(offset, count), min(offset + limit, count))]
+
+    def __len__(self) -> int:
+        with self.__lock, self.__mapped():
+            return len(self.__entries) // 3
+
+    def __parse(self, data: mmap.mmap, position: int) -> dict:
+        start, end = self.__entries[position * 3 + 1], self.__entries[position * 3 + 2]
+        values = next(csv.reader([data[start:end].decode("utf-8")]))
+        return dict(zip(self.fieldnames, values))
+
+    @contextmanager
+    def __mapped(self) -> Iterator[mmap.mmap | bytes]:
+        '''
+        Maps the CSV and brings the index up to date while in the `with` block. Raises `FileNotFoundError` if there is no CSV.
+        * The map is released after every call, so the CSV can still be replaced or appended to by the bot
+        '''
+        with open(self.csv_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                self.__reset()
+                yield b""
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self.__refresh(data)
+                yield data
+    #>
+
+    #< Indexing
+    def __checksum(self, data: mmap.mmap | bytes, upto: int) -> int:
+        return zlib.crc32(data[max(0, upto - CHECK_LENGTH):upto])
+
+    def __is_valid(self, data: mmap.mmap, upto: int, check: int) -> bool:
+        return upto <= len(data) and self.__checksum(data, upto) == check
+
+    def __reset(self) -> None:
+        self.fieldnames = []
+        self.indexed_upto = 0
+        self.__entries = array("q")
+        self.__positions = {}
+        self.__check = 0
+
+    def __refresh(self, data: mmap.mmap) -> None:
+        if self.indexed_upto and not self.__is_valid(data, self.indexed_upto, self.__check): self.__reset()
+        if len(data) == self.indexed_upto: return
+        if not self.indexed_upto: self.__load(data)
+        if len(data) == self.indexed_upto: return
+        with file_lock(self.path):
+            self.__load(data)   # Another process might have extended the index meanwhile
+            upto, entries = self.__scan(data, self.indexed_upto)
+            if upto == self.indexed_upto: return
+            self.__save(data, upto, entries)
+            self.__extend(entries, upto, self.__checksum(data, upto))
+
+    def __load(self, data: mmap.mmap) -> None:
+        '''
+        Loads entries of the index file that are ahead of memory, if the file is still valid for `data`
+        '''
+        try:
+            with open(self.path, "rb") as file:
+                magic, check, upto, count = HEADER.unpack(file.read(HEADER.size))
+                if magic != MAGIC or upto <= self.indexed_upto or not self.__is_valid(data, upto, check): return
+                if self.indexed_upto == 0:
+                    self.fieldnames = next(csv.reader([data[:data.find(b"\n") + 1].decode("utf-8")]), [])
+                file.seek(HEADER.size + len(self.__entries) * 8)
+                entries = array("q")
+                entries.frombytes(file.read((count - len(self.__entries) // 3) * ENTRY_SIZE))
+        except (OSError, struct.error, ValueError):
+            return
+        self.__extend(entries, upto, check)
+
+    def __extend(self, entries: array, upto: int, check: int) -> None:
+        first = len(self.__entries) // 3
+        self.__entries.extend(entries)
+        for position in range(first, len(self.__entries) // 3):
+            self.__positions[self.__entries[position * 3]] = position
+        self.indexed_upto, self.__check = upto, check
+
+    def __save(self, data: mmap.mmap, upto: int, entries: array) -> None:
+        '''
+        Appends `entries` to the index file and then updates its header. Entries past the header's count are ignored when loading,
+        so a crash in between only loses the new entries.
+        '''
+        count = (len(self.__entries) + len(entries)) // 3
+        if not self.__file_matches_memory():
+            with open(self.path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, 0, 0, 0))
+                self.__entries.tofile(file)
+        with open(self.path, "r+b") as file:
+            file.seek(HEADER.size + len(self.__entries) * 8)
+            entries.tofile(file)
+            file.truncate()
+            file.flush()
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, self.__checksum(data, upto), upto, count))
+
+    def __file_matches_memory(self) -> bool:
+        try:
+            with open(self.path, "rb") as file:
+                magic, check, upto, count = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == MAGIC and (check, upto, count) == (self.__check, self.indexed_upto, len(self.__entries) // 3)
+
+    def __scan(self, data: mmap.mmap, start: int) -> tuple[int, array]:
+        '''
+        Finds complete rows in `data` from `start`, returns `(end of last complete row, entries)`.
+        * Only looks at newlines and quote characters, rows are not parsed
+        '''
+        entries = array("q")
+        position = start
+        row_start = start
+        while True:
+            newline = data.find(b"\n", position)
+            if newline == -1: break
+            quote = data.find(b'"', position, newline)
+            if quote != -1:
+                # Skip the quoted field, newlines in it don't end the row. (An escaped "" is just an empty quoted part)
+                closing = data.find(b'"', quote + 1)
+                if closing == -1: break
+                position = closing + 1
+                continue
+            position = newline + 1
+            if row_start == 0:
+                self.fieldnames = next(csv.reader([data[:position].decode("utf-8")]), [])
+            else:
+                comma = data.find(b",", row_start, position)
+                job_id = to_int_id(data[row_start:comma if comma != -1 else position].strip(b'"\r\n'))
+                if job_id is not None: entries.extend((job_id, row_start, position))
+            row_start = position
+        return row_start, entries
+
+    def rebuild(self) -> None:
+        '''
+        Regenerates the index from the CSV file
+        '''
+        with self.__lock:
+            self.__reset()
+            if os.path.exists(self.path): os.remove(self.path)
+            with self.__mapped(): pass
+        print_lg(f'Rebuilt row offset index "{self.path}" with {len(self.__entries) // 3} rows.')
+    #>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read history CSV rows by Job ID.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    get_parser = commands.add_parser("get", help="Print the row of a Job ID")
+    get_parser.add_argument("job_id")
+    tail_parser = commands.add_parser("tail", help="Print the last rows")
+    tail_parser.add_argument("-n", type=int, default=10, help="Number of rows")
+    rebuild_parser = commands.add_parser("rebuild", help="Regenerate the row offset index")
+    for sub_parser in (get_parser, tail_parser, rebuild_parser):
+        sub_parser.add_argument("--failed", action="store_true", help="Read the failed jobs CSV instead of the applied one")
+    args = parser.parse_args()
+
+    reader = HistoryReader(failed_file_name if args.failed else file_name)
+    if args.command == "get":
+        print(reader.get(args.job_id))
+    elif args.command == "tail":
+        for row in reader.tail(args.n): print(row)
+    elif args.command == "rebuild":
+        reader.rebuild()
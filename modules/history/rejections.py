@@ -0,0 +1,141 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import argparse
+
+from hashlib import sha256
+from datetime import datetime
+from typing import Literal
+
+from config.settings import file_name, remember_rejections
+from config.search import about_company_bad_words, about_company_good_words, bad_words, security_clearance, did_masters, current_experience
+from modules.helpers import print_lg, make_directories
+
+
+
+#### Remembered rejections ####
+'''
+Jobs and companies rejected by the filters in `config/search.py` are saved to `rejections.jsonl` next to the applied jobs CSV,
+so later cycles and restarts skip them without opening them again. Each line is one decision:
+
+    {"type": "job", "key": "4012345678", "reason": "Found a Bad Word in About Job", "filters": "job_description", "hash": "...", "time": "..."}
+
+`hash` is a hash of the filters the decision was based on, decisions whose filters have changed since are forgotten when loading.
+'''
+
+REJECTIONS_PATH = os.path.join(os.path.dirname(file_name), "rejections.jsonl")
+
+RejectionType = Literal["job", "company"]
+FilterGroup = Literal["about_company", "job_description"]
+
+# Settings in `config/search.py` each group of decisions depends on
+FILTER_GROUPS = {
+    "about_company": {"about_company_bad_words": about_company_bad_words, "about_company_good_words": about_company_good_words},
+    "job_description": {"bad_words": bad_words, "security_clearance": security_clearance, "did_masters": did_masters, "current_experience": current_experience},
+}
+
+
+def filters_hash(group: FilterGroup) -> str:
+    return sha256(json.dumps(FILTER_GROUPS[group], sort_keys=True).encode()).hexdigest()[:16]
+
+
+
+class Rejections:
+    '''
+    Rejected Job IDs and blacklisted companies, loaded from `path` and saved to it as they are added.
+    * `jobs` and `companies` are plain `set`s, so they can be checked with `in` like before
+    * Nothing is saved or loaded if `remember_rejections = False` in `config/settings.py`
+    '''
+    def __init__(self, path: str = REJECTIONS_PATH, remember: bool = remember_rejections) -> None:
+        self.path = path
+        self.remember = remember
+        self.jobs = set()
+        self.companies = set()
+        self.hashes = {group: filters_hash(group) for group in FILTER_GROUPS}
+        if remember: self.load()
+
+    def load(self) -> None:
+        '''
+        Loads decisions made with the current filters, and rewrites the file without the rest
+        '''
+        if not os.path.exists(self.path): return
+        kept = {}
+        total = 0
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    decision = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                total += 1
+                if self.hashes.get(decision.get("filters")) != decision.get("hash"): continue
+                kept[(decision["type"], decision["key"])] = decision
+        for rejection_type, key in kept:
+            (self.jobs if rejection_type == "job" else self.companies).add(key)
+        if len(kept) != total:
+            self.__rewrite(kept.values())
+            print_lg(f'Forgot {total - len(kept)} remembered rejections made with different filters or repeated.')
+        print_lg(f'Remembered {len(self.jobs)} rejected jobs and {len(self.companies)} blacklisted companies from "{self.path}".')
+
+    def reject_job(self, job_id: str, reason: str, filters: FilterGroup) -> None:
+        '''
+        Adds `job_id` to the rejected jobs, `filters` is the group of filters in `FILTER_GROUPS` that rejected it
+        '''
+        self.jobs.add(job_id)
+        self.__save("job", job_id, reason, filters)
+
+    def blacklist_company(self, company: str, reason: str) -> None:
+        '''
+        Adds `company` to the blacklisted companies
+        '''
+        self.companies.add(company)
+        self.__save("company", company, reason, "about_company")
+
+    def __save(self, rejection_type: RejectionType, key: str, reason: str, filters: FilterGroup) -> None:
+        if not self.remember: return
+        try:
+            make_directories([self.path])
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(to_decision(rejection_type, key, reason, filters, self.hashes[filters])) + "\n")
+        except Exception as e:
+            print_lg(f'Failed to remember rejection of {rejection_type} "{key}"!', e)
+
+    def __rewrite(self, decisions) -> None:
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for decision in decisions:
+                file.write(json.dumps(decision) + "\n")
+        os.replace(temp_path, self.path)
+
+
+def to_decision(rejection_type: RejectionType, key: str, reason: str, filters: FilterGroup, filters_hash: str) -> dict:
+    return {"type": rejection_type, "key": key, "reason": reason, "filters": filters, "hash": filters_hash, "time": datetime.now().isoformat(timespec="seconds")}
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage remembered rejected jobs and blacklisted companies.")
+    parser.add_argument("command", choices=["show", "clear"], help="show: print remembered counts and blacklisted companies, clear: forget all rejections")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        rejections = Rejections(remember=True)
+        for company in sorted(rejections.companies): print(company)
+    elif args.command == "clear":
+        if os.path.exists(REJECTIONS_PATH): os.remove(REJECTIONS_PATH)
+        print_lg(f'Cleared remembered rejections in "{REJECTIONS_PATH}".')
@@ -0,0 +1,149 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import argparse
+import threading
+
+from datetime import datetime
+
+from config.settings import file_name
+from modules.logs.console import print_lg
+from modules.history.locking import file_lock
+from modules.history.store import HistoryKind, HistoryStore, DATE_FIELDS, get_history_store
+
+
+
+#### Precomputed history counts ####
+'''
+Counts of applied and failed jobs kept in `history_rollups.json` next to the applied jobs CSV, updated by the
+history writer every time rows are written, so the dashboard can show them without reading the history.
+
+    {
+        "applied": {"total": 10, "by_day": {"2025-01-31": 4, ...}, "by_search_term": {"Python Developer": 6, ...}},
+        "failed":  {"total": 3, "by_day": {...}, "by_search_term": {...}, "by_reason": {"Problem in Easy Applying": 2, ...}}
+    }
+
+Search terms are not stored in the history files, so `rebuild()` keeps the existing "by_search_term" counts.
+'''
+
+ROLLUPS_PATH = os.path.join(os.path.dirname(file_name), "history_rollups.json")
+
+# Rollups kept for each kind of history, "by_reason" counts 'Assumed Reason' of failed jobs
+ROLLUPS = {"applied": ("by_day", "by_search_term"), "failed": ("by_day", "by_search_term", "by_reason")}
+
+MAX_KEY_LENGTH = 100
+
+
+def empty_rollups() -> dict:
+    return {kind: {"total": 0, **{rollup: {} for rollup in rollups}} for kind, rollups in ROLLUPS.items()}
+
+
+def to_day(value) -> str:
+    '''
+    Returns the "YYYY-MM-DD" day of a history date, or the value itself for dates like "Pending"
+    '''
+    if isinstance(value, datetime): return value.strftime("%Y-%m-%d")
+    value = str(value or "Unknown")
+    return value[:10] if value[:1].isdigit() else value
+
+
+
+class HistoryRollups:
+    '''
+    Reads and updates the rollups file at `path`. Updates hold `file_lock()`, so the bot and the rebuild command never overwrite each other
+    '''
+    def __init__(self, path: str = ROLLUPS_PATH) -> None:
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def read(self) -> dict:
+        '''
+        Returns all rollups, empty ones if nothing was recorded yet
+        '''
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return empty_rollups()
+
+    def record(self, kind: HistoryKind, rows: list[dict], search_term: str | None = None) -> None:
+        '''
+        Adds `rows` just written to the `kind` history to the rollups
+        '''
+        with self.__lock, file_lock(self.path):
+            rollups = self.read()
+            add_rows(rollups, kind, rows, search_term)
+            self.__write(rollups)
+
+    def rebuild(self, store: HistoryStore) -> dict:
+        '''
+        Recounts everything except "by_search_term" from the rows of `store`
+        '''
+        with self.__lock, file_lock(self.path):
+            previous = self.read()
+            rollups = empty_rollups()
+            for kind in ROLLUPS:
+                rollups[kind]["by_search_term"] = previous.get(kind, {}).get("by_search_term", {})
+                try:
+                    add_rows(rollups, kind, store.iter_rows(kind))
+                except FileNotFoundError:
+                    pass
+            self.__write(rollups)
+        return rollups
+
+    def __write(self, rollups: dict) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(rollups, file, indent=1)
+        os.replace(temp_path, self.path)
+
+
+def add_rows(rollups: dict, kind: HistoryKind, rows, search_term: str | None = None) -> None:
+    counts = rollups.setdefault(kind, empty_rollups()[kind])
+    for row in rows:
+        counts["total"] += 1
+        keys = {"by_day": to_day(row.get(DATE_FIELDS[kind]))}
+        if search_term: keys["by_search_term"] = search_term
+        if kind == "failed": keys["by_reason"] = str(row.get("Assumed Reason") or "Unknown")[:MAX_KEY_LENGTH]
+        for rollup, key in keys.items():
+            counts[rollup][key] = counts[rollup].get(key, 0) + 1
+
+
+
+#< Shared rollups
+__rollups = None
+
+def get_history_rollups() -> HistoryRollups:
+    global __rollups
+    if __rollups is None: __rollups = HistoryRollups()
+    return __rollups
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the precomputed history counts.")
+    parser.add_argument("command", choices=["rebuild", "show"], help="rebuild: recount from the existing history, show: print the counts")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rollups = get_history_rollups().rebuild(get_history_store())
+        print_lg(f'Rebuilt "{ROLLUPS_PATH}" from {rollups["applied"]["total"]} applied and {rollups["failed"]["total"]} failed jobs.')
+    elif args.command == "show":
+        print(json.dumps(get_history_rollups().read(), indent=2))
@@ -0,0 +1,172 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import re
+import sqlite3
+import argparse
+import threading
+
+from config.settings import file_name, history_search_index
+from modules.logs.console import print_lg
+from modules.history.archive import resolve_text
+from modules.history.store import DATE_FIELDS, HistoryKind, HistoryStore, to_text, get_history_store
+
+
+
+#### Full text search over history ####
+'''
+SQLite FTS5 index of the history in `history_search.db` next to the applied jobs CSV, kept in sync by the history writer.
+* Applied jobs are searchable by Title, Company, About Job and Questions Found
+* Failed jobs by Assumed Reason and Stack Trace (Which holds the job description for skipped jobs)
+* Archived descriptions (See `modules/history/archive.py`) are indexed with their full text
+'''
+
+SEARCH_DB_PATH = os.path.join(os.path.dirname(file_name), "history_search.db")
+
+COLUMNS = ["title", "company", "about", "questions", "reason"]
+
+# Snippet markers around matched words
+MATCH_START, MATCH_END = "**", "**"
+
+re_query_term = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def to_fts_query(query: str) -> str:
+    '''
+    Converts a search like `kubernetes "No C2C"` into an FTS5 query matching all words and quoted phrases,
+    so characters like `.` or `#` (Eg: ".NET", "C#") don't break the query syntax
+    '''
+    terms = [phrase or word for phrase, word in re_query_term.findall(query)]
+    terms = [term.replace('"', '""') for term in terms if term.strip()]
+    if not terms: raise ValueError("Search query is empty")
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def to_document(kind: HistoryKind, row: dict) -> dict:
+    '''
+    Returns the indexed text of a history row
+    '''
+    if kind == "applied":
+        return {"title": to_text(row.get("Title")), "company": to_text(row.get("Company")), "about": resolve_text(to_text(row.get("About Job"))), "questions": to_text(row.get("Questions Found")), "reason": ""}
+    return {"title": "", "company": "", "about": resolve_text(to_text(row.get("Stack Trace"))), "questions": "", "reason": to_text(row.get("Assumed Reason"))}
+
+
+
+class SearchIndex:
+    '''
+    Full text index of history rows, each thread uses its own connection (The bot's writer thread and the dashboard's request threads)
+    '''
+    def __init__(self, db_path: str = SEARCH_DB_PATH) -> None:
+        self.db_path = db_path
+        self.__local = threading.local()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self.connection() as conn:
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs USING fts5(kind UNINDEXED, job_id UNINDEXED, date UNINDEXED, {', '.join(COLUMNS)}, tokenize = 'unicode61')")
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.__local.conn = conn
+        return conn
+
+    def add_rows(self, kind: HistoryKind, rows) -> int:
+        '''
+        Indexes `rows` just written to the `kind` history, returns the number of rows indexed
+        '''
+        records = []
+        for row in rows:
+            document = to_document(kind, row)
+            records.append([kind, to_text(row.get("Job ID")), to_text(row.get(DATE_FIELDS[kind]))] + [document[column] for column in COLUMNS])
+        with self.connection() as conn:
+            conn.executemany(f"INSERT INTO jobs (kind, job_id, date, {', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in range(3 + len(COLUMNS)))})", records)
+        return len(records)
+
+    def search(self, query: str, kind: HistoryKind | None = None, limit: int = 20, offset: int = 0) -> list[dict]:
+        '''
+        Returns rows matching all words and "quoted phrases" in `query`, best matches first, with a snippet of the matched text.
+        * Raises `ValueError` if `query` is empty
+        '''
+        where = "jobs MATCH ?" + (" AND kind = ?" if kind else "")
+        params = [to_fts_query(query)] + ([kind] if kind else []) + [limit, offset]
+        records = self.connection().execute(f'''
+            SELECT kind, job_id, date, title, company, snippet(jobs, -1, ?, ?, '...', 16), bm25(jobs)
+            FROM jobs WHERE {where} ORDER BY bm25(jobs) LIMIT ? OFFSET ?
+        ''', [MATCH_START, MATCH_END] + params).fetchall()
+        return [
+            {"kind": kind, "job_id": job_id, "date": date, "title": title, "company": company, "snippet": snippet, "rank": rank}
+            for kind, job_id, date, title, company, snippet, rank in records
+        ]
+
+    def rebuild(self, store: HistoryStore) -> int:
+        '''
+        Clears the index and indexes every row of `store` again. Returns the number of rows indexed
+        '''
+        with self.connection() as conn:
+            conn.execute("DELETE FROM jobs")
+        count = 0
+        for kind in DATE_FIELDS:
+            try:
+                count += self.add_rows(kind, store.iter_rows(kind))
+            except FileNotFoundError:
+                pass
+        with self.connection() as conn:
+            conn.execute("INSERT INTO jobs (jobs) VALUES ('optimize')")
+        return count
+
+    def close(self) -> None:
+        conn = getattr(self.__local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.__local.conn = None
+
+
+
+#< Shared index
+__index = None
+__index_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex | None:
+    '''
+    Returns the shared search index, or `None` if `history_search_index = False` in `config/settings.py`
+    '''
+    global __index
+    if not history_search_index: return None
+    with __index_lock:
+        if __index is None: __index = SearchIndex()
+        return __index
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the application history.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="Index the existing history again")
+    query_parser = commands.add_parser("query", help="Print jobs matching a search")
+    query_parser.add_argument("query", help='Words or "quoted phrases" to find')
+    query_parser.add_argument("--kind", choices=["applied", "failed"], help="Only search this history")
+    query_parser.add_argument("-n", type=int, default=20, help="Number of results")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        print_lg(f'Indexed {SearchIndex().rebuild(get_history_store())} history rows in "{SEARCH_DB_PATH}".')
+    elif args.command == "query":
+        for result in SearchIndex().search(args.query, args.kind, args.n):
+            print(f'{result["kind"]:8} {result["job_id"]:12} {result["title"] or result["company"]}\n    {result["snippet"]}')
@@ -0,0 +1,286 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import ast
+import json
+import argparse
+import threading
+
+from itertools import islice
+
+from config.settings import file_name
+from modules.logs.console import print_lg
+from modules.history.store import HistoryStore, get_history_store
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+
+
+#### Skill demand analytics ####
+'''
+Parses the 'Skills required' column of applied jobs (Written by `ai_extract_skills()` as the repr of a `dict` of skill lists)
+into a sparse jobs x skills matrix, cached in `skills_cache.npz` next to the applied jobs CSV.
+Needs `numpy` and `scipy`, install them with `pip install numpy scipy`.
+
+* The cache is keyed by `HistoryStore.stamp()`, when only new jobs were added just those are parsed and appended
+* Skills are matched case insensitively and shown with their most used spelling
+'''
+
+CACHE_PATH = os.path.join(os.path.dirname(file_name), "skills_cache.npz")
+
+# Categories of `extract_skills_response_format` in `modules/ai/prompts.py`
+SKILL_CATEGORIES = ["tech_stack", "technical_skills", "other_skills", "required_skills", "nice_to_have"]
+
+
+def parse_skills(value: str) -> list[str]:
+    '''
+    Returns the skills in a 'Skills required' value, `[]` for values like "Needs an AI" or an AI error
+    '''
+    if not value or value[:1] != "{": return []
+    try:
+        skills = ast.literal_eval(value)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        try:
+            skills = json.loads(value)
+        except ValueError:
+            return []
+    if not isinstance(skills, dict): return []
+    found = []
+    for category in SKILL_CATEGORIES:
+        for skill in skills.get(category) or []:
+            if isinstance(skill, str) and skill.strip(): found.append(skill.strip())
+    return found
+
+
+def month_of_row(row: dict) -> str:
+    '''
+    Returns "YYYY-MM" of 'Date Applied', falling back to 'Date Posted' for pending external applications
+    '''
+    for field in ("Date Applied", "Date Posted"):
+        date = row.get(field) or ""
+        if date[:1].isdigit(): return date[:7]
+    return "Unknown"
+
+
+
+class SkillMatrix:
+    '''
+    Jobs x skills 0/1 matrix of the applied history
+    * `matrix` - `scipy.sparse.csr_matrix` of shape `(len(job_ids), len(skills))`
+    * `skills` - Display name of each column, `months` - "YYYY-MM" of each row, `job_ids` - Job ID of each row
+    '''
+    def __init__(self) -> None:
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.skills = []
+        self.months = np.array([], dtype="U7")
+        self.job_ids = []
+        self.stamp = None
+        self.__columns = {}
+        self.__spellings = {}
+
+    #< Building
+    def extend(self, rows) -> int:
+        '''
+        Appends `rows` of the applied history to the matrix, returns the number of rows added
+        '''
+        indptr, indices, months, job_ids = [0], [], [], []
+        for row in rows:
+            columns = set()
+            for skill in parse_skills(row.get("Skills required")):
+                key = skill.casefold()
+                if key not in self.__columns:
+                    self.__columns[key] = len(self.skills)
+                    self.skills.append(skill)
+                columns.add(self.__columns[key])
+                spellings = self.__spellings.setdefault(key, {})
+                spellings[skill] = spellings.get(skill, 0) + 1
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+            months.append(month_of_row(row))
+            job_ids.append(row.get("Job ID") or "")
+        new = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)), shape=(len(job_ids), len(self.skills)))
+        old = self.matrix
+        old.resize((old.shape[0], len(self.skills)))
+        self.matrix = sparse.vstack([old, new], format="csr")
+        self.months = np.concatenate([self.months, np.array(months, dtype="U7")])
+        self.job_ids += job_ids
+        for key, column in self.__columns.items():
+            self.skills[column] = max(self.__spellings[key].items(), key=lambda item: item[1])[0]
+        return len(job_ids)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            temp_path, data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr, shape=np.array(self.matrix.shape),
+            skills=np.array(self.skills, dtype=str), months=self.months, job_ids=np.array(self.job_ids, dtype=str),
+            meta=np.array(json.dumps({"stamp": self.stamp, "spellings": self.__spellings})),
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SkillMatrix':
+        matrix = cls()
+        with np.load(path, allow_pickle=False) as saved:
+            matrix.matrix = sparse.csr_matrix((saved["data"], saved["indices"], saved["indptr"]), shape=tuple(saved["shape"]))
+            matrix.skills = saved["skills"].tolist()
+            matrix.months = saved["months"]
+            matrix.job_ids = saved["job_ids"].tolist()
+            meta = json.loads(str(saved["meta"]))
+        matrix.stamp = meta["stamp"]
+        matrix.__spellings = meta["spellings"]
+        matrix.__columns = {skill.casefold(): column for column, skill in enumerate(matrix.skills)}
+        return matrix
+    #>
+
+    #< Analytics
+    def frequencies(self, top: int = 50, month_from: str | None = None, month_to: str | None = None) -> list[dict]:
+        '''
+        Returns the `top` most asked skills with the number and share of jobs asking for them, optionally within a range of months
+        '''
+        rows = self.__rows_between(month_from, month_to)
+        matrix = self.matrix[rows] if rows is not None else self.matrix
+        counts = np.asarray(matrix.sum(axis=0)).ravel()
+        jobs = max(matrix.shape[0], 1)
+        return [{"skill": self.skills[column], "jobs": int(counts[column]), "share": round(float(counts[column]) / jobs, 4)} for column in top_columns(counts, top)]
+
+    def cooccurrence(self, skill: str, top: int = 20) -> list[dict]:
+        '''
+        Returns skills most often asked together with `skill`, with the share of `skill` jobs asking for them. Raises `KeyError` for unknown skills
+        '''
+        column = self.__columns.get(skill.casefold())
+        if column is None: raise KeyError(f'Skill "{skill}" was not found in the history')
+        with_skill = self.matrix[:, column].nonzero()[0]
+        counts = np.asarray(self.matrix[with_skill].sum(axis=0)).ravel()
+        counts[column] = 0
+        jobs = max(len(with_skill), 1)
+        return [{"skill": self.skills[other], "jobs": int(counts[other]), "share": round(float(counts[other]) / jobs, 4)} for other in top_columns(counts, top)]
+
+    def trends(self, skills: list[str] | None = None, top: int = 10) -> dict:
+        '''
+        Returns `{"months", "jobs", "skills": {skill: jobs per month}}` for `skills`, or the `top` most asked ones
+        '''
+        months, month_rows = np.unique(self.months, return_inverse=True)
+        # (months x jobs) @ (jobs x skills) gives jobs asking for each skill in each month
+        by_month = sparse.csr_matrix((np.ones(len(month_rows), dtype=np.int32), (month_rows, np.arange(len(month_rows)))), shape=(len(months), self.matrix.shape[0])) @ self.matrix
+        if skills:
+            columns = [self.__columns[skill.casefold()] for skill in skills if skill.casefold() in self.__columns]
+        else:
+            columns = top_columns(np.asarray(self.matrix.sum(axis=0)).ravel(), top)
+        by_month = by_month[:, columns].toarray()
+        return {
+            "months": months.tolist(),
+            "jobs": np.bincount(month_rows, minlength=len(months)).tolist(),
+            "skills": {self.skills[column]: by_month[:, position].tolist() for position, column in enumerate(columns)},
+        }
+
+    def __rows_between(self, month_from: str | None, month_to: str | None):
+        if not month_from and not month_to: return None
+        selected = np.ones(len(self.months), dtype=bool)
+        if month_from: selected &= self.months >= month_from[:7]
+        if month_to: selected &= self.months <= month_to[:7]
+        return np.nonzero(selected)[0]
+    #>
+
+
+def top_columns(counts, top: int) -> list[int]:
+    '''
+    Returns columns of the `top` largest non zero `counts`, largest first
+    '''
+    top = min(top, int(np.count_nonzero(counts)))
+    if top <= 0: return []
+    columns = np.argpartition(-counts, top - 1)[:top]
+    return columns[np.argsort(-counts[columns], kind="stable")].tolist()
+
+
+
+class SkillAnalytics:
+    '''
+    Keeps the `SkillMatrix` of `store` up to date, loading it from the cache at `cache_path` when the history hasn't changed
+    '''
+    def __init__(self, store: HistoryStore, cache_path: str = CACHE_PATH) -> None:
+        if np is None: raise ImportError('Skill analytics need "numpy" and "scipy", install them with `pip install numpy scipy`')
+        self.store = store
+        self.cache_path = cache_path
+        self.__matrix = None
+        self.__lock = threading.Lock()
+
+    def matrix(self) -> SkillMatrix:
+        '''
+        Returns the matrix for the current history, parsing only jobs added since it was cached
+        '''
+        with self.__lock:
+            stamp = self.store.stamp("applied")
+            if self.__matrix is None and os.path.exists(self.cache_path):
+                try:
+                    self.__matrix = SkillMatrix.load(self.cache_path)
+                except Exception as e:
+                    print_lg(f'Ignoring unreadable skills cache "{self.cache_path}".', e)
+            if self.__matrix is not None and stamp is not None and self.__matrix.stamp == stamp: return self.__matrix
+            self.__matrix = self.__update(self.__matrix)
+            self.__matrix.stamp = stamp
+            if stamp is not None: self.__matrix.save(self.cache_path)
+            return self.__matrix
+
+    def __update(self, matrix: SkillMatrix | None) -> SkillMatrix:
+        rows = self.store.iter_rows("applied")
+        if matrix is not None and matrix.job_ids:
+            # Only extend if the rows already parsed are still the same (The history can be rewritten, Eg: by compaction)
+            parsed = list(islice(rows, len(matrix.job_ids)))
+            if len(parsed) == len(matrix.job_ids) and parsed[-1].get("Job ID") == matrix.job_ids[-1]:
+                matrix.extend(rows)
+                return matrix
+            rows = self.store.iter_rows("applied")
+        matrix = SkillMatrix()
+        matrix.extend(rows)
+        return matrix
+
+
+
+#< Shared analytics
+__analytics = None
+
+def get_skill_analytics() -> SkillAnalytics:
+    global __analytics
+    if __analytics is None: __analytics = SkillAnalytics(get_history_store())
+    return __analytics
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show skills asked for by the jobs in your applied history.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    top_parser = commands.add_parser("top", help="Most asked skills")
+    top_parser.add_argument("-n", type=int, default=30)
+    with_parser = commands.add_parser("with", help="Skills most often asked together with a skill")
+    with_parser.add_argument("skill")
+    with_parser.add_argument("-n", type=int, default=20)
+    commands.add_parser("trends", help="Jobs asking for the most asked skills in each month")
+    args = parser.parse_args()
+
+    skill_matrix = get_skill_analytics().matrix()
+    if args.command == "top":
+        for item in skill_matrix.frequencies(args.n): print(f'{item["jobs"]:6} {item["share"]:7.1%}  {item["skill"]}')
+    elif args.command == "with":
+        for item in skill_matrix.cooccurrence(args.skill, args.n): print(f'{item["jobs"]:6} {item["share"]:7.1%}  {item["skill"]}')
+    elif args.command == "trends":
+        print(json.dumps(skill_matrix.trends(), indent=2))
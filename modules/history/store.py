@@ -0,0 +1,643 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import csv
+import json
+import errno
+import heapq
+import sqlite3
+import argparse
+import threading
+
+from itertools import islice
+from typing import Iterator, Literal
+
+from config.settings import file_name, failed_file_name, history_backend, history_db_path
+from modules.logs.console import print_lg
+from modules.history.files import is_compressed, open_history
+from modules.history.id_index import JobIdIndex
+from modules.history.locking import file_lock
+from modules.history.reader import HistoryReader
+
+
+
+#### Application history storage ####
+
+#< Schema
+APPLIED_FIELDS = ['Job ID', 'Title', 'Company', 'Work Location', 'Work Style', 'About Job', 'Experience required', 'Skills required', 'HR Name', 'HR Link', 'Resume', 'Re-posted', 'Date Posted', 'Date Applied', 'Job Link', 'External Job link', 'Questions Found', 'Connect Request']
+FAILED_FIELDS = ['Job ID', 'Job Link', 'Resume Tried', 'Date listed', 'Date Tried', 'Assumed Reason', 'Stack Trace', 'External Job link', 'Screenshot Name']
+
+FIELDS = {"applied": APPLIED_FIELDS, "failed": FAILED_FIELDS}
+
+DATE_FIELDS = {"applied": "Date Applied", "failed": "Date Tried"}
+
+HistoryKind = Literal["applied", "failed"]
+
+
+def to_column(field: str) -> str:
+    '''
+    Converts a CSV header like `"Re-posted"` into its SQL column name `"re_posted"`
+    '''
+    return field.lower().replace(' ', '_').replace('-', '_')
+
+
+def to_text(value) -> str:
+    '''
+    Converts a history value to the text written in the CSV files, so both backends store identical values
+    '''
+    return "" if value is None else str(value)
+#>
+
+
+#< Filters
+'''
+`filters` used by `HistoryStore.page()` and `HistoryStore.stream()` is a `dict` with any of these keys:
+* `company`   - Case insensitive text that should be in 'Company'
+* `title`     - Case insensitive text that should be in 'Title'
+* `date_from` - Earliest 'Date Applied' (or 'Date Tried' for failed jobs), Eg: "2025-01-31"
+* `date_to`   - Latest 'Date Applied' (or 'Date Tried'), inclusive. Eg: "2025-02" includes the whole of February
+'''
+
+def matches_filters(kind: HistoryKind, row: dict, filters: dict) -> bool:
+    '''
+    Returns `True` if `row` satisfies all `filters`. Rows with dates like "Pending" never match a date range
+    '''
+    for field, key in (("Company", "company"), ("Title", "title")):
+        needle = filters.get(key)
+        if needle and needle.lower() not in (row.get(field) or "").lower(): return False
+    date = row.get(DATE_FIELDS[kind]) or ""
+    date_from = filters.get("date_from")
+    date_to = filters.get("date_to")
+    if (date_from or date_to) and not date[:1].isdigit(): return False
+    if date_from and date < date_from: return False
+    if date_to and date[:len(date_to)] > date_to: return False
+    return True
+
+
+def project(row: dict, fields: list[str] | None) -> dict:
+    '''
+    Returns only `fields` of `row`, or the whole `row` if `fields` is `None`
+    '''
+    return row if fields is None else {field: row.get(field) for field in fields}
+#>
+
+
+
+class HistoryStore:
+    '''
+    Base class for application history backends.
+    * `kind` is either `"applied"` or `"failed"` in all methods
+    * Rows are `dict`s keyed by the CSV headers in `APPLIED_FIELDS` and `FAILED_FIELDS`
+    '''
+    def append(self, kind: HistoryKind, rows: list[dict]) -> None:
+        '''
+        Appends `rows` to the `kind` history
+        '''
+        raise NotImplementedError
+
+    def iter_rows(self, kind: HistoryKind) -> Iterator[dict]:
+        '''
+        Yields every row of the `kind` history in the order they were written
+        '''
+        raise NotImplementedError
+
+    def candidate_rows(self, kind: HistoryKind, filters: dict) -> Iterator[dict]:
+        '''
+        Yields rows of the `kind` history that may match `filters`, used by `page()` and `stream()` which check each row.
+        * Backends that can skip rows without reading them (Eg: by date) override this, all rows by default
+        '''
+        return self.iter_rows(kind)
+
+    def page(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int = 100, offset: int = 0, fields: list[str] | None = None) -> tuple[int, list[dict]]:
+        '''
+        Returns `(total, rows)`, where `total` is the number of rows matching `filters` and `rows` are `limit` of them starting at `offset`.
+        * `sort_by` is one of the headers in `FIELDS[kind]`, rows keep their written order if `None`
+        * Only `offset + limit` rows are held in memory, no matter how big the history is
+        '''
+        if sort_by and sort_by not in FIELDS[kind]: raise ValueError(f'Can\'t sort {kind} jobs by "{sort_by}"')
+        total = 0
+        def matching() -> Iterator[tuple]:
+            nonlocal total
+            for row in self.candidate_rows(kind, filters):
+                if matches_filters(kind, row, filters):
+                    yield (row.get(sort_by) or "") if sort_by else "", total, project(row, fields)
+                    total += 1
+        if sort_by:
+            if descending: picked = heapq.nlargest(offset + limit, matching(), key=lambda item: (item[0], -item[1]))
+            else: picked = heapq.nsmallest(offset + limit, matching(), key=lambda item: (item[0], item[1]))
+            rows = [row for _, _, row in picked[offset:]]
+        else:
+            rows = [row for _, position, row in matching() if offset <= position < offset + limit]
+        return total, rows
+
+    def stream(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int | None = None, offset: int = 0, fields: list[str] | None = None) -> Iterator[dict]:
+        '''
+        Yields rows matching `filters` one at a time, same arguments as `page()` but `limit = None` yields all of them.
+        * Rows are read lazily when `sort_by` is `None`, sorting needs every matching row (only `fields` of them) in memory
+        '''
+        if sort_by:
+            yield from self.page(kind, filters, sort_by, descending, limit if limit is not None else 2**62, offset, fields)[1]
+            return
+        matching = (project(row, fields) for row in self.candidate_rows(kind, filters) if matches_filters(kind, row, filters))
+        yield from islice(matching, offset, None if limit is None else offset + limit)
+
+    def get(self, kind: HistoryKind, job_id: str) -> dict | None:
+        '''
+        Returns the row of `job_id` in the `kind` history (The latest one if it's there more than once), or `None` if not found
+        '''
+        found = None
+        for row in self.iter_rows(kind):
+            if row['Job ID'] == job_id: found = row
+        return found
+
+    def tail(self, kind: HistoryKind, count: int) -> list[dict]:
+        '''
+        Returns the last `count` rows of the `kind` history, oldest first
+        '''
+        rows = list(self.iter_rows(kind))
+        return rows[max(0, len(rows) - count):]
+
+    def since(self, kind: HistoryKind, seq: int) -> tuple[int, list[dict]]:
+        '''
+        Returns `(count, rows)`, where `count` is the number of rows in the `kind` history and `rows` are the ones written after the first `seq`.
+        * Used for delta syncs, a client that has seen `seq` rows only asks for the rest. `count < seq` means the history was rewritten
+        '''
+        count, rows = 0, []
+        for count, row in enumerate(self.iter_rows(kind), 1):
+            if count > seq: rows.append(row)
+        return count, rows
+
+    def count(self, kind: HistoryKind) -> int:
+        '''
+        Returns the number of rows in the `kind` history, the `seq` of delta syncs (See `since()`)
+        '''
+        return self.since(kind, 2**62)[0]
+
+    def applied_job_ids(self) -> set[str] | JobIdIndex:
+        '''
+        Returns a set-like collection (supports `in` and `add()`) of Job IDs that were applied to
+        '''
+        raise NotImplementedError
+
+    def update_date_applied(self, job_id: str, date_applied: str) -> bool:
+        '''
+        Sets 'Date Applied' of the applied job `job_id`, returns `False` if the job was not found
+        '''
+        raise NotImplementedError
+
+    def stamp(self, kind: HistoryKind) -> list[int] | None:
+        '''
+        Returns sizes and modification times of the files holding the `kind` history, for caches of results computed from it.
+        * Changes whenever the history changes, `None` if the backend can't tell
+        '''
+        return None
+
+    def updates_stamp(self, kind: HistoryKind) -> list[int] | None:
+        '''
+        Like `stamp()`, but only changes when rows already in the `kind` history are changed or rewritten, not when rows are appended.
+        * Delta syncs (See `since()`) only send new rows, so clients load the history again when this changes
+        '''
+        return self.stamp(kind)
+
+    def sync(self) -> None:
+        '''
+        Makes sure written rows are on disk, not just in the OS cache
+        '''
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+
+class CSVHistoryStore(HistoryStore):
+    '''
+    Stores history in the CSV files given by `file_name` and `failed_file_name` in `config/settings.py`
+    * Every write holds `file_lock()` on the CSV, so the bot and the dashboard never write at the same time
+    * Updates from the dashboard are appended to `<csv name>.updates.jsonl` instead of rewriting the CSV,
+      and applied on top of the CSV rows when reading. `fold_updates()` writes them into the CSV
+    '''
+    def __init__(self, applied_path: str = file_name, failed_path: str = failed_file_name) -> None:
+        self.paths = {"applied": applied_path, "failed": failed_path}
+        self.updates_path = os.path.splitext(applied_path)[0] + ".updates.jsonl"
+        self.__id_index = None
+        self.__readers = {kind: HistoryReader(path) for kind, path in self.paths.items()}
+        self.__updates = {}
+        self.__updates_stamp = None
+
+    def append(self, kind: HistoryKind, rows: list[dict]) -> None:
+        with file_lock(self.paths[kind]), open(self.paths[kind], 'a', newline='', encoding='utf-8') as file:
+            start_size = file.tell()
+            writer = csv.DictWriter(file, fieldnames=FIELDS[kind])
+            if start_size == 0: writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            end_size = file.tell()
+            # Keep the Job ID index in sync, unless it was already out of date (It'll be rebuilt on next load in that case)
+            if kind == "applied" and self.__id_index is not None and self.__id_index.source_size == start_size:
+                self.__id_index.record([row['Job ID'] for row in rows], end_size)
+
+    def stamp(self, kind: HistoryKind) -> list[int]:
+        return file_stamp([self.paths[kind]] + ([self.updates_path] if kind == "applied" else []))
+
+    def updates_stamp(self, kind: HistoryKind) -> list[int]:
+        # Journaled updates change the journal, `fold_updates()` removes it
+        return file_stamp([self.updates_path]) if kind == "applied" else []
+
+    def sync(self) -> None:
+        for path in self.paths.values():
+            if not os.path.exists(path): continue
+            with open(path, 'rb+') as file:
+                os.fsync(file.fileno())
+
+    def iter_rows(self, kind: HistoryKind) -> Iterator[dict]:
+        updates = self.pending_updates() if kind == "applied" else {}
+        with open_history(self.paths[kind]) as file:
+            for row in csv.DictReader(file):
+                if updates and row['Job ID'] in updates: row.update(updates[row['Job ID']])
+                yield row
+
+    def get(self, kind: HistoryKind, job_id: str) -> dict | None:
+        '''
+        Reads only the row of `job_id` using the row offset index of `HistoryReader` (Compressed files are scanned instead)
+        '''
+        if is_compressed(self.paths[kind]): return super().get(kind, job_id)
+        row = self.__readers[kind].get(job_id)
+        if row is not None and kind == "applied": row.update(self.pending_updates().get(row['Job ID'], {}))
+        return row
+
+    def tail(self, kind: HistoryKind, count: int) -> list[dict]:
+        if is_compressed(self.paths[kind]): return super().tail(kind, count)
+        rows = self.__readers[kind].tail(count)
+        if kind == "applied":
+            updates = self.pending_updates()
+            for row in rows: row.update(updates.get(row['Job ID'], {}))
+        return rows
+
+    def page(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int = 100, offset: int = 0, fields: list[str] | None = None) -> tuple[int, list[dict]]:
+        '''
+        Pages without filters or sorting are read with the row offset index of `HistoryReader`, parsing only the rows of the page
+        '''
+        if sort_by or any(filters.values()) or is_compressed(self.paths[kind]):
+            return super().page(kind, filters, sort_by, descending, limit, offset, fields)
+        total, rows = self.__readers[kind].rows(offset, limit)
+        if kind == "applied":
+            updates = self.pending_updates()
+            for row in rows: row.update(updates.get(row['Job ID'], {}))
+        return total, [project(row, fields) for row in rows]
+
+    def count(self, kind: HistoryKind) -> int:
+        if is_compressed(self.paths[kind]): return super().count(kind)
+        return len(self.__readers[kind])
+
+    def since(self, kind: HistoryKind, seq: int) -> tuple[int, list[dict]]:
+        if is_compressed(self.paths[kind]): return super().since(kind, seq)
+        count, rows = self.__readers[kind].since(seq)
+        if kind == "applied":
+            updates = self.pending_updates()
+            for row in rows: row.update(updates.get(row['Job ID'], {}))
+        return count, rows
+
+    def applied_job_ids(self) -> JobIdIndex:
+        if not os.path.exists(self.paths["applied"]):
+            print_lg(f"The CSV file '{self.paths['applied']}' does not exist.")
+        if self.__id_index is None:
+            self.__id_index = JobIdIndex(self.paths["applied"])
+        else:
+            self.__id_index.refresh()
+        return self.__id_index
+
+    #< Updates journal
+    def pending_updates(self) -> dict[str, dict]:
+        '''
+        Returns updates not yet folded into the CSV as `{job_id: {field: value}}` (Cached until the journal changes)
+        '''
+        try:
+            stat = os.stat(self.updates_path)
+        except FileNotFoundError:
+            self.__updates, self.__updates_stamp = {}, None
+            return self.__updates
+        if (stat.st_size, stat.st_mtime_ns) != self.__updates_stamp:
+            updates = {}
+            with open(self.updates_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        update = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue    # Line cut short by a crash, it was never acknowledged
+                    updates.setdefault(update.pop('Job ID'), {}).update(update)
+            self.__updates, self.__updates_stamp = updates, (stat.st_size, stat.st_mtime_ns)
+        return self.__updates
+
+    def update_date_applied(self, job_id: str, date_applied: str) -> bool:
+        '''
+        Appends the new 'Date Applied' to the updates journal, and `fsync`s it before returning.
+        * Finds the job using the Job ID index, so the cost doesn't depend on the size of the CSV
+        '''
+        path = self.paths["applied"]
+        if not os.path.exists(path): raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        with file_lock(path):
+            index = JobIdIndex(path, persist=False)
+            try:
+                if job_id not in index: return False
+            finally:
+                index.close()
+            with open(self.updates_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps({'Job ID': job_id, 'Date Applied': date_applied}) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+        return True
+
+    def fold_updates(self) -> int:
+        '''
+        Rewrites the applied CSV with the journaled updates applied, then clears the journal. Returns the number of updated jobs.
+        * The new CSV is written to a temporary file and replaced in one step, so a crash leaves either the old or the new file
+        '''
+        path = self.paths["applied"]
+        with file_lock(path):
+            updates = self.pending_updates()
+            if not updates: return 0
+            temp_path = path + ".tmp"
+            with open_history(path) as source, open_history(temp_path, 'w', is_compressed(path)) as target:
+                reader = csv.DictReader(source)
+                writer = csv.DictWriter(target, fieldnames=reader.fieldnames)
+                writer.writeheader()
+                for row in reader:
+                    if row['Job ID'] in updates: row.update(updates[row['Job ID']])
+                    writer.writerow(row)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, path)
+            os.remove(self.updates_path)
+        print_lg(f'Folded updates of {len(updates)} jobs into "{path}".')
+        return len(updates)
+    #>
+
+
+
+class SQLiteHistoryStore(HistoryStore):
+    '''
+    Stores history in an SQLite database at `history_db_path` in `config/settings.py`.
+    * Uses WAL mode, so the dashboard can read while the bot is writing
+    * Indexed on Job ID, Company, Date Applied, Date Tried and Assumed Reason
+    * Imports the existing CSV files when the database is created for the first time, unless `import_existing = False`
+    '''
+    def __init__(self, db_path: str = history_db_path, import_existing: bool = True) -> None:
+        self.db_path = db_path
+        self.__local = threading.local()
+        is_new = not os.path.exists(db_path)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.__create_schema()
+        if is_new and import_existing: import_csv(self, CSVHistoryStore())
+
+    def connection(self) -> sqlite3.Connection:
+        '''
+        Returns the connection of the current thread, opening it if needed. (SQLite connections can't be shared across threads)
+        '''
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.__local.conn = conn
+        return conn
+
+    def __create_schema(self) -> None:
+        conn = self.connection()
+        with conn:
+            for kind, fields in FIELDS.items():
+                columns = ", ".join(f"{to_column(field)} TEXT" for field in fields)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {kind} (seq INTEGER PRIMARY KEY AUTOINCREMENT, {columns})")
+            conn.execute("CREATE INDEX IF NOT EXISTS applied_job_id ON applied (job_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS applied_company ON applied (company)")
+            conn.execute("CREATE INDEX IF NOT EXISTS applied_date_applied ON applied (date_applied)")
+            conn.execute("CREATE INDEX IF NOT EXISTS failed_job_id ON failed (job_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS failed_date_tried ON failed (date_tried)")
+            conn.execute("CREATE INDEX IF NOT EXISTS failed_assumed_reason ON failed (assumed_reason)")
+
+    def append(self, kind: HistoryKind, rows: list[dict]) -> None:
+        fields = FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        placeholders = ", ".join("?" for _ in fields)
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {kind} ({columns}) VALUES ({placeholders})",
+                [[to_text(row.get(field)) for field in fields] for row in rows]
+            )
+
+    def iter_rows(self, kind: HistoryKind) -> Iterator[dict]:
+        fields = FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        for record in self.connection().execute(f"SELECT {columns} FROM {kind} ORDER BY seq"):
+            yield dict(zip(fields, record))
+
+    def __select(self, kind: HistoryKind, filters: dict, fields: list[str] | None) -> tuple[str, str, list]:
+        '''
+        Returns `(columns, where, params)` SQL parts equivalent to `matches_filters()`
+        '''
+        fields = fields or FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        clauses, params = [], []
+        for column, key in (("company", "company"), ("title", "title")):
+            if filters.get(key):
+                clauses.append(f"instr(lower({column}), lower(?)) > 0")
+                params.append(filters[key])
+        date_column = to_column(DATE_FIELDS[kind])
+        if filters.get("date_from") or filters.get("date_to"):
+            clauses.append(f"{date_column} GLOB '[0-9]*'")
+        if filters.get("date_from"):
+            clauses.append(f"{date_column} >= ?")
+            params.append(filters["date_from"])
+        if filters.get("date_to"):
+            clauses.append(f"substr({date_column}, 1, length(?)) <= ?")
+            params += [filters["date_to"], filters["date_to"]]
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return columns, where, params
+
+    def page(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int = 100, offset: int = 0, fields: list[str] | None = None) -> tuple[int, list[dict]]:
+        columns, where, params = self.__select(kind, filters, fields)
+        total = self.connection().execute(f"SELECT COUNT(*) FROM {kind}{where}", params).fetchone()[0]
+        return total, list(self.stream(kind, filters, sort_by, descending, limit, offset, fields))
+
+    def stream(self, kind: HistoryKind, filters: dict, sort_by: str | None = None, descending: bool = False, limit: int | None = None, offset: int = 0, fields: list[str] | None = None) -> Iterator[dict]:
+        fields = fields or FIELDS[kind]
+        columns, where, params = self.__select(kind, filters, fields)
+        if sort_by and sort_by not in FIELDS[kind]: raise ValueError(f'Can\'t sort {kind} jobs by "{sort_by}"')
+        order = f"{to_column(sort_by)} {'DESC' if descending else 'ASC'}, seq" if sort_by else "seq"
+        query = f"SELECT {columns} FROM {kind}{where} ORDER BY {order} LIMIT ? OFFSET ?"
+        for record in self.connection().execute(query, params + [-1 if limit is None else limit, offset]):
+            yield dict(zip(fields, record))
+
+    def get(self, kind: HistoryKind, job_id: str) -> dict | None:
+        fields = FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        record = self.connection().execute(f"SELECT {columns} FROM {kind} WHERE job_id = ? ORDER BY seq DESC LIMIT 1", (str(job_id),)).fetchone()
+        return dict(zip(fields, record)) if record else None
+
+    def tail(self, kind: HistoryKind, count: int) -> list[dict]:
+        fields = FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        records = self.connection().execute(f"SELECT {columns} FROM {kind} ORDER BY seq DESC LIMIT ?", (count,)).fetchall()
+        return [dict(zip(fields, record)) for record in reversed(records)]
+
+    def count(self, kind: HistoryKind) -> int:
+        return self.connection().execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+
+    def since(self, kind: HistoryKind, seq: int) -> tuple[int, list[dict]]:
+        fields = FIELDS[kind]
+        columns = ", ".join(to_column(field) for field in fields)
+        conn = self.connection()
+        count = conn.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+        # Limited to the counted rows, so rows written meanwhile are left for the next sync
+        records = conn.execute(f"SELECT {columns} FROM {kind} ORDER BY seq LIMIT ? OFFSET ?", (max(0, count - seq), seq)).fetchall()
+        return count, [dict(zip(fields, record)) for record in records]
+
+    def applied_job_ids(self) -> 'SQLiteJobIds':
+        return SQLiteJobIds(self)
+
+    def update_date_applied(self, job_id: str, date_applied: str) -> bool:
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute("UPDATE applied SET date_applied = ? WHERE job_id = ?", (date_applied, job_id))
+            # Counts updates in the database header, for `updates_stamp()`. Part of the same transaction as the update
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        return cursor.rowcount > 0
+
+    def stamp(self, kind: HistoryKind) -> list[int]:
+        return file_stamp([self.db_path, self.db_path + "-wal"])
+
+    def updates_stamp(self, kind: HistoryKind) -> list[int]:
+        return [self.connection().execute("PRAGMA user_version").fetchone()[0]] if kind == "applied" else []
+
+    def sync(self) -> None:
+        self.connection().execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self) -> None:
+        conn = getattr(self.__local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.__local.conn = None
+
+
+
+class SQLiteJobIds:
+    '''
+    Set-like view of applied Job IDs that looks up the `applied_job_id` index instead of loading every Job ID
+    '''
+    def __init__(self, store: SQLiteHistoryStore) -> None:
+        self.store = store
+        self.__extra = set()
+
+    def __contains__(self, job_id: str) -> bool:
+        if job_id in self.__extra: return True
+        return self.store.connection().execute("SELECT 1 FROM applied WHERE job_id = ? LIMIT 1", (str(job_id),)).fetchone() is not None
+
+    def add(self, job_id: str) -> None:
+        '''
+        Adds `job_id` in memory only, the store already has it once the job is saved
+        '''
+        self.__extra.add(job_id)
+
+
+
+def file_stamp(paths: list[str]) -> list[int]:
+    '''
+    Returns `[size, modification time in ns]` of each of `paths`, `[0, 0]` for missing files
+    '''
+    stamp = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamp += [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            stamp += [0, 0]
+    return stamp
+
+
+
+#< Backend selection and CSV compatibility
+__store = None
+__store_lock = threading.Lock()
+
+def get_history_store() -> HistoryStore:
+    '''
+    Returns the history store selected by `history_backend` in `config/settings.py` (Shared by the bot and the dashboard)
+    '''
+    global __store
+    with __store_lock:
+        if __store is None:
+            if history_backend == "sqlite":
+                __store = SQLiteHistoryStore()
+            elif history_backend == "partitioned":
+                from modules.history.partitions import PartitionedHistoryStore
+                __store = PartitionedHistoryStore()
+            else:
+                __store = CSVHistoryStore()
+        return __store
+
+
+def import_csv(target: HistoryStore, source: CSVHistoryStore) -> None:
+    '''
+    Copies all rows of the `source` CSV files into `target`
+    '''
+    for kind in FIELDS:
+        try:
+            rows = list(source.iter_rows(kind))
+        except FileNotFoundError:
+            continue
+        if rows:
+            target.append(kind, rows)
+            print_lg(f'Imported {len(rows)} rows from "{source.paths[kind]}" into {kind} history.')
+
+
+def export_csv(source: HistoryStore, applied_path: str = file_name, failed_path: str = failed_file_name) -> None:
+    '''
+    Writes all rows of `source` to CSV files with the same headers as `CSVHistoryStore`.
+    * Files are written to a temporary file first and then replaced, so readers never see a half written file
+    '''
+    for kind, path in (("applied", applied_path), ("failed", failed_path)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS[kind], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(source.iter_rows(kind))
+        os.replace(temp_path, path)
+        print_lg(f'Exported {kind} history to "{path}".')
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the application history store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Export the history to CSV files")
+    export_parser.add_argument("--applied", default=file_name, help="Path of the applied jobs CSV")
+    export_parser.add_argument("--failed", default=failed_file_name, help="Path of the failed jobs CSV")
+    commands.add_parser("import", help="Import the CSV files given in config/settings.py into the SQLite store")
+    commands.add_parser("fold", help="Write updates made from the dashboard into the applied jobs CSV")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_csv(get_history_store(), args.applied, args.failed)
+    elif args.command == "import":
+        import_csv(SQLiteHistoryStore(import_existing=False), CSVHistoryStore())
+    elif args.command == "fold":
+        CSVHistoryStore().fold_updates()
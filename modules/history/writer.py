@@ -0,0 +1,276 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import queue
+import argparse
+import threading
+
+from time import monotonic, sleep
+
+from config.settings import logs_folder_path, history_fsync, archive_descriptions
+from modules.helpers import print_lg, make_directories
+from modules.history.archive import get_description_archive, archive_text, archive_skip_message
+from modules.history.store import HistoryKind, HistoryStore, get_history_store
+from modules.history.rollups import get_history_rollups
+from modules.history.search import get_search_index
+from modules.perf.tracing import trace_span
+
+
+
+#### Write-behind history writer ####
+'''
+Rows of applied and failed jobs are queued by the bot and written by a background thread, so a slow or locked
+history file (Eg: the CSV open in Excel) never stalls applying.
+* Rows are written in batches, once `BATCH_SIZE` rows are queued or `FLUSH_INTERVAL` seconds after the first queued row
+* Job descriptions are moved into the archive (See `modules/history/archive.py`) just before their batch is written, off the bot's thread
+* Counts in `modules/history/rollups.py` and the search index in `modules/history/search.py` are updated after every written batch
+* Writes that fail because the file is locked are retried with a growing delay until `close()`
+* Rows that still couldn't be written on `close()` are saved to `UNSAVED_PATH`, run `python -m modules.history.writer replay` to write them
+'''
+
+MAX_QUEUED = 1000
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0
+MAX_RETRY_DELAY = 10.0
+DRAIN_TIMEOUT = 30.0
+
+UNSAVED_PATH = os.path.join(logs_folder_path, "unsaved_history.jsonl")
+
+# Field of each history that holds the job description, and how it's archived
+ARCHIVED_FIELDS = {"applied": ("About Job", archive_text), "failed": ("Stack Trace", archive_skip_message)}
+
+# Errors raised while another program holds the file, worth retrying
+TRANSIENT_ERRORS = (PermissionError, BlockingIOError, TimeoutError)
+
+
+class HistoryWriter:
+    '''
+    Background thread that writes queued history rows into `store`.
+    * `fsync` is `"none"` (leave it to the OS), `"batch"` (after every batch) or `"exit"` (once in `close()`)
+    '''
+    def __init__(self, store: HistoryStore, fsync: str = history_fsync) -> None:
+        self.store = store
+        self.fsync = fsync
+        self.__queue = queue.Queue(MAX_QUEUED)
+        self.__pending = []     # Only used by the writer thread
+        self.__unsaved_count = 0
+        self.__unsaved_lock = threading.Lock()
+        self.__closing = threading.Event()
+        self.__drain_deadline = float("inf")
+        self.__thread = threading.Thread(target=self.__run, name="history-writer", daemon=True)
+        self.__thread.start()
+
+    def put(self, kind: HistoryKind, row: dict, search_term: str | None = None) -> None:
+        '''
+        Queues `row` to be written to the `kind` history. Only blocks if `MAX_QUEUED` rows are already waiting
+        * `search_term` the job was found with is only counted in the rollups, it's not a history column
+        '''
+        if self.__queue.full(): print_lg(f"History writer is {MAX_QUEUED} rows behind, waiting for it to catch up...")
+        self.__queue.put((kind, row, search_term))
+
+    #< Writer thread
+    def __run(self) -> None:
+        while not (self.__closing.is_set() and (self.__queue.empty() and not self.__pending or self.__drain_expired())):
+            self.__collect()
+            if self.__pending: self.__write_pending()
+        # Rows still pending after the drain deadline, saved here since `close()` never touches `self.__pending`
+        if self.__pending:
+            self.__save_unsaved(self.__pending)
+            self.__pending = []
+
+    def __collect(self) -> None:
+        '''
+        Moves queued rows into `self.__pending` until the batch is full or `FLUSH_INTERVAL` has passed since the first one
+        '''
+        deadline = None
+        while len(self.__pending) < BATCH_SIZE:
+            if deadline is None and not self.__pending:
+                timeout = 0.2   # Idle, wake up now and then to notice `close()`
+            else:
+                deadline = deadline or monotonic() + FLUSH_INTERVAL
+                timeout = deadline - monotonic()
+                if timeout <= 0 or self.__closing.is_set(): return
+            try:
+                self.__pending.append(self.__queue.get(timeout=timeout))
+            except queue.Empty:
+                if not self.__pending or self.__closing.is_set(): return
+
+    def __write_pending(self) -> None:
+        delay = 0.5
+        warned = False
+        while self.__pending:
+            try:
+                for kind in ("applied", "failed"):
+                    written = [item for item in self.__pending if item[0] == kind]
+                    if not written: continue
+                    # Rows are from many jobs, so the span isn't tagged with the Job ID the bot is at now
+                    with trace_span("history_write", job_id=None, search_term=None, kind=kind, rows=len(written)):
+                        archive_rows(kind, written)
+                        self.store.append(kind, [row for _, row, _ in written])
+                        self.__pending = [item for item in self.__pending if item[0] != kind]
+                        record_rollups(written)
+                        record_search(kind, written)
+                if self.fsync == "batch": self.store.sync()
+            except TRANSIENT_ERRORS as e:
+                if self.__closing.is_set() and self.__drain_expired(): return
+                if not warned: print_lg(f"Couldn't write {len(self.__pending)} rows to history, will retry. Is the file open in another program?", e)
+                warned = True
+                sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            except Exception as e:
+                print_lg("Failed to update the history!", e)
+                self.__save_unsaved(self.__pending)
+                self.__pending = []
+                return
+
+    def __drain_expired(self) -> bool:
+        return monotonic() > self.__drain_deadline
+    #>
+
+    #< Shutdown
+    def close(self) -> None:
+        '''
+        Writes all queued rows, waiting up to `DRAIN_TIMEOUT` seconds. Rows left unwritten are saved to `UNSAVED_PATH`
+        * Rows the writer thread already took are only saved by that thread, so a row is never both written and saved
+        '''
+        self.__drain_deadline = monotonic() + DRAIN_TIMEOUT
+        self.__closing.set()
+        self.__thread.join(DRAIN_TIMEOUT + 5)
+        left = []
+        while True:
+            try:
+                left.append(self.__queue.get_nowait())
+            except queue.Empty:
+                break
+        if left: self.__save_unsaved(left)
+        if self.__thread.is_alive():
+            print_lg("History writer is still writing a batch, its rows are lost if it doesn't finish before the bot exits.", level="error")
+        if self.__unsaved_count:
+            print_lg(f"Failed to update the history files with {self.__unsaved_count} jobs! The file may be open in another program, or can't be written. "
+                     f"They were saved in \"{UNSAVED_PATH}\", close the file and run `python -m modules.history.writer replay` to add them.", level="error")
+        elif self.fsync == "exit" and not self.__thread.is_alive():
+            # Archived descriptions first, so synced rows never reference blocks that aren't on disk
+            if archive_descriptions: get_description_archive().sync()
+            self.store.sync()
+
+    def __save_unsaved(self, items: list[tuple[HistoryKind, dict, str | None]]) -> None:
+        '''
+        Appends `items` to `UNSAVED_PATH`. Called by the writer thread for its batch and by `close()` for rows still queued
+        '''
+        with self.__unsaved_lock:
+            make_directories([UNSAVED_PATH])
+            with open(UNSAVED_PATH, "a", encoding="utf-8") as file:
+                for kind, row, search_term in items:
+                    file.write(json.dumps({"kind": kind, "row": row, "search_term": search_term}, default=str) + "\n")
+            self.__unsaved_count += len(items)
+        print_lg(f'Saved {len(items)} history rows that couldn\'t be written to "{UNSAVED_PATH}".')
+    #>
+
+
+
+#< Shared writer
+__writer = None
+__writer_lock = threading.Lock()
+
+def get_history_writer() -> HistoryWriter:
+    '''
+    Returns the writer of the store from `get_history_store()`, starting it if needed
+    '''
+    global __writer
+    with __writer_lock:
+        if __writer is None: __writer = HistoryWriter(get_history_store())
+        return __writer
+
+
+def close_history_writer() -> None:
+    '''
+    Drains and stops the shared writer, if it was started
+    '''
+    global __writer
+    with __writer_lock:
+        if __writer is not None: __writer.close()
+        __writer = None
+
+
+def archive_rows(kind: HistoryKind, written: list[tuple[HistoryKind, dict, str | None]]) -> None:
+    '''
+    Replaces the description of written `kind` rows with its archive reference. If archiving fails, rows keep the text
+    '''
+    field, archive = ARCHIVED_FIELDS[kind]
+    try:
+        for _, row, _ in written:
+            if field in row: row[field] = archive(row[field])
+    except Exception as e:
+        print_lg("Failed to archive job descriptions, writing them to the history as they are.", e)
+
+
+def record_rollups(written: list[tuple[HistoryKind, dict, str | None]]) -> None:
+    '''
+    Adds written `(kind, row, search_term)` items to the rollups. Failing to count them doesn't fail the write
+    '''
+    groups = {}
+    for kind, row, search_term in written:
+        groups.setdefault((kind, search_term), []).append(row)
+    try:
+        for (kind, search_term), rows in groups.items():
+            get_history_rollups().record(kind, rows, search_term)
+    except Exception as e:
+        print_lg("Failed to update history rollups, run `python -m modules.history.rollups rebuild` to fix them.", e)
+
+
+def record_search(kind: HistoryKind, written: list[tuple[HistoryKind, dict, str | None]]) -> None:
+    '''
+    Adds written `kind` rows to the search index, if it's enabled. Failing to index them doesn't fail the write
+    '''
+    try:
+        index = get_search_index()
+        if index: index.add_rows(kind, [row for _, row, _ in written])
+    except Exception as e:
+        print_lg("Failed to update the history search index, run `python -m modules.history.search rebuild` to fix it.", e)
+
+
+def replay_unsaved(store: HistoryStore, path: str = UNSAVED_PATH) -> int:
+    '''
+    Writes rows saved by `HistoryWriter.close()` into `store` and removes the file. Returns the number of rows written.
+    '''
+    if not os.path.exists(path): return 0
+    items = {"applied": [], "failed": []}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            item = json.loads(line)
+            items[item["kind"]].append((item["kind"], item["row"], item.get("search_term")))
+    for kind, written in items.items():
+        if written:
+            archive_rows(kind, written)
+            store.append(kind, [row for _, row, _ in written])
+            record_rollups(written)
+            record_search(kind, written)
+    store.sync()
+    os.remove(path)
+    return len(items["applied"]) + len(items["failed"])
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage history rows that couldn't be written.")
+    parser.add_argument("command", choices=["replay"], help=f'replay: write the rows saved in "{UNSAVED_PATH}" to the history')
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        print_lg(f"Wrote {replay_unsaved(get_history_store())} saved rows to the history.")
@@ -0,0 +1,39 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+#### Logging of shared modules ####
+'''
+Modules the dashboard (`app.py`) also imports, like `modules/history/`, log through `print_lg()` here instead of the one in `modules/helpers.py`,
+which needs a display for `pyautogui` and writes to `log.jsonl`.
+* In the bot, `modules/helpers.py` registers its `print_lg()` with `use_print_lg()`, so their messages are logged as usual
+* In the dashboard and CLIs that don't import `modules/helpers.py`, they're only printed. So only the bot writes `log.jsonl`
+'''
+
+__print_lg = None
+
+def use_print_lg(function) -> None:
+    '''
+    Sends messages of `print_lg()` to `function` from now on
+    '''
+    global __print_lg
+    __print_lg = function
+
+
+def print_lg(*msgs, end: str = "\n", **kwargs) -> None:
+    '''
+    Logs with the registered `print_lg()` (See `use_print_lg()`), or only prints if none is registered
+    '''
+    if __print_lg is not None: return __print_lg(*msgs, end=end, **kwargs)
+    for message in msgs:
+        print(message, end=end)
@@ -0,0 +1,193 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import gzip
+import json
+import sqlite3
+import argparse
+import threading
+
+from glob import glob, escape
+
+from config.settings import logs_folder_path
+
+
+
+#### Job ID index of the log ####
+'''
+SQLite index in `logs/log-index.db` of where each job's records are in the logs, kept by the log writer as it writes
+(See `modules/logs/writer.py`), so one job's log is read without scanning the files:
+
+    ranges(job_id, file, start, end)    "4012345678", "log.jsonl", 1048576, 1052112
+
+* Offsets are bytes of the uncompressed log. Consecutive records of a job are one range, even across flushes
+* When the log is rotated its ranges follow it to `log-<date>.jsonl.gz` (Read by decompressing up to the range, still without parsing the file),
+  ranges of deleted logs are dropped
+* Run `python -m modules.logs.index show <job id>` to print a job's log, `python -m modules.logs.index rebuild` to index existing logs
+Only uses the standard library and settings, since `modules/helpers.py` imports the log writer that uses it.
+'''
+
+INDEX_NAME = "log-index.db"
+LOG_NAME = "log.jsonl"
+
+
+class LogIndex:
+    '''
+    Job ID -> (file, start, end) ranges of log files in `logs_path`. Safe to use from the log writer thread and readers at once
+    '''
+    def __init__(self, logs_path: str = logs_folder_path) -> None:
+        self.logs_path = logs_path
+        self.path = os.path.join(logs_path, INDEX_NAME)
+        self.__last = None      # (job_id, file, end, rowid) of the latest range, to extend it
+        self.__connection = None
+        self.__lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            os.makedirs(self.logs_path or ".", exist_ok=True)
+            self.__connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS ranges (job_id TEXT NOT NULL, file TEXT NOT NULL, start INTEGER NOT NULL, end INTEGER NOT NULL)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS ranges_job_id ON ranges (job_id)")
+        return self.__connection
+
+    #< Writing
+    def add(self, file: str, ranges: list[tuple[str, int, int]]) -> None:
+        '''
+        Adds `(job_id, start, end)` ranges of records just written to `file`, in the order they were written
+        '''
+        if not ranges: return
+        with self.__lock, self.connection() as conn:
+            for job_id, start, end in ranges:
+                last = self.__last
+                # The file of the row is checked again, since another process may have rotated the log since
+                if last and last[0] == job_id and last[1] == file and last[2] == start \
+                        and conn.execute("UPDATE ranges SET end = ? WHERE rowid = ? AND file = ?", (end, last[3], file)).rowcount:
+                    self.__last = (job_id, file, end, last[3])
+                else:
+                    rowid = conn.execute("INSERT INTO ranges VALUES (?, ?, ?, ?)", (job_id, file, start, end)).lastrowid
+                    self.__last = (job_id, file, end, rowid)
+
+    def rename(self, file: str, new_file: str) -> None:
+        '''
+        Moves ranges of `file` to `new_file`, when the log is rotated or compressed
+        '''
+        with self.__lock, self.connection() as conn:
+            conn.execute("UPDATE ranges SET file = ? WHERE file = ?", (new_file, file))
+            self.__last = None
+
+    def drop(self, files: list[str]) -> None:
+        '''
+        Removes ranges of deleted log `files`
+        '''
+        if not files: return
+        with self.__lock, self.connection() as conn:
+            conn.executemany("DELETE FROM ranges WHERE file = ?", [(file,) for file in files])
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__connection is not None: self.__connection.close()
+            self.__connection = None
+    #>
+
+    #< Reading
+    def ranges(self, job_id: str) -> list[tuple[str, int, int]]:
+        '''
+        `(file, start, end)` of every range of `job_id`'s records, oldest first
+        '''
+        with self.__lock:
+            return self.connection().execute("SELECT file, start, end FROM ranges WHERE job_id = ? ORDER BY rowid", (str(job_id),)).fetchall()
+
+    def read(self, job_id: str) -> list[dict]:
+        '''
+        Returns all log records of `job_id`, oldest first. Ranges of logs that are gone are skipped
+        '''
+        records = []
+        opened = {}
+        try:
+            for file, start, end in self.ranges(job_id):
+                if file not in opened:
+                    path = os.path.join(self.logs_path, file)
+                    if not os.path.exists(path): opened[file] = None; continue
+                    opened[file] = gzip.open(path, "rb") if file.endswith(".gz") else open(path, "rb")
+                source = opened[file]
+                if source is None: continue
+                source.seek(start)
+                for line in source.read(end - start).splitlines():
+                    try: records.append(json.loads(line))
+                    except ValueError: pass
+        finally:
+            for source in opened.values():
+                if source is not None: source.close()
+        return records
+    #>
+
+    def rebuild(self) -> int:
+        '''
+        Indexes all logs in `logs_path` from scratch, returns the number of ranges
+        '''
+        files = sorted(os.path.basename(path) for path in glob(os.path.join(escape(self.logs_path), "log-*.jsonl.gz")))
+        if os.path.exists(os.path.join(self.logs_path, LOG_NAME)): files.append(LOG_NAME)
+        with self.__lock, self.connection() as conn:
+            conn.execute("DELETE FROM ranges")
+            self.__last = None
+        for file in files:
+            path = os.path.join(self.logs_path, file)
+            records = []
+            with (gzip.open(path, "rb") if file.endswith(".gz") else open(path, "rb")) as source:
+                for line in source:
+                    try: job_id = json.loads(line).get("job_id")
+                    except (ValueError, AttributeError): job_id = None
+                    records.append((job_id, len(line)))
+            self.add(file, to_ranges(records, 0))
+        with self.__lock:
+            return self.connection().execute("SELECT COUNT(*) FROM ranges").fetchone()[0]
+
+
+def to_ranges(records: list[tuple[str | None, int]], offset: int) -> list[tuple[str, int, int]]:
+    '''
+    Merges consecutive `(job_id, size)` records written from `offset` into `(job_id, start, end)` ranges, skipping records without a Job ID
+    '''
+    ranges = []
+    for job_id, size in records:
+        if job_id is not None:
+            if ranges and ranges[-1][0] == str(job_id) and ranges[-1][2] == offset:
+                ranges[-1] = (ranges[-1][0], ranges[-1][1], offset + size)
+            else:
+                ranges.append((str(job_id), offset, offset + size))
+        offset += size
+    return ranges
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read the log of one job using the Job ID index of the logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_parser = commands.add_parser("show", help="Print all log records of a job")
+    show_parser.add_argument("job_id", help="Job ID, Eg: 4012345678")
+    show_parser.add_argument("--json", action="store_true", help="Print whole records as JSON lines")
+    commands.add_parser("rebuild", help="Index all existing logs from scratch")
+    args = parser.parse_args()
+
+    index = LogIndex()
+    if args.command == "show":
+        records = index.read(args.job_id)
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False) if args.json else f"{record.get('time')} [{record.get('phase') or '-'}] {record.get('message')}")
+        if not records: print(f"No log records of Job ID {args.job_id}, run `python -m modules.logs.index rebuild` if they're from before the index")
+    elif args.command == "rebuild":
+        print(f"Indexed {index.rebuild()} ranges of job logs in \"{index.path}\"")
@@ -0,0 +1,199 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import io
+import os
+import queue
+import base64
+import atexit
+import shutil
+import hashlib
+import threading
+
+from collections import deque
+
+from config.settings import logs_folder_path, screenshots_max_count, screenshots_max_mb
+from modules.helpers import print_lg
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+
+#### Screenshot pipeline ####
+'''
+`take_screenshot()` asks Chrome for a PNG through CDP (`Page.captureScreenshot`), optionally clipped to one element like the Easy Apply modal,
+and returns right away. Decoding, compressing and writing it to `logs/screenshots/` is done by a background thread:
+* With Pillow installed, PNGs are re-encoded with `optimize=True`
+* A screenshot identical to one of the last `RECENT_HASHES` is hard linked to it instead of written again (Copied if links aren't supported),
+  so its name still opens. Only identical ones, since failures on different questions can look almost the same
+* Only the latest `screenshots_max_count` screenshots, together at most `screenshots_max_mb`, are kept
+* If screenshots come faster than they can be written, new ones are dropped instead of waiting
+'''
+
+SCREENSHOTS_PATH = os.path.join(logs_folder_path, "screenshots")
+MAX_QUEUED = 20
+RECENT_HASHES = 50
+
+CLIP_SCRIPT = '''
+const box = arguments[0].getBoundingClientRect();
+return [box.left + window.scrollX, box.top + window.scrollY, box.width, box.height];
+'''
+
+
+def capture_png(driver, element=None) -> str:
+    '''
+    Returns a base64 PNG of the browser window, or only of `element` if given, through CDP. Falls back to Selenium's screenshot if CDP isn't available
+    '''
+    params = {"format": "png", "captureBeyondViewport": False}
+    if element is not None:
+        x, y, width, height = driver.execute_script(CLIP_SCRIPT, element)
+        if width > 0 and height > 0:
+            params.update(clip={"x": x, "y": y, "width": width, "height": height, "scale": 1}, captureBeyondViewport=True)
+    try:
+        data = driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"]
+    except AttributeError:
+        data = driver.get_screenshot_as_base64()
+    return data
+
+
+
+class ScreenshotPipeline:
+    '''
+    Saves screenshots to `path` from a background thread, keeping at most `max_count` files and `max_size` bytes
+    '''
+    def __init__(self, path: str = SCREENSHOTS_PATH, max_count: int = screenshots_max_count, max_size: int = screenshots_max_mb * 1024 * 1024) -> None:
+        self.path = path
+        self.max_count = max_count
+        self.max_size = max_size
+        self.__queue = queue.Queue(MAX_QUEUED)
+        self.__hashes = deque(maxlen=RECENT_HASHES)     # (SHA-1 of the PNG, path)
+        self.__files = None                             # deque of (path, size), oldest first
+        self.__size = 0
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def put(self, name: str, data: str) -> bool:
+        '''
+        Queues base64 PNG `data` to be saved as `name`, returns `False` if it was dropped since the queue is full
+        '''
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="screenshot-writer", daemon=True)
+                self.__thread.start()
+        try:
+            self.__queue.put_nowait((name, data))
+            return True
+        except queue.Full:
+            return False
+
+    def __run(self) -> None:
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None: return
+                self.__save(*item)
+            except Exception as e:
+                print_lg(f'Failed to save screenshot "{item[0]}"', e)
+            finally:
+                self.__queue.task_done()
+
+    def __save(self, name: str, data: str) -> None:
+        png = base64.b64decode(data)
+        fingerprint = hashlib.sha1(png).hexdigest()
+        if self.__files is None: self.__scan()
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, name)
+        same = next((file for recent, file in self.__hashes if recent == fingerprint and os.path.exists(file)), None)
+        if same is not None:
+            try:
+                os.link(same, path)
+            except OSError:
+                shutil.copyfile(same, path)
+            size = os.path.getsize(path)
+        else:
+            if Image is not None:
+                image = Image.open(io.BytesIO(png))
+                output = io.BytesIO()
+                image.save(output, "PNG", optimize=True)
+                png = output.getvalue()
+            with open(path, "wb") as file:
+                file.write(png)
+            size = len(png)
+        self.__hashes.append((fingerprint, path))
+        # Linked files are counted at full size too, so the limits hold even once the original is removed
+        self.__files.append((path, size))
+        self.__size += size
+        while len(self.__files) > 1 and (len(self.__files) > self.max_count or self.__size > self.max_size):
+            old, size = self.__files.popleft()
+            self.__size -= size
+            try: os.remove(old)
+            except FileNotFoundError: pass
+
+    def __scan(self) -> None:
+        '''
+        Finds screenshots saved by earlier runs, for the retention limits
+        '''
+        files = []
+        if os.path.isdir(self.path):
+            for entry in os.scandir(self.path):
+                if entry.is_file() and entry.name.lower().endswith(".png"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+        files.sort()
+        self.__files = deque((path, size) for _, path, size in files)
+        self.__size = sum(size for _, size in self.__files)
+
+    def close(self, timeout: float = 10) -> None:
+        '''
+        Waits up to `timeout` seconds for queued screenshots to be saved
+        '''
+        if self.__thread is None: return
+        try: self.__queue.put(None, timeout=timeout)
+        except queue.Full: return
+        self.__thread.join(timeout)
+
+
+
+#< Shared pipeline
+__pipeline = None
+__pipeline_lock = threading.Lock()
+
+def get_screenshot_pipeline() -> ScreenshotPipeline:
+    global __pipeline
+    with __pipeline_lock:
+        if __pipeline is None:
+            __pipeline = ScreenshotPipeline()
+            atexit.register(__pipeline.close)
+        return __pipeline
+
+
+def take_screenshot(driver, name: str, element=None) -> bool:
+    '''
+    Captures the browser window (Or only `element`, Eg: the Easy Apply modal) and saves it as `name` in the background.
+    Returns `False` if it couldn't be captured or was dropped
+    '''
+    try:
+        data = capture_png(driver, element)
+    except Exception as e:
+        print_lg(f'Failed to capture screenshot "{name}"', e)
+        return False
+    if get_screenshot_pipeline().put(name, data): return True
+    print_lg(f'Dropped screenshot "{name}", too many screenshots waiting to be saved.')
+    return False
+#>
@@ -0,0 +1,177 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import argparse
+import threading
+import traceback
+import zipfile
+
+from uuid import uuid4
+from datetime import datetime
+
+from config.settings import logs_folder_path, snapshots_max_mb
+from modules.helpers import print_lg
+from modules.logs.writer import get_log_writer
+
+
+
+#### Failure snapshots ####
+'''
+When the bot fails on a page, `save_snapshot()` saves what it was looking at as one compressed bundle in `logs/snapshots/`,
+instead of dumping the page HTML into the log. The log only gets the bundle ID:
+
+    snapshots/20250131-101502-3fa9c2.zip
+        page.html       The page source
+        screenshot.png  What the browser showed
+        meta.json       {"id", "time", "reason", "url", "title", "job_id", "phase", "search_term", "exception", "traceback"}
+
+* `snapshots/index.jsonl` has one line per bundle with its meta data and size, oldest first
+* Once the bundles add up to more than `snapshots_max_mb`, the oldest are deleted
+* Run `python -m modules.logs.snapshots list` to see them, `python -m modules.logs.snapshots extract <id>` to unpack one
+'''
+
+SNAPSHOTS_PATH = os.path.join(logs_folder_path, "snapshots")
+INDEX_NAME = "index.jsonl"
+
+
+class SnapshotStore:
+    '''
+    Ring of snapshot bundles in `path`, together at most `max_size` bytes
+    '''
+    def __init__(self, path: str = SNAPSHOTS_PATH, max_size: int = snapshots_max_mb * 1024 * 1024) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.index_path = os.path.join(path, INDEX_NAME)
+        self.__lock = threading.Lock()
+
+    def save(self, driver, reason: str, error: BaseException | None = None) -> str | None:
+        '''
+        Saves the page `driver` is on, why it's saved and the `error` raised (If any) as a bundle. Returns its ID, or `None` if it couldn't be saved
+        '''
+        context = get_log_writer().context
+        id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid4().hex[:6]}"
+        meta = {
+            "id": id, "time": datetime.now().isoformat(timespec="seconds"), "reason": reason,
+            "url": None, "title": None, "job_id": context.get("job_id"), "phase": context.get("phase"), "search_term": context.get("search_term"),
+            "exception": f"{type(error).__name__}: {error}" if error is not None else None,
+            "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__)) if error is not None else None,
+            "missing": [],
+        }
+        # Every part is optional, a bundle with the URL alone still helps if the browser is gone
+        html = screenshot = None
+        try: meta["url"] = driver.current_url
+        except Exception: meta["missing"].append("url")
+        try: meta["title"] = driver.title
+        except Exception: meta["missing"].append("title")
+        try: html = driver.page_source
+        except Exception: meta["missing"].append("page.html")
+        try: screenshot = driver.get_screenshot_as_png()
+        except Exception: meta["missing"].append("screenshot.png")
+
+        file = os.path.join(self.path, id + ".zip")
+        try:
+            with self.__lock:
+                os.makedirs(self.path, exist_ok=True)
+                with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as bundle:
+                    if html is not None: bundle.writestr("page.html", html)
+                    if screenshot is not None: bundle.writestr("screenshot.png", screenshot, zipfile.ZIP_STORED)   # Already compressed
+                    bundle.writestr("meta.json", json.dumps(meta, indent=2, default=str))
+                entry = {key: value for key, value in meta.items() if key != "traceback"}
+                entry["size"] = os.path.getsize(file)
+                with open(self.index_path, "a", encoding="utf-8") as index:
+                    index.write(json.dumps(entry, default=str) + "\n")
+                self.__prune()
+        except Exception as e:
+            print_lg(f'Failed to save failure snapshot to "{file}"', e)
+            return None
+        return id
+
+    def entries(self) -> list[dict]:
+        '''
+        Index entries of the saved bundles, oldest first
+        '''
+        if not os.path.exists(self.index_path): return []
+        entries = []
+        with open(self.index_path, encoding="utf-8") as index:
+            for line in index:
+                try: entries.append(json.loads(line))
+                except ValueError: pass     # Line cut short when the bot was killed
+        return entries
+
+    def __prune(self) -> None:
+        entries = self.entries()
+        total = sum(entry.get("size", 0) for entry in entries)
+        if total <= self.max_size: return
+        kept = list(entries)
+        while kept and total > self.max_size and len(kept) > 1:
+            oldest = kept.pop(0)
+            total -= oldest.get("size", 0)
+            try: os.remove(os.path.join(self.path, oldest["id"] + ".zip"))
+            except FileNotFoundError: pass
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as index:
+            index.writelines(json.dumps(entry, default=str) + "\n" for entry in kept)
+        os.replace(temp_path, self.index_path)
+
+    def bundle_path(self, id: str) -> str:
+        path = os.path.join(self.path, os.path.basename(id) + ".zip")
+        if not os.path.exists(path): raise FileNotFoundError(f'No snapshot "{id}" in "{self.path}"')
+        return path
+
+
+
+#< Shared store
+__store = None
+
+def get_snapshot_store() -> SnapshotStore:
+    global __store
+    if __store is None: __store = SnapshotStore()
+    return __store
+
+
+def save_snapshot(driver, reason: str, error: BaseException | None = None) -> str | None:
+    '''
+    Saves a failure snapshot of the page `driver` is on and logs its ID, Eg: `save_snapshot(driver, "Failed to find Job listings", e)`
+    '''
+    id = get_snapshot_store().save(driver, reason, error)
+    if id: print_lg(f'Saved failure snapshot "{id}" ({reason}). Run `python -m modules.logs.snapshots extract {id}` to see it.', level="warning")
+    return id
+#>
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List and unpack failure snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List saved snapshots, oldest first")
+    extract_parser = commands.add_parser("extract", help="Unpack a snapshot into a folder")
+    extract_parser.add_argument("id", help='Snapshot ID from the log, Eg: "20250131-101502-3fa9c2"')
+    extract_parser.add_argument("--to", help="Folder to unpack into (Default: logs/snapshots/<id>/)")
+    args = parser.parse_args()
+
+    store = get_snapshot_store()
+    if args.command == "list":
+        entries = store.entries()
+        for entry in entries:
+            print(f"{entry['id']}  {entry.get('size', 0) / 1024:>8.0f} KB  job {entry.get('job_id') or '-':<12} {entry.get('phase') or '-':<16} {entry.get('reason')}  {entry.get('url') or ''}")
+        print(f"{len(entries)} snapshots, {sum(entry.get('size', 0) for entry in entries) / 1024 / 1024:.1f} of {snapshots_max_mb} MB")
+    elif args.command == "extract":
+        target = args.to or os.path.join(store.path, os.path.basename(args.id))
+        with zipfile.ZipFile(store.bundle_path(args.id)) as bundle:
+            bundle.extractall(target)
+        print(f'Unpacked snapshot "{args.id}" to "{target}"')
@@ -0,0 +1,244 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import atexit
+import threading
+
+from glob import glob, escape
+from datetime import datetime
+from typing import Literal
+
+from config.settings import logs_folder_path, log_max_size_mb, log_backups
+from modules.logs.index import LogIndex, to_ranges
+from modules.history.locking import file_lock
+
+
+
+#### Buffered structured log writer ####
+'''
+Backend of `print_lg()`. Messages are buffered in memory and written as JSON lines to `log.jsonl` in `logs_folder_path`
+by a background thread, through one file handle kept open for the whole run:
+
+    {"time": "2025-01-31T10:15:02.123", "level": "info", "job_id": "4012345678", "phase": "easy_apply", "message": "..."}
+
+* `job_id` and `phase` are set by the bot with `set_log_context()` as it works on each job
+* Text printed without a newline (Eg: streamed AI answers) is joined into one record once the line ends
+* Once the log grows past `log_max_size_mb` it's renamed to `log-<date>.jsonl`, compressed to `.jsonl.gz` and a new one is started,
+  only the latest `log_backups` compressed logs are kept
+* Errors are written right away, everything else within `FLUSH_INTERVAL` seconds
+* Where each job's records are is kept in `log-index.db` to read one job's log quickly (See `modules/logs/index.py`)
+* Writes and rotations hold a lock on `log.jsonl.lock`, since the dashboard and CLIs print to the same log from other processes
+'''
+
+LOG_PATH = os.path.join(logs_folder_path, "log.jsonl")
+FLUSH_INTERVAL = 1.0
+LOCK_TIMEOUT = 5.0
+MAX_BUFFERED = 10_000
+
+LogLevel = Literal["debug", "info", "warning", "error"]
+
+
+class LogWriter:
+    '''
+    Buffers log records and writes them to `path` from a background thread, started on the first record.
+    * `max_size` is in bytes, `backups` is the number of rotated logs to keep
+    '''
+    def __init__(self, path: str = LOG_PATH, max_size: int = log_max_size_mb * 1024 * 1024, backups: int = log_backups) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.backups = backups
+        self.context = {"job_id": None, "phase": None}
+        self.index = LogIndex(os.path.dirname(path))
+        self.__records = []     # (job_id, record)
+        self.__partial = ""
+        self.__dropped = 0
+        self.__file = None
+        self.__failing = False
+        self.__lock = threading.Lock()
+        self.__write_lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__closed = threading.Event()
+        self.__thread = None
+
+    def write(self, text: str, level: LogLevel = "info") -> None:
+        '''
+        Buffers `text`, every complete line of it (Ending in a newline) becomes one record. Records with level "error" are written immediately
+        '''
+        with self.__lock:
+            text = self.__partial + text
+            end = text.rfind("\n")
+            if end < 0:
+                self.__partial = text
+                return
+            self.__partial = text[end + 1:]
+            self.__add(text[:end], level)
+            if self.__thread is None and not self.__closed.is_set(): self.__start()
+        # Nothing flushes once closed (Eg: logs printed by other `atexit` handlers), so write those right away too
+        if level == "error" or self.__closed.is_set(): self.flush()
+
+    def __add(self, message: str, level: LogLevel) -> None:
+        if len(self.__records) >= MAX_BUFFERED:
+            self.__records.pop(0)
+            self.__dropped += 1
+        self.__records.append((self.context.get("job_id"), to_record(message, level, self.context)))
+
+    def __start(self) -> None:
+        self.__thread = threading.Thread(target=self.__run, name="log-writer", daemon=True)
+        self.__thread.start()
+
+    def __run(self) -> None:
+        while not self.__closed.is_set():
+            self.__wake.wait(FLUSH_INTERVAL)
+            self.__wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        '''
+        Writes buffered records to the log now. If the log can't be written (Eg: it's open in another program) they're kept for the next try
+        '''
+        with self.__write_lock:
+            with self.__lock:
+                records, self.__records = self.__records, []
+                dropped, self.__dropped = self.__dropped, 0
+            if dropped: records.insert(0, (None, to_record(f"Dropped {dropped} log records while the log couldn't be written", "warning", {})))
+            if not records: return
+            encoded = [record.encode("utf-8") for _, record in records]
+            try:
+                with file_lock(self.path, LOCK_TIMEOUT):
+                    start = self.__append(b"".join(encoded))
+                    self.__failing = False
+                    self.__index(lambda: self.index.add(os.path.basename(self.path), to_ranges([(job_id, len(line)) for (job_id, _), line in zip(records, encoded)], start)))
+                    if start + sum(len(line) for line in encoded) < self.max_size: return
+                    try:
+                        self.__rotate()
+                    except Exception as e:
+                        print(f'Failed to rotate "{self.path}", will try again after the next write.', e)
+            except Exception as e:
+                self.__close_file()
+                with self.__lock:
+                    kept = records[-MAX_BUFFERED:]
+                    self.__dropped += len(records) - len(kept)
+                    self.__records = kept + self.__records
+                # Another process (Eg: the dashboard) holding the log for long is retried quietly.
+                # Only printed, an alert would block the flush thread (And needs a display the dashboard may not have)
+                if not self.__failing and not isinstance(e, TimeoutError):
+                    self.__failing = True
+                    print(f'Failed to write logs to "{self.path}", it may be open or occupied by another program! Please close it! Logs are kept in memory until it can be written.', e, file=sys.stderr)
+
+    def __append(self, data: bytes) -> int:
+        '''
+        Appends `data` to the end of the log as it is on disk, returns the offset it was written at.
+        Must hold the log's file lock, since the dashboard and CLIs write and rotate the same log
+        '''
+        if self.__file is not None:
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            opened = os.fstat(self.__file.fileno())
+            # Rotated by another process, so the open handle is of the old log
+            if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino): self.__close_file()
+        if self.__file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.__file = open(self.path, "ab")
+        start = os.fstat(self.__file.fileno()).st_size
+        self.__file.write(data)
+        self.__file.flush()
+        return start
+
+    def __rotate(self) -> None:
+        '''
+        Compresses the current log to `log-<date>.jsonl.gz` and starts a new one, keeping only the latest `backups` compressed logs
+        '''
+        self.__close_file()
+        base, extension = os.path.splitext(self.path)
+        rotated = f"{base}-{datetime.now():%Y%m%d-%H%M%S-%f}{extension}"
+        os.replace(self.path, rotated)
+        self.__index(lambda: self.index.rename(os.path.basename(self.path), os.path.basename(rotated)))
+        with open(rotated, "rb") as source, gzip.open(rotated + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+        self.__index(lambda: self.index.rename(os.path.basename(rotated), os.path.basename(rotated) + ".gz"))
+        removed = sorted(glob(f"{escape(base)}-*{extension}.gz"))[:-self.backups or None]
+        for old in removed:
+            os.remove(old)
+        self.__index(lambda: self.index.drop([os.path.basename(old) for old in removed]))
+
+    def __index(self, update) -> None:
+        '''
+        Runs an update of the Job ID index, which is stopped at the first error since logging must go on without it
+        '''
+        if self.index is None: return
+        try:
+            update()
+        except Exception as e:
+            print(f'Failed to update the Job ID index of the log "{self.index.path}", not indexing the log from now on.', e)
+            self.index = None
+
+    def __close_file(self) -> None:
+        if self.__file is None: return
+        try:
+            self.__file.close()
+        except Exception:
+            pass
+        self.__file = None
+
+    def close(self) -> None:
+        '''
+        Writes the unfinished line and everything buffered, and closes the log
+        '''
+        with self.__lock:
+            if self.__partial: self.__add(self.__partial, "info")
+            self.__partial = ""
+        self.__closed.set()
+        self.__wake.set()
+        if self.__thread is not None: self.__thread.join(5)
+        self.flush()
+        with self.__write_lock:
+            self.__close_file()
+            if self.index is not None: self.index.close()
+
+
+def to_record(message: str, level: LogLevel, context: dict) -> str:
+    record = {"time": datetime.now().isoformat(timespec="milliseconds"), "level": level, "job_id": None, "phase": None, **context, "message": message}
+    return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+
+#< Shared writer
+__writer = None
+__writer_lock = threading.Lock()
+
+def get_log_writer() -> LogWriter:
+    global __writer
+    with __writer_lock:
+        if __writer is None:
+            __writer = LogWriter()
+            atexit.register(__writer.close)
+        return __writer
+
+
+def set_log_context(**fields) -> None:
+    '''
+    Sets fields added to every following record, Eg: `set_log_context(job_id="4012345678", phase="easy_apply")`. Pass `None` to clear one
+    '''
+    get_log_writer().context.update(fields)
+#>
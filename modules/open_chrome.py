@@ -13,7 +13,7 @@ version:    24.12.29.12.30
 '''
 
 from modules.helpers import make_directories
-from config.settings import run_in_background, stealth_mode, disable_extensions, safe_mode, file_name, failed_file_name, logs_folder_path, generated_resume_path
+from config.settings import run_in_background, stealth_mode, disable_extensions, safe_mode, profile_webdriver, file_name, failed_file_name, history_db_path, history_partitions_path, description_archive_path, logs_folder_path, generated_resume_path
 from config.questions import default_resume_path
 if stealth_mode:
     import undetected_chromedriver as uc
@@ -22,11 +22,12 @@ else:
     from selenium.webdriver.chrome.options import Options
     # from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
 from modules.helpers import find_default_profile_directory, critical_error_log, print_lg
+from modules.perf.webdriver import profile_driver
+from modules.clickers_and_finders import WebDriverWait
 
 try:
-    make_directories([file_name,failed_file_name,logs_folder_path+"/screenshots",default_resume_path,generated_resume_path+"/temp"])
+    make_directories([file_name,failed_file_name,history_db_path,history_partitions_path,description_archive_path,logs_folder_path+"/screenshots",default_resume_path,generated_resume_path+"/temp"])
 
     # Set up WebDriver with Chrome Profile
     options = uc.ChromeOptions() if stealth_mode else Options()
@@ -48,6 +49,7 @@ try:
             print_lg("Downloading Chrome Driver... This may take some time. Undetected mode requires download every run!")
             driver = uc.Chrome(options=options)
     else: driver = webdriver.Chrome(options=options) #, service=Service(executable_path="C:\\Program Files\\Google\\Chrome\\chromedriver-win64\\chromedriver.exe"))
+    if profile_webdriver: driver = profile_driver(driver)
     driver.maximize_window()
     wait = WebDriverWait(driver, 5)
     actions = ActionChains(driver)
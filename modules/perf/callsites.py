@@ -0,0 +1,48 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import sys
+
+
+
+#### Call sites ####
+'''
+Names the line of the bot that caused a WebDriver command or a wait, skipping frames of Selenium and of our own helpers.
+Only uses the standard library, since `modules/helpers.py` imports modules that use it.
+'''
+
+SKIPPED_PACKAGES = ("selenium", "undetected_chromedriver")
+
+
+def call_site(skipped_files: tuple[str, ...] = ()) -> str:
+    '''
+    Returns "file:line function" of the first frame of the caller's stack that isn't in Selenium, undetected-chromedriver,
+    `modules/perf/` or files named in `skipped_files`, Eg: `call_site(("clickers_and_finders.py",))` -> "runAiBot.py:612 get_job_main_details"
+    '''
+    perf_folder = os.path.dirname(os.path.abspath(__file__))
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        folders = path.replace("\\", "/").split("/")
+        if (
+            not any(package in folders for package in SKIPPED_PACKAGES)
+            and folders[-1] not in skipped_files
+            and os.path.dirname(os.path.abspath(path)) != perf_folder
+        ):
+            return f"{folders[-1]}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "(unknown)"
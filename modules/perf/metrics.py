@@ -0,0 +1,111 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import json
+import socket
+import threading
+
+from typing import Literal
+
+from config.settings import send_metrics, metrics_port
+
+
+
+#### Metrics pushed to the FastAPI server ####
+'''
+The bot sends each counter increment, gauge value and timing as one small JSON datagram over local UDP to `metrics_port`,
+where the FastAPI server in `main.py` aggregates them and serves them at `/metrics` in Prometheus text format
+(See `fastHelpers/metrics_receiver.py`). Sending never waits, and datagrams are simply lost if the server isn't running.
+
+    {"type": "histogram", "name": "ai_call_seconds", "value": 2.41, "labels": {"provider": "openai"}}
+
+Live events of the run (The job and page the bot is on, phase timings) are sent the same way with `publish_event()`,
+the server aggregates them with the metrics and pushes them to dashboard clients over its WebSocket (See `fastHelpers/telemetry.py`).
+
+    {"type": "event", "name": "job_started", "fields": {"job_id": "4012345678", "title": "...", "company": "..."}}
+'''
+
+MetricType = Literal["counter", "gauge", "histogram"]
+EventName = Literal["search", "page", "job_started", "span"]
+
+
+class MetricsClient:
+    '''
+    Sends metrics to `("127.0.0.1", port)`, does nothing if not `enabled`
+    '''
+    def __init__(self, port: int = metrics_port, enabled: bool = send_metrics) -> None:
+        self.address = ("127.0.0.1", port)
+        self.enabled = enabled
+        self.__socket = None
+        self.__lock = threading.Lock()
+
+    def send(self, metric_type: MetricType, name: str, value: float, labels: dict[str, str]) -> None:
+        if not self.enabled: return
+        self.__send({"type": metric_type, "name": name, "value": value, "labels": labels})
+
+    def send_event(self, name: EventName, fields: dict) -> None:
+        if not self.enabled: return
+        self.__send({"type": "event", "name": name, "fields": fields})
+
+    def __send(self, message: dict) -> None:
+        datagram = json.dumps(message, default=str).encode()
+        try:
+            with self.__lock:
+                if self.__socket is None:
+                    self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    self.__socket.setblocking(False)
+                self.__socket.sendto(datagram, self.address)
+        except OSError:
+            pass    # Server not running, or its buffer is full. Metrics are best effort
+
+
+
+#< Shared client
+__client = None
+
+def get_metrics_client() -> MetricsClient:
+    global __client
+    if __client is None: __client = MetricsClient()
+    return __client
+
+
+def count_metric(name: str, value: float = 1, **labels: str) -> None:
+    '''
+    Adds `value` to the counter `name`, Eg: `count_metric("jobs", outcome="easy_applied")`
+    '''
+    get_metrics_client().send("counter", name, value, labels)
+
+
+def set_metric(name: str, value: float, **labels: str) -> None:
+    '''
+    Sets the gauge `name` to `value`
+    '''
+    get_metrics_client().send("gauge", name, value, labels)
+
+
+def observe_metric(name: str, seconds: float, **labels: str) -> None:
+    '''
+    Adds a timing in seconds to the histogram `name`
+    '''
+    get_metrics_client().send("histogram", name, seconds, labels)
+
+
+def publish_event(name: EventName, /, **fields) -> None:
+    '''
+    Sends a live event of the run to the dashboard, Eg: `publish_event("page", page=2, search_term="Python Developer")`
+    '''
+    get_metrics_client().send_event(name, fields)
+#>
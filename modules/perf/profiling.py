@@ -0,0 +1,164 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import sys
+import cProfile
+import threading
+
+from time import perf_counter
+from datetime import datetime
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from config.settings import logs_folder_path
+from modules.helpers import print_lg
+
+
+
+#### Profiling mode ####
+'''
+Run `python runAiBot.py --profile` (Or set the environment variable `JOB_APPLIER_PROFILE=1`) to profile every cycle of `run()`
+without editing code. For each cycle, `logs/profiles/` gets `cycle-<date>-<n>.collapsed`, stacks of the bot sampled every
+`SAMPLE_INTERVAL` seconds, in the collapsed format of flamegraph.pl and https://www.speedscope.app.
+Since samples are taken whether the bot is running Python or waiting, the widest stacks show where the time went.
+
+Run with `--profile=cprofile` (Or `JOB_APPLIER_PROFILE=cprofile`) to also get `cycle-<date>-<n>.pstats`, a cProfile dump of
+the Python code. Open it with `python -m pstats <file>` or snakeviz. cProfile traces every call, so it slows the bot down a lot
+and its timings of short functions are inflated, only use it to find which Python code is slow, not to measure the cycle.
+
+A summary of how much of the cycle was spent on Python code, waiting for the browser and sleeping is printed after each cycle.
+'''
+
+
+def read_profile_mode() -> str | None:
+    '''
+    Returns "sample", "cprofile" or `None` (Profiling off), from `--profile[=mode]` or `JOB_APPLIER_PROFILE`
+    '''
+    value = os.environ.get("JOB_APPLIER_PROFILE", "").strip().lower()
+    for arg in sys.argv[1:]:
+        if arg == "--profile": value = "sample"
+        elif arg.startswith("--profile="): value = arg.split("=", 1)[1].strip().lower()
+    if value in ("1", "true", "yes", "sample"): return "sample"
+    if value == "cprofile": return "cprofile"
+    return None
+
+PROFILE = read_profile_mode()
+PROFILES_PATH = os.path.join(logs_folder_path, "profiles")
+SAMPLE_INTERVAL = 0.005
+MAX_DEPTH = 128
+
+# A sample is "browser" if any of its frames is in these modules (Round-trips to ChromeDriver), "sleep" if its innermost frame is a wait
+BROWSER_MODULES = ("urllib3", "http", "socket", "ssl", "selenium")
+SLEEP_FUNCTIONS = ("sleep", "until", "until_not")
+
+
+def frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def classify(codes: list) -> str:
+    '''
+    "browser", "sleep" or "python", for a stack of code objects from outermost to innermost
+    '''
+    if codes and codes[-1].co_name in SLEEP_FUNCTIONS and os.path.basename(codes[-1].co_filename) in ("waits.py", "wait.py"):
+        return "sleep"
+    for code in codes:
+        folders = code.co_filename.replace("\\", "/").split("/")
+        if any(module in folders or folders[-1] == module + ".py" for module in BROWSER_MODULES):
+            return "browser"
+    return "python"
+
+
+
+class StackSampler:
+    '''
+    Samples the stack of `thread_id` every `interval` seconds from a background thread, counting each unique stack
+    '''
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.kinds = Counter()
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop.set()
+        self.__thread.join()
+
+    def __run(self) -> None:
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            codes = []
+            while frame is not None and len(codes) < MAX_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if not codes: continue
+            codes.reverse()
+            kind = classify(codes)
+            self.kinds[kind] += 1
+            self.stacks[";".join([kind] + [frame_name(code) for code in codes])] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+
+#< Profiling cycles
+__started = datetime.now()
+
+@contextmanager
+def profile_cycle(cycle: int) -> Iterator[None]:
+    '''
+    Profiles the `with` block as cycle number `cycle` if profiling mode is on, else does nothing
+    '''
+    if not PROFILE:
+        yield
+        return
+    profiler = cProfile.Profile() if PROFILE == "cprofile" else None
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    start = perf_counter()
+    if profiler: profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler: profiler.disable()
+        seconds = perf_counter() - start
+        sampler.stop()
+        save_cycle(cycle, profiler, sampler, seconds)
+
+
+def save_cycle(cycle: int, profiler: cProfile.Profile | None, sampler: StackSampler, seconds: float) -> None:
+    base = os.path.join(PROFILES_PATH, f"cycle-{__started:%Y%m%d-%H%M%S}-{cycle}")
+    try:
+        os.makedirs(PROFILES_PATH, exist_ok=True)
+        if profiler: profiler.dump_stats(base + ".pstats")
+        sampler.write(base + ".collapsed")
+    except Exception as e:
+        print_lg(f'Failed to save profile of cycle {cycle} to "{base}"', e)
+        return
+    samples = sum(sampler.kinds.values()) or 1
+    shares = ", ".join(f"{kind} {sampler.kinds[kind] / samples:.0%}" for kind in ("python", "browser", "sleep"))
+    saved = f'"{base}.collapsed" and "{base}.pstats" (cProfile slowed this cycle down)' if profiler else f'"{base}.collapsed"'
+    print_lg(f'Profiled cycle {cycle} ({seconds:.0f}s, {samples} samples): {shares}. Saved to {saved}')
+#>
@@ -0,0 +1,237 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import threading
+
+from html import escape
+from time import perf_counter
+from datetime import datetime
+from collections import Counter
+from typing import Literal
+
+from config.settings import click_gap, smooth_scroll, run_in_background, stealth_mode, history_backend
+from config.search import search_terms, search_location, switch_number, sort_by, date_posted, easy_apply_only
+from config.secrets import use_AI, ai_provider, llm_model, deepseek_model
+from modules.helpers import print_lg
+from modules.logs.writer import get_log_writer
+from modules.perf.metrics import count_metric, observe_metric
+from modules.perf.report_files import REPORTS_PATH
+from modules.perf.stats import percentile
+from modules.perf.tracing import get_tracer
+from modules.perf.waits import get_wait_budget
+
+
+
+#### End of run report ####
+'''
+Collects the outcome of every job by search term and every AI call of the run, and `write_run_report()` saves them with the
+phase timings (See `modules/perf/tracing.py`) and waiting time (See `modules/perf/waits.py`) to `logs/reports/report-<date>.json` and `.html`,
+to compare runs with different settings. The dashboard lists them at `/reports` (See `modules/perf/report_files.py`).
+* `count_job()` and `record_ai_call()` also send the `jobs`, `ai_calls`, `ai_call_seconds` and `ai_tokens` metrics (See `modules/perf/metrics.py`)
+'''
+
+JobOutcome = Literal["easy_applied", "external", "failed", "skipped"]
+JOB_OUTCOMES = ("easy_applied", "external", "failed", "skipped")
+APPLIED_OUTCOMES = ("easy_applied", "external")
+
+
+class RunReport:
+    '''
+    Outcomes of jobs by search term and AI calls by provider, since `started`
+    '''
+    def __init__(self) -> None:
+        self.started = datetime.now()
+        self.started_counter = perf_counter()
+        self.jobs = {}      # search term -> Counter of outcomes
+        self.ai = {}        # provider -> {"calls", "errors", "prompt_tokens", "completion_tokens", "seconds"}
+        self.__lock = threading.Lock()
+
+    def count_job(self, outcome: JobOutcome, search_term: str | None) -> None:
+        with self.__lock:
+            self.jobs.setdefault(search_term or "(None)", Counter())[outcome] += 1
+
+    def record_ai_call(self, provider: str, seconds: float, ok: bool, prompt_tokens: int, completion_tokens: int) -> None:
+        with self.__lock:
+            ai = self.ai.setdefault(provider, {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": []})
+            ai["calls"] += 1
+            ai["errors"] += not ok
+            ai["prompt_tokens"] += prompt_tokens
+            ai["completion_tokens"] += completion_tokens
+            if ok: ai["seconds"].append(seconds)
+
+    def to_dict(self) -> dict:
+        '''
+        Everything in the report, times in seconds
+        '''
+        seconds = perf_counter() - self.started_counter
+        hours = max(seconds, 1) / 3600
+        with self.__lock:
+            jobs = {term: Counter(outcomes) for term, outcomes in self.jobs.items()}
+            ai = {provider: {**values, "seconds": sorted(values["seconds"])} for provider, values in self.ai.items()}
+        totals = sum(jobs.values(), Counter())
+        evaluated = sum(totals[outcome] for outcome in JOB_OUTCOMES)
+        applied = sum(totals[outcome] for outcome in APPLIED_OUTCOMES)
+        waits = get_wait_budget().summary()
+        return {
+            "id": f"report-{self.started:%Y%m%d-%H%M%S}",
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "duration": seconds,
+            "settings": {
+                "search_terms": search_terms, "search_location": search_location, "switch_number": switch_number, "sort_by": sort_by,
+                "date_posted": date_posted, "easy_apply_only": easy_apply_only, "click_gap": click_gap, "smooth_scroll": smooth_scroll,
+                "run_in_background": run_in_background, "stealth_mode": stealth_mode, "history_backend": history_backend,
+                "use_AI": use_AI, "ai_provider": ai_provider if use_AI else None, "ai_model": (deepseek_model if ai_provider == "deepseek" else llm_model) if use_AI else None,
+            },
+            "jobs": {
+                **{outcome: totals[outcome] for outcome in JOB_OUTCOMES}, "evaluated": evaluated, "applied": applied,
+                "evaluated_per_hour": evaluated / hours, "applied_per_hour": applied / hours,
+            },
+            "search_terms": [
+                {"search_term": term, **{outcome: outcomes[outcome] for outcome in JOB_OUTCOMES},
+                 "evaluated": sum(outcomes.values()), "applied": sum(outcomes[outcome] for outcome in APPLIED_OUTCOMES),
+                 "yield": sum(outcomes[outcome] for outcome in APPLIED_OUTCOMES) / max(sum(outcomes.values()), 1)}
+                for term, outcomes in jobs.items()
+            ],
+            "phases": get_tracer().summary(),
+            "waits": {
+                "sleep": waits["sleep"], "expired": waits["expired"], "succeeded": waits["succeeded"],
+                "wasted": waits["sleep"] + waits["expired"], "sites": waits["sites"][:20],
+            },
+            "ai": [
+                {"provider": provider, "calls": values["calls"], "errors": values["errors"],
+                 "prompt_tokens": values["prompt_tokens"], "completion_tokens": values["completion_tokens"],
+                 "total": sum(values["seconds"]),
+                 **({"p50": percentile(values["seconds"], 0.5), "p95": percentile(values["seconds"], 0.95), "max": values["seconds"][-1]} if values["seconds"] else {"p50": None, "p95": None, "max": None})}
+                for provider, values in ai.items()
+            ],
+        }
+
+
+
+#< HTML report
+def html_table(headers: list[str], rows: list[list]) -> str:
+    def cell(value) -> str:
+        if isinstance(value, float): value = f"{value:.2f}"
+        return f"<td>{escape(str('-' if value is None else value))}</td>"
+    head = "".join(f"<th>{escape(header)}</th>" for header in headers)
+    body = "".join("<tr>" + "".join(cell(value) for value in row) + "</tr>" for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def to_html(report: dict) -> str:
+    jobs, waits = report["jobs"], report["waits"]
+    sections = [
+        ("Jobs", html_table(
+            ["Evaluated", "Applied", "Easy applied", "External", "Failed", "Skipped", "Evaluated / hour", "Applied / hour"],
+            [[jobs["evaluated"], jobs["applied"], jobs["easy_applied"], jobs["external"], jobs["failed"], jobs["skipped"], jobs["evaluated_per_hour"], jobs["applied_per_hour"]]],
+        )),
+        ("Yield by search term", html_table(
+            ["Search term", "Evaluated", "Applied", "Failed", "Skipped", "Yield"],
+            [[row["search_term"], row["evaluated"], row["applied"], row["failed"], row["skipped"], f"{row['yield']:.0%}"] for row in report["search_terms"]],
+        )),
+        ("Phases (Seconds)", html_table(
+            ["Phase", "Count", "Total", "p50", "p95", "Max"],
+            [[row["name"], row["count"], row["total"], row["p50"], row["p95"], row["max"]] for row in report["phases"]],
+        )),
+        (f"Waiting (Seconds): {waits['wasted']:.0f} wasted on sleeps and expired waits, {waits['succeeded']:.0f} on successful waits", html_table(
+            ["Call site", "Sleep", "Expired", "Expired count", "Successful waits", "Total"],
+            [[row["call_site"], row["sleep"], row["expired"], row["expired_count"], row["succeeded"], row["total"]] for row in waits["sites"]],
+        )),
+        ("AI calls (Seconds)", html_table(
+            ["Provider", "Calls", "Errors", "Prompt tokens", "Completion tokens", "Total", "p50", "p95", "Max"],
+            [[row["provider"], row["calls"], row["errors"], row["prompt_tokens"], row["completion_tokens"], row["total"], row["p50"], row["p95"], row["max"]] for row in report["ai"]],
+        )),
+        ("Settings", html_table(["Setting", "Value"], [[name, json.dumps(value)] for name, value in report["settings"].items()])),
+    ]
+    body = "".join(f"<h2>{escape(title)}</h2>{table}" for title, table in sections)
+    return f'''<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>Run report {escape(report["started"])}</title>
+    <style>
+      body {{ font-family: Arial, sans-serif; margin: 20px; }}
+      table {{ border-collapse: collapse; margin-top: 10px; }}
+      th, td {{ border: 1px solid #ddd; padding: 6px 12px; text-align: left; }}
+      th {{ background-color: #f4f4f4; }}
+    </style>
+  </head>
+  <body>
+    <h1>Run report</h1>
+    <p>{escape(report["started"])} to {escape(report["finished"])} ({report["duration"] / 60:.0f} min)</p>
+    {body}
+  </body>
+</html>
+'''
+#>
+
+
+
+#< Shared report
+__report = RunReport()
+
+def start_run_report() -> None:
+    '''
+    Starts the report over, from when the bot actually starts working
+    '''
+    global __report
+    __report = RunReport()
+
+
+def count_job(outcome: JobOutcome) -> None:
+    '''
+    Counts a finished job under the current search term (See `set_log_context()`), for the report and the `jobs` metric
+    '''
+    count_metric("jobs", outcome=outcome)
+    __report.count_job(outcome, get_log_writer().context.get("search_term"))
+
+
+def record_ai_call(provider: str, seconds: float, ok: bool = True, usage=None) -> None:
+    '''
+    Records an AI completion that took `seconds`, for the report and the AI metrics. `usage` is the `usage` of the completion, if the API returned it
+    '''
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    count_metric("ai_calls", provider=provider, outcome="ok" if ok else "error")
+    if ok: observe_metric("ai_call_seconds", seconds, provider=provider)
+    if prompt_tokens: count_metric("ai_tokens", prompt_tokens, provider=provider, kind="prompt")
+    if completion_tokens: count_metric("ai_tokens", completion_tokens, provider=provider, kind="completion")
+    __report.record_ai_call(provider, seconds, ok, prompt_tokens, completion_tokens)
+
+
+def write_run_report() -> str | None:
+    '''
+    Saves the report of this run as JSON and HTML, returns the path of the HTML report
+    '''
+    report = __report.to_dict()
+    path = os.path.join(REPORTS_PATH, report["id"])
+    try:
+        os.makedirs(REPORTS_PATH, exist_ok=True)
+        with open(path + ".json", "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, default=str)
+        with open(path + ".html", "w", encoding="utf-8") as file:
+            file.write(to_html(report))
+    except Exception as e:
+        print_lg(f'Failed to save the run report to "{path}"', e)
+        return None
+    jobs = report["jobs"]
+    print_lg(f'Run report saved to "{path}.html": {jobs["evaluated_per_hour"]:.1f} jobs evaluated and {jobs["applied_per_hour"]:.1f} applied per hour, '
+             f'{report["waits"]["wasted"]:.0f}s lost to sleeps and expired waits.')
+    return path + ".html"
+#>
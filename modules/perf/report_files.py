@@ -0,0 +1,47 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+
+from config.settings import logs_folder_path
+
+
+
+#### Saved run reports ####
+'''
+Where `modules/perf/report.py` saves the report of each run, and reading them back for the dashboard (`app.py`).
+Only uses the standard library and settings, so the dashboard doesn't import the bot's modules.
+'''
+
+REPORTS_PATH = os.path.join(logs_folder_path, "reports")
+
+
+def list_run_reports() -> list[dict]:
+    '''
+    `{"id", "started", "duration", "jobs"}` of every saved report, newest first
+    '''
+    reports = []
+    if not os.path.isdir(REPORTS_PATH): return reports
+    for name in sorted(os.listdir(REPORTS_PATH), reverse=True):
+        if not name.startswith("report-") or not name.endswith(".json"): continue
+        try:
+            with open(os.path.join(REPORTS_PATH, name), encoding="utf-8") as file:
+                report = json.load(file)
+        except (OSError, ValueError):
+            continue
+        reports.append({"id": report.get("id"), "started": report.get("started"), "duration": report.get("duration"), "jobs": report.get("jobs"), "settings": report.get("settings")})
+    return reports
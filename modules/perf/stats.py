@@ -0,0 +1,31 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+from math import ceil
+
+
+
+#### Summary statistics ####
+'''
+Shared by the bot's timings (See `modules/perf/tracing.py` and `modules/perf/report.py`) and the live telemetry of the
+FastAPI server (See `fastHelpers/telemetry.py`), so only uses the standard library.
+'''
+
+def percentile(values: list[float], share: float) -> float:
+    '''
+    Nearest rank percentile of sorted `values`, the smallest value with at least `share` of all values at or below it
+    '''
+    return values[max(0, min(len(values) - 1, ceil(share * len(values)) - 1))]
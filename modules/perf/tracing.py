@@ -0,0 +1,181 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import json
+import threading
+
+from glob import glob, escape
+from time import perf_counter_ns
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Iterator
+
+from config.settings import logs_folder_path, save_traces
+from modules.helpers import print_lg
+from modules.logs.writer import get_log_writer, set_log_context
+from modules.perf.metrics import publish_event
+from modules.perf.stats import percentile
+
+
+
+#### Phase timing spans ####
+'''
+Times each phase of applying to a job with a monotonic clock, tagged with the Job ID and search term of the log context
+(See `set_log_context()` in `modules/logs/writer.py`).
+* `trace_phase(name)` ends the running phase and starts the next one, for the sequential phases of the apply loop
+* `trace_span(name)` times a block inside a phase, Eg: each step of the Easy Apply modal
+* Spans are saved to `logs/traces/trace-<date>.json` in Chrome trace event format if `save_traces = True`,
+  open them in https://ui.perfetto.dev or chrome://tracing. Only the latest `MAX_TRACES` files are kept
+* `print_trace_summary()` prints p50 and p95 durations of every phase and span
+'''
+
+TRACES_PATH = os.path.join(logs_folder_path, "traces")
+MAX_TRACES = 20
+
+
+class Tracer:
+    '''
+    Records spans of every thread. Events are written to `path` as they end (If given), durations are kept for `summary()`
+    '''
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.durations = {}
+        self.__file = None
+        self.__threads = set()
+        self.__phase = None
+        self.__start = perf_counter_ns()
+        self.__lock = threading.Lock()
+
+    #< Spans
+    def phase(self, name: str) -> None:
+        '''
+        Ends the running phase and starts `name`, also setting it as the `phase` of following log records
+        '''
+        now = perf_counter_ns()
+        self.end_phase(now)
+        self.__phase = (name, now)
+        set_log_context(phase=name)
+
+    def end_phase(self, now: int | None = None) -> None:
+        if self.__phase is None: return
+        name, start = self.__phase
+        self.__phase = None
+        self.record(name, start, now or perf_counter_ns(), "phase")
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        '''
+        Times the `with` block as `name`, `args` are saved with the span (Eg: the step number)
+        '''
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, perf_counter_ns(), "span", args)
+
+    def record(self, name: str, start: int, end: int, category: str, args: dict | None = None) -> None:
+        '''
+        Saves a span that ran from `start` to `end` (`perf_counter_ns()` values), tagged with the current Job ID and search term
+        '''
+        context = get_log_writer().context
+        args = {"job_id": context.get("job_id"), "search_term": context.get("search_term"), **(args or {})}
+        publish_event("span", name=name, category=category, seconds=(end - start) / 1e9, job_id=args["job_id"])
+        with self.__lock:
+            self.durations.setdefault(name, []).append((end - start) / 1e9)
+            if self.path is None: return
+            thread = threading.current_thread()
+            events = []
+            if thread.ident not in self.__threads:
+                self.__threads.add(thread.ident)
+                events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident, "args": {"name": thread.name}})
+            events.append({"name": name, "cat": category, "ph": "X", "ts": (start - self.__start) / 1000, "dur": (end - start) / 1000, "pid": os.getpid(), "tid": thread.ident, "args": args})
+            self.__write(events)
+    #>
+
+    #< Trace file
+    def __write(self, events: list[dict]) -> None:
+        try:
+            if self.__file is None: self.__open()
+            # The closing "]" is optional in the trace event format, so the file is valid even if the bot is killed
+            self.__file.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+        except Exception as e:
+            print_lg(f'Failed to save spans to "{self.path}", tracing only for the summary from now on.', e)
+            self.path = None
+
+    def __open(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        directory, name = os.path.split(self.path)
+        for old in sorted(glob(os.path.join(escape(directory), "trace-*.json")))[:-(MAX_TRACES - 1) or None]:
+            os.remove(old)
+        self.__file = open(self.path, "w", encoding="utf-8")
+        self.__file.write("[\n")
+
+    def close(self) -> None:
+        self.end_phase()
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+    #>
+
+    def summary(self) -> list[dict]:
+        '''
+        Returns `{"name", "count", "total", "p50", "p95", "max"}` of every phase and span in seconds, most total time first
+        '''
+        with self.__lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+        rows = [
+            {"name": name, "count": len(values), "total": sum(values), "p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": values[-1]}
+            for name, values in durations.items()
+        ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+
+
+#< Shared tracer
+__tracer = None
+__tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    global __tracer
+    with __tracer_lock:
+        if __tracer is None:
+            __tracer = Tracer(os.path.join(TRACES_PATH, f"trace-{datetime.now():%Y%m%d-%H%M%S}.json") if save_traces else None)
+        return __tracer
+
+
+def trace_phase(name: str) -> None:
+    get_tracer().phase(name)
+
+
+def trace_span(name: str, **args):
+    return get_tracer().span(name, **args)
+
+
+def print_trace_summary() -> None:
+    '''
+    Prints the time taken by each phase and span of this run, and closes the trace file
+    '''
+    tracer = get_tracer()
+    tracer.close()
+    rows = tracer.summary()
+    if not rows: return
+    lines = [f"{'Phase':<28}{'Count':>8}{'Total s':>11}{'p50 s':>9}{'p95 s':>9}{'Max s':>9}"]
+    lines += [f"{row['name']:<28}{row['count']:>8}{row['total']:>11.1f}{row['p50']:>9.2f}{row['p95']:>9.2f}{row['max']:>9.2f}" for row in rows]
+    if tracer.path: lines.append(f'\nSpans saved to "{tracer.path}", open it in https://ui.perfetto.dev')
+    print_lg("\nTime taken by each phase:\n" + "\n".join(lines) + "\n")
+#>
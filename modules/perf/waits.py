@@ -0,0 +1,119 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import time
+import threading
+
+from typing import Literal
+
+from modules.perf.callsites import call_site
+
+
+
+#### Wait budget ####
+'''
+Adds up the time the bot spends waiting, by the line of the bot that waited (See `modules/perf/callsites.py`):
+* "sleep"     Deliberate pauses, `sleep()` and `buffer()` of `modules/helpers.py`
+* "expired"   Explicit waits that ran out without finding what they waited for, Eg: `find_by_class(driver, "...", 2)` on a page without it
+* "succeeded" Explicit waits that found what they waited for, `WebDriverWait` of `modules/clickers_and_finders.py` records both
+
+`print_wait_summary()` prints where the dead time of the run went.
+Only uses the standard library, since `modules/helpers.py` imports this module for `sleep()`.
+'''
+
+WaitKind = Literal["sleep", "expired", "succeeded"]
+WAIT_KINDS = ("sleep", "expired", "succeeded")
+SKIPPED_FILES = ("helpers.py", "clickers_and_finders.py")
+REPORT_ROWS = 20
+
+
+class WaitBudget:
+    '''
+    Keeps `{kind: [count, seconds]}` of every call site, and when the run started
+    '''
+    def __init__(self) -> None:
+        self.sites = {}
+        self.started = time.perf_counter()
+        self.__lock = threading.Lock()
+
+    def record(self, kind: WaitKind, seconds: float) -> None:
+        site = call_site(SKIPPED_FILES)
+        with self.__lock:
+            totals = self.sites.setdefault(site, {name: [0, 0.0] for name in WAIT_KINDS})
+            totals[kind][0] += 1
+            totals[kind][1] += seconds
+
+    def summary(self) -> dict:
+        '''
+        Returns `{"run", "sleep", "expired", "succeeded", "sites"}` in seconds, `sites` are `{"call_site", "count", <kind>..., "total"}` most total time first
+        '''
+        with self.__lock:
+            sites = [
+                {"call_site": site, "count": sum(count for count, _ in totals.values()), **{kind: totals[kind][1] for kind in WAIT_KINDS}, "expired_count": totals["expired"][0]}
+                for site, totals in self.sites.items()
+            ]
+        for row in sites: row["total"] = sum(row[kind] for kind in WAIT_KINDS)
+        return {
+            "run": time.perf_counter() - self.started,
+            **{kind: sum(row[kind] for row in sites) for kind in WAIT_KINDS},
+            "sites": sorted(sites, key=lambda row: row["total"], reverse=True),
+        }
+
+
+
+#< Shared budget
+__budget = WaitBudget()
+
+def get_wait_budget() -> WaitBudget:
+    return __budget
+
+
+def record_wait(kind: WaitKind, seconds: float) -> None:
+    __budget.record(kind, seconds)
+
+
+def sleep(seconds: float) -> None:
+    '''
+    `time.sleep()` that adds its time to the wait budget as a deliberate sleep
+    '''
+    start = time.perf_counter()
+    try:
+        time.sleep(seconds)
+    finally:
+        __budget.record("sleep", time.perf_counter() - start)
+
+
+def print_wait_summary() -> None:
+    '''
+    Prints how much of this run was spent sleeping and waiting, and where
+    '''
+    from modules.helpers import print_lg      # Imported here since `modules/helpers.py` imports this module
+    summary = __budget.summary()
+    if not summary["sites"]: return
+    waited = sum(summary[kind] for kind in WAIT_KINDS)
+    share = lambda seconds: f"{seconds:.1f}s ({seconds / max(summary['run'], 1e-9):.0%})"
+    lines = [
+        f"Waited {share(waited)} of the {summary['run']:.1f}s run: Deliberate sleeps {share(summary['sleep'])}, "
+        f"expired waits {share(summary['expired'])}, successful waits {share(summary['succeeded'])}.",
+        "",
+        f"{'Sleep s':>9}{'Expired s':>11}{'(Count)':>9}{'Waited s':>10}{'Total s':>10}  Call site",
+    ]
+    lines += [
+        f"{row['sleep']:>9.1f}{row['expired']:>11.1f}{'(' + str(row['expired_count']) + ')':>9}{row['succeeded']:>10.1f}{row['total']:>10.1f}  {row['call_site']}"
+        for row in summary["sites"][:REPORT_ROWS]
+    ]
+    print_lg("\nTime spent waiting:\n" + "\n".join(lines) + "\n")
+#>
@@ -0,0 +1,196 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+'''
+
+
+# Imports
+
+import os
+import re
+import json
+import threading
+
+from time import perf_counter
+from datetime import datetime
+from collections import Counter
+
+from config.settings import logs_folder_path
+from modules.helpers import print_lg
+from modules.perf.callsites import call_site
+
+
+
+#### WebDriver command profiler ####
+'''
+Every Selenium call (`find_element()`, `.click()`, `.text`, `get_attribute()`, `execute_script()`...) is one HTTP round-trip to ChromeDriver
+through `driver.execute()`, elements call it through the driver that found them. If `profile_webdriver = True`, `profile_driver()` wraps
+`execute()` of the driver opened in `modules/open_chrome.py` to count and time every command by:
+* Call site, the first line outside Selenium and `modules/clickers_and_finders.py` (See `modules/perf/callsites.py`), Eg: "runAiBot.py:612 get_job_main_details"
+* Locator, Eg: "xpath //button[...]". Commands on an element found earlier (Eg: `.text` of it) are counted under the locator that found it
+
+`print_webdriver_profile()` prints the locators that took the most time in total and per command, and saves the full report to
+`logs/webdriver-profile-<date>.json`, to know which selectors to batch or eliminate.
+'''
+
+PROFILES_PATH = logs_folder_path
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"     # W3C key of element references
+MAX_ELEMENTS = 50_000
+MAX_LOCATOR_LENGTH = 160
+REPORT_ROWS = 15
+
+SKIPPED_FILES = ("clickers_and_finders.py",)
+re_script_name = re.compile(r"^/\* (\w+) \*/")      # Selenium names its bundled scripts, Eg: "/* getAttribute */return (...)"
+
+
+class WebDriverProfiler:
+    '''
+    Keeps `{"count", "total", "max", "commands"}` of every (call site, locator), times in seconds
+    '''
+    def __init__(self) -> None:
+        self.stats = {}
+        self.started = datetime.now()
+        self.__locators = {}    # Element ID -> locator that found it
+        self.__lock = threading.Lock()
+
+    def wrap(self, execute):
+        def profiled_execute(driver_command: str, params: dict | None = None):
+            start = perf_counter()
+            try:
+                response = execute(driver_command, params)
+            except Exception:
+                self.record(driver_command, params, None, perf_counter() - start)
+                raise
+            self.record(driver_command, params, response, perf_counter() - start)
+            return response
+        profiled_execute.__wrapped__ = execute
+        return profiled_execute
+
+    def record(self, command: str, params: dict | None, response: dict | None, seconds: float) -> None:
+        params = params or {}
+        command, locator = self.describe(command, params)
+        key = (call_site(SKIPPED_FILES), locator)
+        with self.__lock:
+            stats = self.stats.get(key)
+            if stats is None: stats = self.stats[key] = {"count": 0, "total": 0.0, "max": 0.0, "commands": Counter()}
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["commands"][command] += 1
+            if "using" in params and isinstance(response, dict):
+                found = response.get("value")
+                for element in found if isinstance(found, list) else [found]:
+                    self.__remember(element_id(element), locator)
+
+    def describe(self, command: str, params: dict) -> tuple[str, str]:
+        '''
+        Returns the name of `command` and the locator it works on
+        '''
+        if "using" in params:
+            return command, f"{params['using']} {params.get('value')}"[:MAX_LOCATOR_LENGTH]
+        if "script" in params:
+            script = str(params["script"])
+            match = re_script_name.match(script)
+            if match: command = match.group(1)
+            elements = [element_id(arg) for arg in params.get("args") or []]
+            locator = next((self.__locators[id] for id in elements if id in self.__locators), None)
+            return command, locator or ("script " + " ".join(script.split()))[:MAX_LOCATOR_LENGTH]
+        if "id" in params:
+            return command, self.__locators.get(params["id"], "(element found elsewhere)")
+        if "url" in params:
+            return command, f"url {params['url']}"[:MAX_LOCATOR_LENGTH]
+        return command, "(page)"
+
+    def __remember(self, id: str | None, locator: str) -> None:
+        if id is None: return
+        if len(self.__locators) >= MAX_ELEMENTS: del self.__locators[next(iter(self.__locators))]
+        self.__locators[id] = locator
+
+    def report(self) -> dict:
+        '''
+        Returns `{"started", "commands", "seconds", "locators", "call_sites"}`, locators ranked by total time with their busiest call sites
+        '''
+        with self.__lock:
+            stats = [(site, locator, {**values, "commands": dict(values["commands"])}) for (site, locator), values in self.stats.items()]
+        locators = {}
+        for site, locator, values in stats:
+            row = locators.setdefault(locator, {"locator": locator, "count": 0, "total": 0.0, "max": 0.0, "commands": Counter(), "call_sites": []})
+            row["count"] += values["count"]
+            row["total"] += values["total"]
+            row["max"] = max(row["max"], values["max"])
+            row["commands"].update(values["commands"])
+            row["call_sites"].append({"call_site": site, "count": values["count"], "total": values["total"]})
+        for row in locators.values():
+            row["mean"] = row["total"] / row["count"]
+            row["commands"] = dict(row["commands"].most_common())
+            row["call_sites"].sort(key=lambda site: site["total"], reverse=True)
+        call_sites = Counter()
+        for site, _, values in stats: call_sites[site] += values["total"]
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "commands": sum(values["count"] for _, _, values in stats),
+            "seconds": sum(values["total"] for _, _, values in stats),
+            "locators": sorted(locators.values(), key=lambda row: row["total"], reverse=True),
+            "call_sites": [{"call_site": site, "total": total} for site, total in call_sites.most_common()],
+        }
+
+
+def element_id(element) -> str | None:
+    '''
+    ID of a `WebElement` or of a W3C element reference, else `None`
+    '''
+    if isinstance(element, dict): return element.get(ELEMENT_KEY)
+    id = getattr(element, "id", None)
+    return id if isinstance(id, str) else None
+
+
+#< Shared profiler
+__profiler = None
+
+def profile_driver(driver):
+    '''
+    Starts counting and timing every command sent by `driver`, returns the same `driver`
+    '''
+    global __profiler
+    if __profiler is None: __profiler = WebDriverProfiler()
+    driver.execute = __profiler.wrap(driver.execute)
+    return driver
+
+
+def print_webdriver_profile() -> None:
+    '''
+    Prints the locators that took the most time in this run and saves the full report, does nothing if the driver wasn't profiled
+    '''
+    if __profiler is None: return
+    report = __profiler.report()
+    if not report["commands"]: return
+    path = os.path.join(PROFILES_PATH, f"webdriver-profile-{__profiler.started:%Y%m%d-%H%M%S}.json")
+    try:
+        os.makedirs(PROFILES_PATH, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    except Exception as e:
+        print_lg(f'Failed to save WebDriver profile to "{path}"', e)
+        path = None
+
+    def table(title: str, rows: list[dict]) -> list[str]:
+        lines = [title, f"{'Count':>7}{'Total s':>10}{'Mean s':>9}{'Max s':>9}  Locator (Busiest call site)"]
+        for row in rows:
+            site = row["call_sites"][0]["call_site"]
+            lines.append(f"{row['count']:>7}{row['total']:>10.1f}{row['mean']:>9.3f}{row['max']:>9.2f}  {row['locator'][:70]}  ({site})")
+        return lines
+
+    lines = [f"{report['commands']} WebDriver commands took {report['seconds']:.1f}s in total."]
+    lines += table("\nHottest locators (Most total time):", report["locators"][:REPORT_ROWS])
+    lines += table("\nSlowest locators (Most time per command):", sorted(report["locators"], key=lambda row: row["mean"], reverse=True)[:REPORT_ROWS])
+    if path: lines.append(f'\nFull report saved to "{path}"')
+    print_lg("\nWebDriver profile:\n" + "\n".join(lines) + "\n")
+#>
@@ -19,9 +19,10 @@ version:    24.12.29.12.30
 
 __validation_file_path = ""
 
-def check_int(var: int, var_name: str, min_value: int=0) -> bool | TypeError | ValueError:
+def check_int(var: int, var_name: str, min_value: int=0, max_value: int | None=None) -> bool | TypeError | ValueError:
     if not isinstance(var, int): raise TypeError(f'The variable "{var_name}" in "{__validation_file_path}" must be an Integer!\nReceived "{var}" of type "{type(var)}" instead!\n\nSolution:\nPlease open "{__validation_file_path}" and update "{var_name}" to be an Integer.\nExample: `{var_name} = 10`\n\nNOTE: Do NOT surround Integer values in quotes ("10")X !\n\n')
     if var < min_value: raise ValueError(f'The variable "{var_name}" in "{__validation_file_path}" expects an Integer greater than or equal to `{min_value}`! Received `{var}` instead!\n\nSolution:\nPlease open "{__validation_file_path}" and update "{var_name}" accordingly.')
+    if max_value is not None and var > max_value: raise ValueError(f'The variable "{var_name}" in "{__validation_file_path}" expects an Integer less than or equal to `{max_value}`! Received `{var}` instead!\n\nSolution:\nPlease open "{__validation_file_path}" and update "{var_name}" accordingly.')
     return True
 
 def check_boolean(var: bool, var_name: str) -> bool | ValueError:
@@ -198,6 +199,23 @@ def validate_settings() -> None | ValueError | TypeError:
     check_string(file_name, "file_name", min_length=1)
     check_string(failed_file_name, "failed_file_name", min_length=1)
     check_string(logs_folder_path, "logs_folder_path", min_length=1)
+    check_int(log_max_size_mb, "log_max_size_mb", 1)
+    check_int(log_backups, "log_backups", 1)
+    check_int(snapshots_max_mb, "snapshots_max_mb", 1)
+    check_int(screenshots_max_count, "screenshots_max_count", 1)
+    check_int(screenshots_max_mb, "screenshots_max_mb", 1)
+    check_boolean(save_traces, "save_traces")
+    check_boolean(send_metrics, "send_metrics")
+    check_int(metrics_port, "metrics_port", 1, 65535)
+    check_boolean(profile_webdriver, "profile_webdriver")
+    check_string(history_backend, "history_backend", ["csv", "sqlite", "partitioned"])
+    check_string(history_db_path, "history_db_path", min_length=1)
+    check_string(history_partitions_path, "history_partitions_path", min_length=1)
+    check_string(history_fsync, "history_fsync", ["batch", "exit", "none"])
+    check_boolean(history_search_index, "history_search_index")
+    check_boolean(remember_rejections, "remember_rejections")
+    check_boolean(archive_descriptions, "archive_descriptions")
+    check_string(description_archive_path, "description_archive_path", min_length=1)
 
     check_int(click_gap, "click_gap", 0)
 
@@ -1,15 +1,14 @@
 # Imports
 import os
-import csv
 import re
 import pyautogui
 
 from random import choice, shuffle, randint
 from datetime import datetime
+from time import perf_counter, time
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException, NoSuchWindowException, ElementNotInteractableException
@@ -23,7 +22,20 @@ from config.settings import *
 from modules.open_chrome import *
 from modules.helpers import *
 from modules.clickers_and_finders import *
+from modules.clickers_and_finders import WebDriverWait
 from modules.validator import validate_config
+from modules.history.store import get_history_store
+from modules.history.writer import get_history_writer, close_history_writer
+from modules.history.rejections import Rejections
+from modules.logs.writer import set_log_context
+from modules.logs.snapshots import save_snapshot
+from modules.logs.screenshots import take_screenshot
+from modules.perf.tracing import trace_phase, trace_span, print_trace_summary
+from modules.perf.webdriver import print_webdriver_profile
+from modules.perf.waits import print_wait_summary
+from modules.perf.profiling import profile_cycle
+from modules.perf.report import count_job, start_run_report, write_run_report
+from modules.perf.metrics import set_metric, observe_metric, publish_event
 from modules.ai.openaiConnections import ai_create_openai_client, ai_extract_skills, ai_answer_question, ai_close_openai_client
 from modules.ai.deepseekConnections import deepseek_create_client, deepseek_extract_skills, deepseek_answer_question
 
@@ -55,6 +67,8 @@ external_jobs_count = 0
 failed_count = 0
 skip_count = 0
 dailyEasyApplyLimitReached = False
+current_search_term = None
+rejections = None
 
 re_experience = re.compile(r'[(]?\s*(\d+)\s*[)]?\s*[-to]*\s*\d*[+]*\s*year[s]?', re.IGNORECASE)
 
@@ -138,17 +152,9 @@ def login_LN() -> None:
 def get_applied_job_ids() -> set:
     '''
     Function to get a `set` of applied job's Job IDs
-    * Returns a set of Job IDs from existing applied jobs history csv file
+    * Returns a set of Job IDs from the applied jobs history
     '''
-    job_ids = set()
-    try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                job_ids.add(row[0])
-    except FileNotFoundError:
-        print_lg(f"The CSV file '{file_name}' does not exist.")
-    return job_ids
+    return get_history_store().applied_job_ids()
 
 
 
@@ -314,8 +320,8 @@ def check_blacklist(rejected_jobs: set, job_id: str, company: str, blacklisted_c
     if not skip_checking:
         for word in about_company_bad_words: 
             if word.lower() in about_company: 
-                rejected_jobs.add(job_id)
-                blacklisted_companies.add(company)
+                rejections.reject_job(job_id, "Found Blacklisted words in About Company", "about_company")
+                rejections.blacklist_company(company, f'Contains "{word}"')
                 raise ValueError(f'\n"{about_company_org}"\n\nContains "{word}".')
     buffer(click_gap)
     scroll_to_view(driver, jobs_top_card)
@@ -723,7 +729,9 @@ def external_apply(pagination_element: WebElement, job_id: str, job_link: str, r
     global tabs_count, dailyEasyApplyLimitReached
     if easy_apply_only:
         try:
-            if "exceeded the daily application limit" in driver.find_element(By.CLASS_NAME, "artdeco-inline-feedback__message").text: dailyEasyApplyLimitReached = True
+            if "exceeded the daily application limit" in driver.find_element(By.CLASS_NAME, "artdeco-inline-feedback__message").text:
+                dailyEasyApplyLimitReached = True
+                set_metric("daily_limit_reached", 1)
         except: pass
         print_lg("Easy apply failed I guess!")
         if pagination_element != None: return True, application_link, tabs_count
@@ -744,6 +752,7 @@ def external_apply(pagination_element: WebElement, job_id: str, job_link: str, r
         failed_job(job_id, job_link, resume, date_listed, "Probably didn't find Apply button or unable to switch tabs.", e, application_link, screenshot_name)
         global failed_count
         failed_count += 1
+        count_job("failed")
         return True, application_link, tabs_count
 
 
@@ -764,30 +773,25 @@ def follow_company(modal: WebDriver = driver) -> None:
 #< Failed attempts logging
 def failed_job(job_id: str, job_link: str, resume: str, date_listed, error: str, exception: Exception, application_link: str, screenshot_name: str) -> None:
     '''
-    Function to update failed jobs list in excel
+    Function to update failed jobs list in the history store (excel or database)
+    - Written in the background by the history writer, see `modules/history/writer.py`
     '''
     try:
-        with open(failed_file_name, 'a', newline='', encoding='utf-8') as file:
-            fieldnames = ['Job ID', 'Job Link', 'Resume Tried', 'Date listed', 'Date Tried', 'Assumed Reason', 'Stack Trace', 'External Job link', 'Screenshot Name']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            if file.tell() == 0: writer.writeheader()
-            writer.writerow({'Job ID':job_id, 'Job Link':job_link, 'Resume Tried':resume, 'Date listed':date_listed, 'Date Tried':datetime.now(), 'Assumed Reason':error, 'Stack Trace':exception, 'External Job link':application_link, 'Screenshot Name':screenshot_name})
-            file.close()
+        get_history_writer().put("failed", {'Job ID':job_id, 'Job Link':job_link, 'Resume Tried':resume, 'Date listed':date_listed, 'Date Tried':datetime.now(), 'Assumed Reason':error, 'Stack Trace':exception, 'External Job link':application_link, 'Screenshot Name':screenshot_name}, current_search_term)
     except Exception as e:
         print_lg("Failed to update failed jobs list!", e)
-        pyautogui.alert("Failed to update the excel of failed jobs!\nProbably because of 1 of the following reasons:\n1. The file is currently open or in use by another program\n2. Permission denied to write to the file\n3. Failed to find the file", "Failed Logging")
 
 
-def screenshot(driver: WebDriver, job_id: str, failedAt: str) -> str:
+def screenshot(driver: WebDriver, job_id: str, failedAt: str, element: WebElement | None = None) -> str:
     '''
-    Function to to take screenshot for debugging
+    Function to to take screenshot for debugging, of only `element` if given (Eg: the Easy Apply modal)
+    - Saved in the background, see `modules/logs/screenshots.py`
     - Returns screenshot name as String
     '''
     screenshot_name = "{} - {} - {}.png".format( job_id, failedAt, str(datetime.now()) )
-    path = logs_folder_path+"/screenshots/"+screenshot_name.replace(":",".")
     # special_chars = {'*', '"', '\\', '<', '>', ':', '|', '?'}
     # for char in special_chars:  path = path.replace(char, '-')
-    driver.save_screenshot(path.replace("//","/"))
+    take_screenshot(driver, screenshot_name.replace(":","."), element)
     return screenshot_name
 #>
 
@@ -798,22 +802,17 @@ def submitted_jobs(job_id: str, title: str, company: str, work_location: str, wo
                    reposted: bool, date_listed: datetime | Literal['Unknown'], date_applied:  datetime | Literal['Pending'], job_link: str, application_link: str, 
                    questions_list: set | None, connect_request: Literal['In Development']) -> None:
     '''
-    Function to create or update the Applied jobs CSV file, once the application is submitted successfully
+    Function to create or update the Applied jobs history, once the application is submitted successfully
+    - Written in the background by the history writer, see `modules/history/writer.py`
     '''
     try:
-        with open(file_name, mode='a', newline='', encoding='utf-8') as csv_file:
-            fieldnames = ['Job ID', 'Title', 'Company', 'Work Location', 'Work Style', 'About Job', 'Experience required', 'Skills required', 'HR Name', 'HR Link', 'Resume', 'Re-posted', 'Date Posted', 'Date Applied', 'Job Link', 'External Job link', 'Questions Found', 'Connect Request']
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            if csv_file.tell() == 0: writer.writeheader()
-            writer.writerow({'Job ID':job_id, 'Title':title, 'Company':company, 'Work Location':work_location, 'Work Style':work_style, 
+        get_history_writer().put("applied", {'Job ID':job_id, 'Title':title, 'Company':company, 'Work Location':work_location, 'Work Style':work_style, 
                             'About Job':description, 'Experience required': experience_required, 'Skills required':skills, 
                                 'HR Name':hr_name, 'HR Link':hr_link, 'Resume':resume, 'Re-posted':reposted, 
                                 'Date Posted':date_listed, 'Date Applied':date_applied, 'Job Link':job_link, 
-                                'External Job link':application_link, 'Questions Found':questions_list, 'Connect Request':connect_request})
-        csv_file.close()
+                                'External Job link':application_link, 'Questions Found':questions_list, 'Connect Request':connect_request}, current_search_term)
     except Exception as e:
         print_lg("Failed to update submitted jobs list!", e)
-        pyautogui.alert("Failed to update the excel of applied jobs!\nProbably because of 1 of the following reasons:\n1. The file is currently open or in use by another program\n2. Permission denied to write to the file\n3. Failed to find the file", "Failed Logging")
 
 
 
@@ -830,26 +829,37 @@ def discard_job() -> None:
 # Function to apply to jobs
 def apply_to_jobs(search_terms: list[str]) -> None:
     applied_jobs = get_applied_job_ids()
-    rejected_jobs = set()
-    blacklisted_companies = set()
-    global current_city, failed_count, skip_count, easy_applied_count, external_jobs_count, tabs_count, pause_before_submit, pause_at_failed_question, useNewResume
+    global rejections
+    if rejections is None: rejections = Rejections()
+    rejected_jobs = rejections.jobs
+    blacklisted_companies = rejections.companies
+    global current_city, failed_count, skip_count, easy_applied_count, external_jobs_count, tabs_count, pause_before_submit, pause_at_failed_question, useNewResume, current_search_term
     current_city = current_city.strip()
 
     if randomize_search_order:  shuffle(search_terms)
     for searchTerm in search_terms:
+        current_search_term = searchTerm
+        set_log_context(job_id=None, search_term=searchTerm)
+        publish_event("search", search_term=searchTerm)
+        trace_phase("search")
+        started = perf_counter()
         driver.get(f"https://www.linkedin.com/jobs/search/?keywords={searchTerm}")
+        observe_metric("page_load_seconds", perf_counter() - started, page="search")
         print_lg("\n________________________________________________________________________________________________________________________\n")
         print_lg(f'\n>>>> Now searching for "{searchTerm}" <<<<\n\n')
 
         apply_filters()
 
         current_count = 0
+        page_requested = None
         try:
             while current_count < switch_number:
                 # Wait until job listings are loaded
                 wait.until(EC.presence_of_all_elements_located((By.XPATH, "//li[@data-occludable-job-id]")))
+                if page_requested: observe_metric("page_load_seconds", perf_counter() - page_requested, page="results")
 
                 pagination_element, current_page = get_page_info()
+                publish_event("page", page=current_page, search_term=searchTerm)
 
                 # Find all job listings in current page
                 buffer(3)
@@ -861,10 +871,15 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                     if current_count >= switch_number: break
                     print_lg("\n-@-\n")
 
+                    trace_phase("job_main_details")
+                    set_log_context(job_id=None)
                     job_id,title,company,work_location,work_style,skip = get_job_main_details(job, blacklisted_companies, rejected_jobs)
+                    set_log_context(job_id=job_id)
                     
                     if skip: continue
+                    publish_event("job_started", job_id=job_id, title=title, company=company)
                     # Redundant fail safe check for applied jobs!
+                    trace_phase("applied_check")
                     try:
                         if job_id in applied_jobs or find_by_class(driver, "jobs-s-apply__application-link", 2):
                             print_lg(f'Already applied to "{title} | {company}" job. Job ID: {job_id}!')
@@ -885,12 +900,14 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                     questions_list = None
                     screenshot_name = "Not Available"
 
+                    trace_phase("check_blacklist")
                     try:
                         rejected_jobs, blacklisted_companies, jobs_top_card = check_blacklist(rejected_jobs,job_id,company,blacklisted_companies)
                     except ValueError as e:
                         print_lg(e, 'Skipping this job!\n')
                         failed_job(job_id, job_link, resume, date_listed, "Found Blacklisted words in About Company", e, "Skipped", screenshot_name)
                         skip_count += 1
+                        count_job("skipped")
                         continue
                     except Exception as e:
                         print_lg("Failed to scroll to About Company!")
@@ -899,6 +916,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
 
 
                     # Hiring Manager info
+                    trace_phase("hr_card")
                     try:
                         hr_info_card = WebDriverWait(driver,2).until(EC.presence_of_element_located((By.CLASS_NAME, "hirer-card__hirer-information")))
                         hr_link = hr_info_card.find_element(By.TAG_NAME, "a").get_attribute("href")
@@ -925,6 +943,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
 
 
                     # Calculation of date posted
+                    trace_phase("date_posted")
                     try:
                         # try: time_posted_text = find_by_class(driver, "jobs-unified-top-card__posted-date", 2).text
                         # except: 
@@ -938,17 +957,20 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                         print_lg("Failed to calculate the date posted!",e)
 
 
+                    trace_phase("job_description")
                     description, experience_required, skip, reason, message = get_job_description()
                     if skip:
                         print_lg(message)
                         failed_job(job_id, job_link, resume, date_listed, reason, message, "Skipped", screenshot_name)
-                        rejected_jobs.add(job_id)
+                        rejections.reject_job(job_id, reason, "job_description")
                         skip_count += 1
+                        count_job("skipped")
                         continue
 
                     
                     if use_AI and description != "Unknown":
                         ##> ------ Yang Li : MARKYangL - Feature ------
+                        trace_phase("ai_skills")
                         try:
                             if ai_provider.lower() == "openai":
                                 skills = ai_extract_skills(aiClient, description)
@@ -965,6 +987,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                     uploaded = False
                     # Case 1: Easy Apply Button
                     if try_xp(driver, ".//button[contains(@class,'jobs-apply-button') and contains(@class, 'artdeco-button--3') and contains(@aria-label, 'Easy')]"):
+                        trace_phase("easy_apply")
                         try: 
                             try:
                                 errored = ""
@@ -985,11 +1008,13 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                                             next_counter = 1
                                             continue
                                         if questions_list: print_lg("Stuck for one or some of the following questions...", questions_list)
-                                        screenshot_name = screenshot(driver, job_id, "Failed at questions")
+                                        screenshot_name = screenshot(driver, job_id, "Failed at questions", modal)
                                         errored = "stuck"
                                         raise Exception("Seems like stuck in a continuous loop of next, probably because of new questions.")
-                                    questions_list = answer_questions(modal, questions_list, work_location, job_description=description)
-                                    if useNewResume and not uploaded: uploaded, resume = upload_resume(modal, default_resume_path)
+                                    with trace_span("answer_questions", step=next_counter):
+                                        questions_list = answer_questions(modal, questions_list, work_location, job_description=description)
+                                    if useNewResume and not uploaded:
+                                        with trace_span("upload_resume"): uploaded, resume = upload_resume(modal, default_resume_path)
                                     try: next_button = modal.find_element(By.XPATH, './/span[normalize-space(.)="Review"]') 
                                     except NoSuchElementException:  next_button = modal.find_element(By.XPATH, './/button[contains(span, "Next")]')
                                     try: next_button.click()
@@ -1009,7 +1034,8 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                                     pause_before_submit = False if "Disable Pause" == decision else True
                                     # try_xp(modal, ".//span[normalize-space(.)='Review']")
                                 follow_company(modal)
-                                if wait_span_click(driver, "Submit application", 2, scrollTop=True): 
+                                with trace_span("submit"): submitted = wait_span_click(driver, "Submit application", 2, scrollTop=True)
+                                if submitted: 
                                     date_applied = datetime.now()
                                     if not wait_span_click(driver, "Done", 2): actions.send_keys(Keys.ESCAPE).perform()
                                 elif errored != "stuck" and cur_pause_before_submit and "Yes" in pyautogui.confirm("You submitted the application, didn't you 😒?", "Failed to find Submit Application!", ["Yes", "No"]):
@@ -1028,16 +1054,19 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                             critical_error_log("Somewhere in Easy Apply process",e)
                             failed_job(job_id, job_link, resume, date_listed, "Problem in Easy Applying", e, application_link, screenshot_name)
                             failed_count += 1
+                            count_job("failed")
                             discard_job()
                             continue
                     else:
                         # Case 2: Apply externally
+                        trace_phase("external_apply")
                         skip, application_link, tabs_count = external_apply(pagination_element, job_id, job_link, resume, date_listed, application_link, screenshot_name)
                         if dailyEasyApplyLimitReached:
                             print_lg("\n###############  Daily application limit for Easy Apply is reached!  ###############\n")
                             return
                         if skip: continue
 
+                    trace_phase("save")
                     submitted_jobs(job_id, title, company, work_location, work_style, description, experience_required, skills, hr_name, hr_link, resume, reposted, date_listed, date_applied, job_link, application_link, questions_list, connect_request)
                     if uploaded:   useNewResume = False
 
@@ -1045,16 +1074,20 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                     current_count += 1
                     if application_link == "Easy Applied": easy_applied_count += 1
                     else:   external_jobs_count += 1
+                    count_job("easy_applied" if application_link == "Easy Applied" else "external")
                     applied_jobs.add(job_id)
 
 
 
                 # Switching to next page
+                trace_phase("next_page")
+                set_log_context(job_id=None)
                 if pagination_element == None:
                     print_lg("Couldn't find pagination element, probably at the end page of results!")
                     break
                 try:
                     pagination_element.find_element(By.XPATH, f"//button[@aria-label='Page {current_page+1}']").click()
+                    page_requested = perf_counter()
                     print_lg(f"\n>-> Now on Page {current_page+1} \n")
                 except NoSuchElementException:
                     print_lg(f"\n>-> Didn't find Page {current_page+1}. Probably at the end page of results!\n")
@@ -1063,7 +1096,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
         except Exception as e:
             print_lg("Failed to find Job listings!")
             critical_error_log("In Applier", e)
-            print_lg(driver.page_source, pretty=True)
+            save_snapshot(driver, "Failed to find Job listings", e)
             # print_lg(e)
 
         
@@ -1074,7 +1107,7 @@ def run(total_runs: int) -> int:
     print_lg(f"Date and Time: {datetime.now()}")
     print_lg(f"Cycle number: {total_runs}")
     print_lg(f"Currently looking for jobs posted within '{date_posted}' and sorting them by '{sort_by}'")
-    apply_to_jobs(search_terms)
+    with profile_cycle(total_runs): apply_to_jobs(search_terms)
     print_lg("########################################################################################################################\n")
     if not dailyEasyApplyLimitReached:
         print_lg("Sleeping for 10 min...")
@@ -1095,6 +1128,9 @@ def main() -> None:
         alert_title = "Error Occurred. Closing Browser!"
         total_runs = 1        
         validate_config()
+        start_run_report()
+        set_metric("run_started_timestamp_seconds", time())
+        set_metric("daily_limit_reached", 0)
         
         if not os.path.exists(default_resume_path):
             pyautogui.alert(text='Your default resume "{}" is missing! Please update it\'s folder path "default_resume_path" in config.py\n\nOR\n\nAdd a resume with exact name and path (check for spelling mistakes including cases).\n\n\nFor now the bot will continue using your previous upload from LinkedIn!'.format(default_resume_path), title="Missing Resume", button="OK")
@@ -1192,6 +1228,12 @@ def main() -> None:
             except Exception as e:
                 print_lg("Failed to close AI client:", e)
         ##<
+        close_history_writer()
+        get_history_store().close()
+        print_trace_summary()
+        print_webdriver_profile()
+        print_wait_summary()
+        write_run_report()
         try: driver.quit()
         except Exception as e: critical_error_log("When quitting...", e)
 